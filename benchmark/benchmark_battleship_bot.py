@@ -0,0 +1,46 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_battleship_bot.py 200
+
+import sys
+import time
+from typing import List, Tuple
+
+from server.py.battleship import Battleship, GamePhase
+from server.py.battleship_bot import DensityPlayer
+
+
+def play_game(seed: int) -> Tuple[int, List[float]]:
+    """ Play a self-play game of two density players, return the winner's shot count and the time of each shot """
+    game = Battleship()
+    list_player = [DensityPlayer(seed=2 * seed), DensityPlayer(seed=2 * seed + 1)]
+    list_time = []
+    while game.get_state().phase != GamePhase.FINISHED:
+        idx_player = game.get_state().idx_player_active
+        state = game.get_player_view(idx_player)
+        list_action = game.get_list_action()
+        time_start = time.perf_counter()
+        action = list_player[idx_player].select_action(state, list_action)
+        if state.phase == GamePhase.RUNNING:
+            list_time.append(time.perf_counter() - time_start)
+        game.apply_action(action)
+    state = game.get_state()
+    return len(state.players[state.winner].shots), list_time
+
+
+if __name__ == '__main__':
+
+    cnt_games = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    list_shots: List[int] = []
+    list_time_all: List[float] = []
+    for idx_game in range(cnt_games):
+        cnt_shots, list_time_game = play_game(idx_game)
+        list_shots.append(cnt_shots)
+        list_time_all.extend(list_time_game)
+
+    list_time_all.sort()
+    print(f'Games:          {cnt_games}')
+    print(f'Shots to win:   {sum(list_shots) / cnt_games:6.2f} avg  {min(list_shots)} min  {max(list_shots)} max')
+    print(f'Time per shot:  {sum(list_time_all) / len(list_time_all) * 1e3:6.2f} ms avg  '
+          f'{list_time_all[len(list_time_all) // 2] * 1e3:6.2f} ms median  '
+          f'{list_time_all[int(len(list_time_all) * 0.99)] * 1e3:6.2f} ms p99  '
+          f'{list_time_all[-1] * 1e3:6.2f} ms max')
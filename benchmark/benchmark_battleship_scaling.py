@@ -0,0 +1,65 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_battleship_scaling.py 10 20 50 100
+
+import sys
+import time
+import random
+from typing import List
+
+from server.py.battleship import Battleship, GamePhase
+from server.py.battleship_bot import DensityPlayer
+
+
+CNT_SHOTS = 100  # shots per player timed on each board size
+
+
+def benchmark_board_size(board_size: int) -> List[float]:
+    """ Seconds for the tables, per setup 'get_list_action', per running 'get_list_action', per shot and per bot
+    move """
+    random.seed(board_size)
+    time_start = time.perf_counter()
+    game = Battleship(board_size=board_size)
+    game.get_list_action()
+    time_tables = time.perf_counter() - time_start
+
+    cnt_calls = 0
+    time_setup = 0.0
+    while game.get_state().phase == GamePhase.SETUP:
+        time_start = time.perf_counter()
+        list_action = game.get_list_action()
+        time_setup += time.perf_counter() - time_start
+        cnt_calls += 1
+        game.apply_action(random.choice(list_action))
+    time_setup /= cnt_calls
+
+    list_player = [DensityPlayer(seed=0), DensityPlayer(seed=1)]
+    time_list, time_apply, time_bot = 0.0, 0.0, 0.0
+    for _ in range(2 * CNT_SHOTS):
+        if game.get_state().phase != GamePhase.RUNNING:
+            break
+        idx_player = game.get_state().idx_player_active
+        time_start = time.perf_counter()
+        list_action = game.get_list_action()
+        time_list += time.perf_counter() - time_start
+        state = game.get_player_view(idx_player)
+        time_start = time.perf_counter()
+        action = list_player[idx_player].select_action(state, list_action)
+        time_bot += time.perf_counter() - time_start
+        time_start = time.perf_counter()
+        game.apply_action(action)
+        time_apply += time.perf_counter() - time_start
+
+    cnt_shots = len(game.get_state().players[0].shots) + len(game.get_state().players[1].shots)
+    return [time_tables, time_setup, time_list / cnt_shots, time_apply / cnt_shots, time_bot / cnt_shots]
+
+
+if __name__ == '__main__':
+
+    list_board_size = [int(arg) for arg in sys.argv[1:]] or [10, 20, 50, 100]
+
+    print(f'{"size":>5s} {"ships":>6s} {"tables ms":>10s} {"setup ms":>10s} {"actions ms":>11s} '
+          f'{"shoot us":>9s} {"bot ms":>8s}')
+    for size in list_board_size:
+        list_time = benchmark_board_size(size)
+        cnt_ships = len(Battleship(board_size=size).config.fleet)
+        print(f'{size:5d} {cnt_ships:6d} {list_time[0] * 1e3:10.2f} {list_time[1] * 1e3:10.3f} '
+              f'{list_time[2] * 1e3:11.3f} {list_time[3] * 1e6:9.2f} {list_time[4] * 1e3:8.2f}')
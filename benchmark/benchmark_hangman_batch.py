@@ -0,0 +1,53 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_hangman_batch.py 10000
+
+import sys
+import time
+import random
+from typing import List
+
+import numpy as np
+
+from server.py.hangman import Hangman, HangmanBatch, HangmanGameState, GamePhase, LIST_ACTION_GUESS
+from server.py.hangman_words import get_word_store
+
+# letters in order of their frequency in English text, the policy of the evaluated bot
+LIST_LETTER_ORDER = [ord(letter) - ord('A') for letter in 'ETAOINSHRDLCUMWFGYPBVKJXQZ']
+
+
+def run_single(list_word: List[str]) -> int:
+    """ Play every word with one Hangman game each, return the number of games won """
+    cnt_won = 0
+    for word in list_word:
+        game = Hangman()
+        game.set_state(HangmanGameState(word_to_guess=word, phase=GamePhase.RUNNING, guesses=[]))
+        for letter in LIST_LETTER_ORDER:
+            if game.get_state().phase == GamePhase.FINISHED:
+                break
+            game.apply_action(LIST_ACTION_GUESS[letter])
+        cnt_won += game.is_won()
+    return cnt_won
+
+
+def run_batch(list_word: List[str]) -> int:
+    """ Play every word in one batch, return the number of games won """
+    batch = HangmanBatch(list_word)
+    for letter in LIST_LETTER_ORDER:
+        if batch.is_finished.all():
+            break
+        batch.step(np.full(len(batch), letter))
+    return int(batch.is_won().sum())
+
+
+if __name__ == '__main__':
+
+    cnt_games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    store = get_word_store()
+    rng = random.Random(0)
+    list_word_games = [store.random_word(rng) for _ in range(cnt_games)]
+
+    for name, run in (('single', run_single), ('batch', run_batch)):
+        time_start = time.perf_counter()
+        cnt_won_games = run(list_word_games)
+        time_run = time.perf_counter() - time_start
+        print(f'{name:7s} {cnt_games} games in {time_run * 1e3:8.1f} ms '
+              f'({cnt_games / time_run:10.0f} games/s), won {cnt_won_games / cnt_games:.1%}')
@@ -0,0 +1,66 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_snapshot.py dog.Dog 10000
+
+import sys
+import copy
+import time
+import random
+import importlib
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+
+def get_game(name: str) -> Any:
+    """ New started game of a 'module.Class' name """
+    module_name, class_name = name.split('.')
+    game = getattr(importlib.import_module(f'server.py.{module_name}'), class_name)()
+    if hasattr(game, 'start'):
+        game.start()
+    else:
+        game.set_state(game.get_state())
+    return game
+
+
+def grow_tree(game: Any, cnt_nodes: int, save: Callable[[], Any],
+              load: Callable[[Any], None]) -> Tuple[List[Any], float]:
+    """ Grow a random search tree: restore a random node, apply a random action, save the child (nodes without
+    legal actions are leaves) """
+    rng = random.Random(0)
+    game.seed(0)
+    list_node = [save()]
+    time_start = time.perf_counter()
+    while len(list_node) < cnt_nodes:
+        load(list_node[rng.randrange(len(list_node))])
+        list_action = game.get_list_action() if game.get_state().phase != 'finished' else []
+        if not list_action:
+            continue
+        game.apply_action(rng.choice(list_action))
+        list_node.append(save())
+    return list_node, time.perf_counter() - time_start
+
+
+if __name__ == '__main__':
+
+    game_name = sys.argv[1] if len(sys.argv) > 1 else 'dog.Dog'
+    cnt_tree_nodes = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    game_tree = get_game(game_name)
+    tracemalloc.start()
+    state_copy = copy.deepcopy(game_tree.get_state())
+    size_state = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{game_name}: one state {size_state / 1e3:.1f} kB, {cnt_tree_nodes} nodes')
+
+    list_method: List[Tuple[str, Callable[[], Any], Callable[[Any], None]]] = [
+        ('deepcopy', lambda: copy.deepcopy(game_tree.get_state()),
+         lambda state: game_tree.set_state(copy.deepcopy(state))),
+        ('snapshot', game_tree.snapshot, game_tree.restore),
+    ]
+    for method, save_node, load_node in list_method:
+        game_tree.set_state(copy.deepcopy(state_copy))
+        tracemalloc.start()
+        list_tree, time_tree = grow_tree(game_tree, cnt_tree_nodes, save_node, load_node)
+        size_tree = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f'{method:9s} {time_tree * 1e3:8.1f} ms  {size_tree / 1e6:7.2f} MB '
+              f'({size_tree / size_state:6.1f} x one state)')
+        del list_tree
@@ -0,0 +1,64 @@
+# runcmd: cd .. & venv\Scripts\python benchmark/benchmark_trusted.py 20
+
+import sys
+import time
+import random
+from typing import Any, Callable, List, Tuple
+
+from server.py import dog, uno
+from server.py.selfplay import start_game
+
+
+def construct_validated(cls: Any, **fields: Any) -> Any:
+    """ Model instance built with full validation (what the engine did before its trusted constructors) """
+    return cls(**fields)
+
+
+def play_turns(game_class: type, cnt_games: int) -> Tuple[int, float, float]:
+    """ Random games: per turn the actions are listed, the active player's view taken and an action applied;
+    return the number of turns, their time and the time of decoding each turn's state """
+    cnt_turns, time_turns, time_decode = 0, 0.0, 0.0
+    for idx_game in range(cnt_games):
+        game = game_class()
+        rng = random.Random(idx_game)
+        start_game(game, rng)
+        for _ in range(300):
+            state = game.get_state()
+            if state.phase == 'finished':
+                break
+            time_start = time.perf_counter()
+            list_action = game.get_list_action()
+            if not list_action and game_class is uno.Uno:   # Uno has no move without actions
+                break
+            game.get_player_view(state.idx_player_active or 0)
+            game.apply_action(rng.choice(list_action) if list_action else None)
+            time_turns += time.perf_counter() - time_start
+            data = game.encode_state()
+            time_start = time.perf_counter()
+            game.decode_state(data)
+            time_decode += time.perf_counter() - time_start
+            cnt_turns += 1
+    return cnt_turns, time_turns, time_decode
+
+
+if __name__ == '__main__':
+
+    cnt_games_run = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    list_patch: List[Tuple[Any, str, Callable[..., Any]]] = [
+        (uno, 'construct_trusted', construct_validated),
+        (dog, 'construct_trusted', construct_validated),
+        (dog, 'copy_state', lambda state: state.model_copy(deep=True)),
+    ]
+    list_trusted = [(module, name, getattr(module, name)) for module, name, _ in list_patch]
+    for game_name, game_cls in (('uno.Uno', uno.Uno), ('dog.Dog', dog.Dog)):
+        dict_time = {}
+        for method, list_attr in (('validated', list_patch), ('trusted', list_trusted)):
+            for module_patched, name_patched, value in list_attr:
+                setattr(module_patched, name_patched, value)
+            turns, time_turn, time_state = play_turns(game_cls, cnt_games_run)
+            dict_time[method] = time_turn / turns
+            print(f'{game_name:8s} {method:9s} {turns:6d} turns  {time_turn / turns * 1e6:8.1f} us/turn  '
+                  f'{time_state / turns * 1e6:8.1f} us/decode')
+        print(f'{game_name:8s} saving {(dict_time["validated"] - dict_time["trusted"]) * 1e6:8.1f} us/turn '
+              f'({1 - dict_time["trusted"] / dict_time["validated"]:.0%})')
@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, List, Optional, Protocol
+import asyncio
+from abc import ABCMeta, abstractmethod
+import multiprocessing
+import multiprocessing.pool
+from concurrent.futures import ThreadPoolExecutor
+from server.py.game import GameState, GameAction, Player
+
+
+class AsyncPlayer(Protocol):
+    """ Player awaited by the server: deciding must not block the event loop (see ThreadPlayer and ProcessPlayer) """
+
+    async def select_action(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Given masked game state and possible actions, select the next action """
+
+    def close(self) -> None:
+        """ Release the threads or processes of the player """
+
+
+class ExecutorPlayer(metaclass=ABCMeta):
+    """ Runs a synchronous player outside of the event loop, a decision taking longer than the timeout is cancelled
+
+    After a timeout the fallback player (typically a RandomPlayer) decides in a thread of the default executor,
+    without a time limit: it should be cheap. Without a fallback player TimeoutError is raised. A decision
+    cancelled by its task (e.g. the websocket was closed) is cancelled too. """
+
+    def __init__(self, timeout: Optional[float] = None, player_fallback: Optional[Player] = None) -> None:
+        self.timeout = timeout
+        self.player_fallback = player_fallback
+
+    async def select_action(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Given masked game state and possible actions, select the next action """
+        if len(actions) == 0:
+            return None
+        try:
+            return await asyncio.wait_for(self.run(state, actions), self.timeout)
+        except asyncio.TimeoutError:
+            self.cancel()
+            if self.player_fallback is None:
+                raise
+            return await asyncio.to_thread(self.player_fallback.select_action, state, actions)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    @abstractmethod
+    async def run(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Decision of the synchronous player """
+        pass
+
+    @abstractmethod
+    def cancel(self) -> None:
+        """ Stop the decision running (as far as possible) """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """ Release the threads or processes of the player """
+        pass
+
+
+class ThreadPlayer(ExecutorPlayer):
+    """ Runs a synchronous player in a thread of its own, one decision at a time
+
+    Python threads cannot be stopped: a cancelled decision runs on in its thread until it returns, its result is
+    ignored and the next decision gets a new thread. Use a ProcessPlayer for bots that may not return at all. """
+
+    def __init__(self, player: Player, timeout: Optional[float] = None,
+                 player_fallback: Optional[Player] = None) -> None:
+        super().__init__(timeout, player_fallback)
+        self.player = player
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    async def run(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Decision of the synchronous player in the thread """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.player.select_action, state, actions)
+
+    def cancel(self) -> None:
+        """ Leave the thread of the cancelled decision behind """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def close(self) -> None:
+        """ Release the thread (a decision still running ends on its own) """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+WORKER: Dict[str, Any] = {}
+""" Player of a ProcessPlayer's worker process, created once by 'init_worker' """
+
+
+def init_worker(player_factory: Callable[[], Player]) -> None:
+    """ Create the player of a worker process """
+    WORKER['player'] = player_factory()
+
+
+def select_action_index(state: GameState, actions: List[GameAction]) -> Optional[int]:
+    """ Decision of the worker's player as the index of the selected action (actions are copies between processes) """
+    action = WORKER['player'].select_action(state, actions)
+    return None if action is None else actions.index(action)
+
+
+class ProcessPlayer(ExecutorPlayer):
+    """ Runs a synchronous player in a worker process of its own, created by a picklable factory (e.g. the class)
+
+    A cancelled decision terminates the worker, the next decision starts a new one (the player starts afresh). """
+
+    def __init__(self, player_factory: Callable[[], Player], timeout: Optional[float] = None,
+                 player_fallback: Optional[Player] = None) -> None:
+        super().__init__(timeout, player_fallback)
+        self.player_factory = player_factory
+        self.pool: Optional[multiprocessing.pool.Pool] = None
+
+    def get_pool(self) -> multiprocessing.pool.Pool:
+        """ Pool of the worker process, started on first use """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(  # pylint: disable=consider-using-with
+                1, initializer=init_worker, initargs=(self.player_factory,))
+        return self.pool
+
+    async def run(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Decision of the synchronous player in the worker process """
+        loop = asyncio.get_running_loop()
+        future: 'asyncio.Future[Optional[int]]' = loop.create_future()
+
+        def set_result(idx_action: Optional[int]) -> None:
+            if not future.done():
+                future.set_result(idx_action)
+
+        def set_exception(error: BaseException) -> None:
+            if not future.done():
+                future.set_exception(error)
+
+        self.get_pool().apply_async(select_action_index, (state, actions),
+                                    callback=lambda result: loop.call_soon_threadsafe(set_result, result),
+                                    error_callback=lambda error: loop.call_soon_threadsafe(set_exception, error))
+        idx_action = await future
+        return None if idx_action is None else actions[idx_action]
+
+    def cancel(self) -> None:
+        """ Terminate the worker process """
+        self.close()
+
+    def close(self) -> None:
+        """ Terminate the worker process """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
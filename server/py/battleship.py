@@ -1,8 +1,25 @@
-from typing import List, Optional
-import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
 from enum import Enum
 import random
-from server.py.game import Game, Player
+import numpy as np
+from server.py.game import Game, UniformPlayer
+from server.py.state_codec import StateWriter, StateReader
+from server.py.tracing import get_tracer
+from server.py.zobrist import get_keys, get_key, get_mask_hash
+
+
+BOARD_SIZE = 10        # default board: rows 'A' to 'J', columns 1 to 10
+BOARD_SIZE_MAX = 100  # largest board: rows 'A' to 'CV', columns 1 to 100
+VERSION_CODEC = 1     # version of the binary state encoding (first byte of an encoded state)
+
+LIST_SHIP: List[Tuple[str, int]] = [
+    ('carrier', 5), ('battleship', 4), ('cruiser', 3), ('submarine', 3), ('destroyer', 2),
+]
+""" Fleet of each player on the default board (name, length), placed in this order """
+
+DICT_SHIP_CODE: Dict[str, int] = {name: code for code, (name, _) in enumerate(LIST_SHIP)}  # one byte ship names
+CODE_SHIP_OTHER = 255   # code of a ship name not in LIST_SHIP (the name follows)
+TRACER = get_tracer('battleship')
 
 
 class ActionType(str, Enum):
@@ -18,6 +35,129 @@ class BattleshipAction:
         self.location = location
 
 
+def get_row_name(row: int) -> str:
+    """ Name of a row in bijective base 26: 0 -> 'A', 25 -> 'Z', 26 -> 'AA', 99 -> 'CV' """
+    name = ''
+    row += 1
+    while row > 0:
+        row, rest = divmod(row - 1, 26)
+        name = chr(ord('A') + rest) + name
+    return name
+
+
+def get_location(idx: int, board_size: int = BOARD_SIZE) -> str:
+    """ Location name of a cell index (index = row * board_size + col), e.g. 0 -> 'A1', 99 -> 'J10' """
+    row, col = divmod(idx, board_size)
+    return f'{get_row_name(row)}{col + 1}'
+
+
+def get_idx(location: str, board_size: int = BOARD_SIZE) -> int:
+    """ Cell index of a location name (KeyError for invalid names or cells outside the board) """
+    pos = 0
+    row = 0
+    while pos < len(location) and 'A' <= location[pos] <= 'Z':
+        row = row * 26 + ord(location[pos]) - ord('A') + 1
+        pos += 1
+    digits = location[pos:]
+    if row == 0 or not digits.isdigit() or digits[0] == '0' or row > board_size or int(digits) > board_size:
+        raise KeyError(location)
+    return (row - 1) * board_size + int(digits) - 1
+
+
+def get_fleet(board_size: int) -> List[Tuple[str, int]]:
+    """ Fleet of a board size: one default fleet per 10 rows (at least one) """
+    return LIST_SHIP * max(1, board_size // BOARD_SIZE)
+
+
+def get_list_placement(length: int, board_size: int = BOARD_SIZE) -> List[List[int]]:
+    """ Cell indices of every horizontal and vertical placement of a ship of the given length """
+    list_placement = []
+    for row in range(board_size):
+        for col in range(board_size - length + 1):
+            list_placement.append([row * board_size + col + i for i in range(length)])
+    for col in range(board_size):
+        for row in range(board_size - length + 1):
+            list_placement.append([(row + i) * board_size + col for i in range(length)])
+    return list_placement
+
+
+class BoardConfig:
+    """ Size, fleet and lazily built action tables of a board (shared by all games with this board size) """
+
+    def __init__(self, board_size: int) -> None:
+        if not max(length for _, length in LIST_SHIP) <= board_size <= BOARD_SIZE_MAX:
+            raise ValueError(f"Invalid board size {board_size}.")
+        self.board_size = board_size
+        self.cnt_cells = board_size * board_size
+        self.mask_board = (1 << self.cnt_cells) - 1
+        self.fleet = get_fleet(board_size)
+        self._list_location: List[str] = []
+        self._dict_action_set_ship: Dict[str, List[BattleshipAction]] = {}
+        self._dict_placement_cover: Dict[int, List[List[int]]] = {}
+        self._list_action_shoot: List[BattleshipAction] = []
+        self._keys_cell: List[List[List[int]]] = []
+
+    def get_list_location(self) -> List[str]:
+        """ Location name of each cell index """
+        if not self._list_location:
+            self._list_location = [get_location(idx, self.board_size) for idx in range(self.cnt_cells)]
+        return self._list_location
+
+    def get_list_action_set_ship(self, name: str, length: int) -> List[BattleshipAction]:
+        """ Set ship action of every placement of a ship (same order as 'get_list_placement') """
+        if name not in self._dict_action_set_ship:
+            list_location = self.get_list_location()
+            self._dict_action_set_ship[name] = [
+                BattleshipAction(ActionType.SET_SHIP, name, [list_location[idx] for idx in placement])
+                for placement in get_list_placement(length, self.board_size)
+            ]
+        return self._dict_action_set_ship[name]
+
+    def get_placement_cover(self, length: int) -> List[List[int]]:
+        """ Indices of the placements of a ship of the given length covering each cell """
+        if length not in self._dict_placement_cover:
+            placement_cover: List[List[int]] = [[] for _ in range(self.cnt_cells)]
+            for idx_placement, placement in enumerate(get_list_placement(length, self.board_size)):
+                for idx in placement:
+                    placement_cover[idx].append(idx_placement)
+            self._dict_placement_cover[length] = placement_cover
+        return self._dict_placement_cover[length]
+
+    def get_list_action_shoot(self) -> List[BattleshipAction]:
+        """ Shoot action of each cell """
+        if not self._list_action_shoot:
+            self._list_action_shoot = [BattleshipAction(ActionType.SHOOT, None, [location])
+                                       for location in self.get_list_location()]
+        return self._list_action_shoot
+
+    def get_keys_cell(self) -> List[List[List[int]]]:
+        """ Zobrist keys of the ship, shot and hit (kind 0, 1, 2) of each player at each cell: [kind][player][cell] """
+        if not self._keys_cell:
+            self._keys_cell = get_keys(f'battleship.cell.{self.board_size}', 3, 2, self.cnt_cells)
+        return self._keys_cell
+
+
+DICT_BOARD_CONFIG: Dict[int, BoardConfig] = {}
+""" Board configuration of each board size in use """
+
+
+def get_board_config(board_size: int = BOARD_SIZE) -> BoardConfig:
+    """ Shared board configuration of a board size """
+    if board_size not in DICT_BOARD_CONFIG:
+        DICT_BOARD_CONFIG[board_size] = BoardConfig(board_size)
+    return DICT_BOARD_CONFIG[board_size]
+
+
+LIST_LOCATION: List[str] = get_board_config().get_list_location()
+""" Location name of each cell index of the default board """
+
+DICT_LOCATION_IDX: Dict[str, int] = {location: idx for idx, location in enumerate(LIST_LOCATION)}
+""" Cell index of each location name of the default board """
+
+LIST_ACTION_SHOOT: List[BattleshipAction] = get_board_config().get_list_action_shoot()
+""" Precomputed shoot action of each cell of the default board """
+
+
 class Ship:
 
     def __init__(self, name: str, length: int, location: Optional[List[str]]) -> None:
@@ -35,44 +175,137 @@ class PlayerState:
         self.successful_shots = successful_shots
 
 
+class PlayerBoard:
+    """ Bitboards of a player (bit i = cell i, arbitrary width) to place ships, shoot and detect hits """
+
+    def __init__(self) -> None:
+        self.ships = 0                    # cells covered by own ships
+        self.shots = 0                    # cells shot at by this player
+        self.hits = 0                     # cells shot at by this player that hit an enemy ship
+        self.cnt_ship_cells = 0           # number of cells covered by own ships
+        self.cnt_hits = 0                 # number of cells shot at by this player that hit an enemy ship
+        self.list_ship_mask: List[int] = []       # cells of each own ship
+        self.dict_idx_ship: Dict[int, int] = {}   # own ship index of each cell covered by a ship
+
+    def add_ship(self, list_idx: List[int]) -> None:
+        """ Register a ship covering the given cell indices """
+        idx_ship = len(self.list_ship_mask)
+        mask = 0
+        for idx in list_idx:
+            mask |= 1 << idx
+            if idx not in self.dict_idx_ship:
+                self.dict_idx_ship[idx] = idx_ship
+                self.cnt_ship_cells += 1
+        self.list_ship_mask.append(mask)
+        self.ships |= mask
+
+    @classmethod
+    def from_player_state(cls, player: 'PlayerState', board_size: int = BOARD_SIZE) -> 'PlayerBoard':
+        """ Build the bitboards from the location names of a player state """
+        board = cls()
+        for ship in player.ships:
+            board.add_ship([get_idx(location, board_size) for location in ship.location or []])
+        board.shots = get_mask(player.shots, board_size)
+        board.hits = get_mask(player.successful_shots, board_size)
+        board.cnt_hits = bin(board.hits).count('1')
+        return board
+
+
+def get_mask(list_location: List[str], board_size: int = BOARD_SIZE) -> int:
+    """ Bitmask of the given location names (KeyError for invalid names) """
+    mask = 0
+    for location in list_location:
+        mask |= 1 << get_idx(location, board_size)
+    return mask
+
+
+def is_straight_line(list_location: List[str], board_size: int = BOARD_SIZE) -> bool:
+    """ Check that the locations are valid names and form a gapless horizontal or vertical line """
+    try:
+        list_idx = sorted(get_idx(location, board_size) for location in list_location)
+    except KeyError:
+        return False
+    if len(set(list_idx)) != len(list_idx):
+        return False
+    idx_first, idx_last = list_idx[0], list_idx[-1]
+    if idx_first // board_size == idx_last // board_size:
+        return idx_last - idx_first == len(list_idx) - 1
+    return idx_first % board_size == idx_last % board_size and \
+        idx_last - idx_first == (len(list_idx) - 1) * board_size
+
+
 class GamePhase(str, Enum):
     SETUP = 'setup'            # before the game has started (including setting ships)
     RUNNING = 'running'        # while the game is running (shooting)
     FINISHED = 'finished'      # when the game is finished
 
 
+DICT_KEY_PHASE: Dict[GamePhase, int] = dict(zip(GamePhase, get_keys('battleship.phase', len(GamePhase))))
+KEYS_ACTIVE: List[int] = get_keys('battleship.active', 3)   # key of the active player (last: None)
+KEYS_WINNER: List[int] = get_keys('battleship.winner', 3)   # key of the winner (last: None)
+
+
 class BattleshipGameState:
 
-    def __init__(self, idx_player_active: int, phase: GamePhase, winner: Optional[int], players: List[PlayerState]) -> None:
+    def __init__(  # pylint: disable=too-many-arguments
+            self, idx_player_active: int, phase: GamePhase, winner: Optional[int], players: List[PlayerState],
+            board_size: int = BOARD_SIZE) -> None:
         self.idx_player_active = idx_player_active
         self.phase = phase
         self.winner = winner
         self.players = players
+        self.board_size = board_size
 
     def __repr__(self):
         return (f"BattleshipGameState(active_player={self.idx_player_active}, "
-                f"phase={self.phase}, winner={self.winner}, "
+                f"phase={self.phase}, winner={self.winner}, board_size={self.board_size}, "
                 f"players={self.players})")
 
 
+class ShipPlaced(NamedTuple):
+    """ Event: a player placed a ship """
+    idx_player: int
+    ship_name: str
+    location: Tuple[str, ...]
+
+
+class ShotHit(NamedTuple):
+    """ Event: a player's shot hit an enemy ship (sunk if all its cells are hit now) """
+    idx_player: int
+    location: str
+    ship_name: str
+    is_sunk: bool
+
+
+class ShotMissed(NamedTuple):
+    """ Event: a player's shot hit the water """
+    idx_player: int
+    location: str
+
+
 class Battleship(Game):
 
-    def __init__(self):
+    def __init__(self, board_size: int = BOARD_SIZE) -> None:
         """ Game initialization (set_state call not necessary) """
-        self.state = None
+        self.state: BattleshipGameState
+        self.config = get_board_config(board_size)
+        self.boards: List[PlayerBoard] = []
+        self.hash_items = 0   # Zobrist hash of the ships, shots and hits (the other fields are hashed on demand)
         player1 = PlayerState(name='Player 1', ships=[], shots=[], successful_shots=[])
         player2 = PlayerState(name='Player 2', ships=[], shots=[], successful_shots=[])
 
         initial_state = BattleshipGameState(idx_player_active=0,
                                             phase=GamePhase.SETUP,
                                             winner=None,
-                                            players=[player1, player2])
-        self.state = self.set_state(initial_state)
+                                            players=[player1, player2],
+                                            board_size=board_size)
+        self.set_state(initial_state)
 
 
     def print_state(self) -> None:
-        """ Print the current game state """
-        print(self.state)
+        """ Trace the current game state (level INFO) """
+        if TRACER.is_info:
+            TRACER.info('%s', str(self.state))
 
     def get_state(self) -> BattleshipGameState:
         """ Get the complete, unmasked game state """
@@ -83,35 +316,121 @@ class Battleship(Game):
     def set_state(self, state: BattleshipGameState) -> None:
         """ Set the game to a given state """
         self.state = state
+        self.config = get_board_config(state.board_size)
+        self.boards = [PlayerBoard.from_player_state(player, state.board_size) for player in state.players]
+        self.hash_items = self.get_hash_items()
+
+    def get_hash_items(self) -> int:
+        """ Zobrist hash of the ship, shot and hit cells of the players computed from the state """
+        keys_ship, keys_shot, keys_hit = self.config.get_keys_cell()
+        board_size = self.state.board_size
+        hash_items = 0
+        for idx_player, player in enumerate(self.state.players):
+            list_location_ship = [location for ship in player.ships for location in ship.location or []]
+            hash_items ^= get_mask_hash(keys_ship[idx_player % 2], get_mask(list_location_ship, board_size))
+            hash_items ^= get_mask_hash(keys_shot[idx_player % 2], get_mask(player.shots, board_size))
+            hash_items ^= get_mask_hash(keys_hit[idx_player % 2], get_mask(player.successful_shots, board_size))
+        return hash_items
+
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the state (ships, shots, hits, phase, active player and winner) """
+        return self.hash_items ^ DICT_KEY_PHASE[self.state.phase] ^ get_key(KEYS_ACTIVE, self.state.idx_player_active) \
+            ^ get_key(KEYS_WINNER, self.state.winner)
+
+    def compute_state_hash(self) -> int:
+        """ The value of 'state_hash' computed from scratch """
+        return self.get_hash_items() ^ DICT_KEY_PHASE[self.state.phase] \
+            ^ get_key(KEYS_ACTIVE, self.state.idx_player_active) ^ get_key(KEYS_WINNER, self.state.winner)
+
+    def _toggle_cells(self, kind: int, idx_player: int, mask: int) -> None:
+        """ Add or remove cells (kind 0: ships, 1: shots, 2: hits) of a player in the hash """
+        self.hash_items ^= get_mask_hash(self.config.get_keys_cell()[kind][idx_player % 2], mask)
+
+    def touch(self) -> None:
+        """ Start a new version and rebuild the boards and the hash after the state was changed directly """
+        self.set_state(self.state)
 
     def get_list_action(self) -> List[BattleshipAction]:
         """ Get a list of possible actions for the active player """
-        pass
-
-    def __can_we_place_ship(self, player: PlayerState, ship_location: List[str]) -> bool:
+        if self.state.phase == GamePhase.SETUP:
+            list_action_set_ship, set_covered = self.get_set_ship_covered()
+            if not set_covered:
+                return list(list_action_set_ship)
+            return [action for idx_placement, action in enumerate(list_action_set_ship)
+                    if idx_placement not in set_covered]
+
+        if self.state.phase == GamePhase.RUNNING:
+            list_action_shoot = self.config.get_list_action_shoot()
+            mask_free = ~self.boards[self.state.idx_player_active].shots & self.config.mask_board
+            free = f'{mask_free:0{self.config.cnt_cells}b}'
+            return [list_action_shoot[idx] for idx, bit in enumerate(free[::-1]) if bit == '1']
+
+        return []
+
+    def get_set_ship_covered(self) -> Tuple[List[BattleshipAction], Set[int]]:
+        """ Set ship actions of all placements of the active player's next ship (none if the fleet is complete) and
+        the indices of those overlapping the ships already set """
+        idx_active = self.state.idx_player_active
+        idx_ship = len(self.state.players[idx_active].ships)
+        if idx_ship >= len(self.config.fleet):
+            return [], set()
+        name, length = self.config.fleet[idx_ship]
+        placement_cover = self.config.get_placement_cover(length)
+        set_covered = {idx_placement for idx in self.boards[idx_active].dict_idx_ship
+                       for idx_placement in placement_cover[idx]}
+        return self.config.get_list_action_set_ship(name, length), set_covered
+
+    def iter_actions(self) -> Iterator[BattleshipAction]:
+        """ Possible actions one by one, in the order of 'get_list_action' """
+        if self.state.phase == GamePhase.SETUP:
+            list_action_set_ship, set_covered = self.get_set_ship_covered()
+            for idx_placement, action in enumerate(list_action_set_ship):
+                if idx_placement not in set_covered:
+                    yield action
+        elif self.state.phase == GamePhase.RUNNING:
+            shots = self.boards[self.state.idx_player_active].shots
+            for idx, action in enumerate(self.config.get_list_action_shoot()):
+                if not shots >> idx & 1:
+                    yield action
+
+    def count_actions(self) -> int:
+        """ Number of possible actions """
+        if self.state.phase == GamePhase.SETUP:
+            list_action_set_ship, set_covered = self.get_set_ship_covered()
+            return len(list_action_set_ship) - len(set_covered)
+        if self.state.phase == GamePhase.RUNNING:
+            return self.config.cnt_cells - self.boards[self.state.idx_player_active].shots.bit_count()
+        return 0
+
+    def sample_action(self, rng: random.Random) -> Optional[BattleshipAction]:
+        """ Uniformly random possible action, None if there is none: random placements or cells are drawn until one
+        is free (while at least a quarter is free, else one of the list of free ones is drawn) """
+        if self.state.phase == GamePhase.SETUP:
+            list_action, set_covered = self.get_set_ship_covered()
+            mask_taken = sum(1 << idx for idx in set_covered)
+        elif self.state.phase == GamePhase.RUNNING:
+            list_action = self.config.get_list_action_shoot()
+            mask_taken = self.boards[self.state.idx_player_active].shots
+        else:
+            return None
+        cnt_free = len(list_action) - mask_taken.bit_count()
+        if cnt_free <= 0:
+            return None
+        if cnt_free * 4 < len(list_action):
+            return rng.choice([action for idx, action in enumerate(list_action) if not mask_taken >> idx & 1])
+        while True:
+            idx = rng.randrange(len(list_action))
+            if not mask_taken >> idx & 1:
+                return list_action[idx]
+
+    def __can_we_place_ship(self, board: PlayerBoard, ship_location: List[str]) -> bool:
         if len(ship_location) == 0:
             return True
 
-        try:
-            letters = [re.match(r"^[A-J]", loc).group() for loc in ship_location]
-            numbers = [int(re.match(r"^[A-J](\d{1,2})$", loc).group(1)) for loc in ship_location]
-        except AttributeError:
-            # Invalid location format
-            return False
-
-        if not (all(l == letters[0] for l in letters) or all(n == numbers[0] for n in numbers)):
+        if not is_straight_line(ship_location, self.config.board_size):
             return False
 
-        for i in range(len(ship_location) - 1):
-            if abs(ord(letters[i]) - ord(letters[i + 1])) > 1 or abs(numbers[i] - numbers[i + 1]) > 1:
-                return False
-
-        located_places = {place for ship in player.ships for place in ship.location}
-        for location in ship_location:
-            if location in located_places:
-                return False
-
-        return True
+        return not get_mask(ship_location, self.config.board_size) & board.ships
 
     def apply_action(self, action: BattleshipAction) -> None:
         """ Apply the given action to the game """
@@ -119,8 +438,10 @@ class Battleship(Game):
         if self.state.phase == GamePhase.FINISHED:
             raise Exception("Game is already finished.")
 
-        active_player = self.state.players[self.state.idx_player_active]
-        enemy_player = self.state.players[(self.state.idx_player_active + 1) % 2]
+        idx_active = self.state.idx_player_active
+        active_player = self.state.players[idx_active]
+        active_board = self.boards[idx_active]
+        enemy_board = self.boards[(idx_active + 1) % 2]
 
         action_type: ActionType = action.action_type
         phase: GamePhase = self.state.phase
@@ -128,55 +449,156 @@ class Battleship(Game):
         if action_type == ActionType.SET_SHIP:
             if phase != GamePhase.SETUP:
                 raise Exception("Cannot place ship outside the setup phase.")
-
-            ship_name = action.ship_name
-            ship_location = action.location
-
-            if not self.__can_we_place_ship(active_player, ship_location):
-                raise ValueError("Invalid ship placement.")
-
-            active_player.ships.append(Ship(ship_name, len(ship_location), ship_location))
-
-            self.state.idx_player_active = (self.state.idx_player_active + 1) % 2
+            self._apply_action_set_ship(action)
             return
 
         if action_type == ActionType.SHOOT:
             if phase != GamePhase.RUNNING:
                 raise Exception("Cannot shoot outside the running phase.")
 
-            if len(action.location) != 1:
-                raise Exception("Invalid shot location.")
+            try:
+                if len(action.location) != 1:
+                    raise KeyError(action.location)
+                shot_place = action.location[0]
+                idx = get_idx(shot_place, self.config.board_size)
+            except KeyError as e:
+                raise Exception("Invalid shot location.") from e
 
-            shot_place = action.location[0]
-            if shot_place in active_player.shots:
+            bit = 1 << idx
+            if active_board.shots & bit:
                 raise Exception("Shot already made.")
 
-            enemy_positions = [place for ship in enemy_player.ships for place in ship.location]
-            we_hit = shot_place in enemy_positions
+            active_board.shots |= bit
             active_player.shots.append(shot_place)
-            if we_hit:
+            self._toggle_cells(1, idx_active, bit)
+            if idx in enemy_board.dict_idx_ship:
+                active_board.hits |= bit
+                self._toggle_cells(2, idx_active, bit)
+                active_board.cnt_hits += 1
                 active_player.successful_shots.append(shot_place)
 
-            if len(set(enemy_positions) - set(active_player.successful_shots)) == 0:
-                self.state.phase = GamePhase.FINISHED
-                self.state.winner = active_player.name
-
-            self.state.idx_player_active = (self.state.idx_player_active + 1) % 2
-
-        self.set_state(self.state)
+                if active_board.cnt_hits == enemy_board.cnt_ship_cells:
+                    self.state.phase = GamePhase.FINISHED
+                    self.state.winner = idx_active
+            if self.list_listener:
+                self._emit_shot(idx_active, shot_place, idx)
+
+            self.state.idx_player_active = (idx_active + 1) % 2
+
+    def _apply_action_set_ship(self, action: BattleshipAction) -> None:
+        """ Place a ship of the active player """
+        idx_active = self.state.idx_player_active
+        active_board = self.boards[idx_active]
+        ship_name = action.ship_name
+        ship_location = action.location
+
+        if not self.__can_we_place_ship(active_board, ship_location):
+            raise ValueError("Invalid ship placement.")
+
+        self.state.players[idx_active].ships.append(Ship(ship_name, len(ship_location), list(ship_location)))
+        self._toggle_cells(0, idx_active, get_mask(ship_location, self.config.board_size) & ~active_board.ships)
+        active_board.add_ship([get_idx(location, self.config.board_size) for location in ship_location])
+        if self.list_listener:
+            self.emit(ShipPlaced(idx_active, ship_name or '', tuple(ship_location)))
+
+        if all(len(player.ships) >= len(self.config.fleet) for player in self.state.players):
+            self.state.phase = GamePhase.RUNNING
+
+        self.state.idx_player_active = (idx_active + 1) % 2
+
+    def _emit_shot(self, idx_player: int, location: str, idx: int) -> None:
+        """ Send the event of a player's shot at a cell to the listeners """
+        enemy_board = self.boards[(idx_player + 1) % 2]
+        idx_ship = enemy_board.dict_idx_ship.get(idx, -1)
+        if idx_ship < 0:
+            self.emit(ShotMissed(idx_player, location))
+            return
+        mask_ship = enemy_board.list_ship_mask[idx_ship]
+        self.emit(ShotHit(idx_player, location, self.state.players[(idx_player + 1) % 2].ships[idx_ship].name,
+                          self.boards[idx_player].hits & mask_ship == mask_ship))
+
+    def is_ship_sunk(self, idx_player: int, location: str) -> bool:
+        """ Check whether the enemy ship hit at the given location by the player is sunk """
+        active_board = self.boards[idx_player]
+        enemy_board = self.boards[(idx_player + 1) % 2]
+        idx_ship = enemy_board.dict_idx_ship.get(get_idx(location, self.config.board_size), -1)
+        if idx_ship < 0:
+            return False
+        mask = enemy_board.list_ship_mask[idx_ship]
+        return active_board.hits & mask == mask
 
     def get_player_view(self, idx_player: int) -> BattleshipGameState:
-        """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        pass
-
-
-class RandomPlayer(Player):
-
-    def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> Optional[BattleshipAction]:
-        """ Given masked game state and possible actions, select the next action """
-        if len(actions) > 0:
-            return random.choice(actions)
-        return None
+        """ Get the masked state for the given player (only the opponent's sunk ships are revealed) """
+        board = self.boards[idx_player]
+        players = []
+        for idx, player in enumerate(self.state.players):
+            ships = player.ships
+            if idx != idx_player:
+                list_mask = self.boards[idx].list_ship_mask
+                ships = [ship for ship, mask in zip(ships, list_mask) if board.hits & mask == mask]
+            ships = [Ship(ship.name, ship.length, list(ship.location or [])) for ship in ships]
+            players.append(PlayerState(name=player.name, ships=ships, shots=list(player.shots),
+                                       successful_shots=list(player.successful_shots)))
+        return BattleshipGameState(idx_player_active=self.state.idx_player_active, phase=self.state.phase,
+                                   winner=self.state.winner, players=players, board_size=self.state.board_size)
+
+    def encode_state_parts(self) -> List[bytes]:
+        """ Compact binary encoding of the complete state (locations as cell indices, one byte each up to 16x16),
+        split into the header, the ships and the shots of each player """
+        state = self.state
+        dtype = np.uint8 if state.board_size <= 16 else np.uint16
+        writer = StateWriter(VERSION_CODEC)
+        writer.write_u8(list(GamePhase).index(state.phase))
+        writer.write_u8(state.board_size)
+        writer.write_u8(state.idx_player_active)
+        writer.write_optional_int(state.winner)
+        writer.write_u8(len(state.players))
+        for player in state.players:
+            writer.split()
+            writer.write_str(player.name)
+            writer.write_u8(len(player.ships))
+            for ship in player.ships:
+                code_ship = DICT_SHIP_CODE.get(ship.name, CODE_SHIP_OTHER)
+                writer.write_u8(code_ship)
+                if code_ship == CODE_SHIP_OTHER:
+                    writer.write_str(ship.name)
+                writer.write_u8(ship.length)
+                writer.write_bool(ship.location is not None)
+                if ship.location is not None:
+                    writer.write_array([get_idx(location, state.board_size) for location in ship.location], dtype)
+            writer.split()
+            writer.write_array([get_idx(location, state.board_size) for location in player.shots], dtype)
+            writer.write_array([get_idx(location, state.board_size) for location in player.successful_shots], dtype)
+        return writer.get_parts()
+
+    def decode_state(self, data: bytes) -> BattleshipGameState:  # pylint: disable=too-many-locals
+        """ State of an encoding of 'encode_state' (the game itself is not changed) """
+        reader = StateReader(data, VERSION_CODEC)
+        phase = list(GamePhase)[reader.read_u8()]
+        board_size = reader.read_u8()
+        list_location = get_board_config(board_size).get_list_location()
+        dtype = np.uint8 if board_size <= 16 else np.uint16
+        idx_player_active = reader.read_u8()
+        winner = reader.read_optional_int()
+        players = []
+        for _ in range(reader.read_u8()):
+            name = reader.read_str()
+            ships = []
+            for _ in range(reader.read_u8()):
+                code_ship = reader.read_u8()
+                ship_name = reader.read_str() if code_ship == CODE_SHIP_OTHER else LIST_SHIP[code_ship][0]
+                length = reader.read_u8()
+                location = [list_location[idx] for idx in reader.read_array(dtype)] if reader.read_bool() else None
+                ships.append(Ship(name=ship_name, length=length, location=location))
+            shots = [list_location[idx] for idx in reader.read_array(dtype)]
+            successful_shots = [list_location[idx] for idx in reader.read_array(dtype)]
+            players.append(PlayerState(name=name, ships=ships, shots=shots, successful_shots=successful_shots))
+        return BattleshipGameState(idx_player_active=idx_player_active, phase=phase, winner=winner, players=players,
+                                   board_size=board_size)
+
+
+class RandomPlayer(UniformPlayer):
+    """ Random player of Battleship """
 
 
 if __name__ == "__main__":
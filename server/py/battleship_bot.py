@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from server.py.game import Player, Seed
+from server.py.battleship import (BattleshipGameState, BattleshipAction, GamePhase, get_board_config, get_idx,
+                                  get_list_placement)
+
+
+CNT_FLEET_EXACT = 20000   # max number of fleet combinations to enumerate exactly
+CNT_SAMPLES = 4000        # number of fleets drawn per move when sampling
+CNT_SAMPLES_MIN = 100     # min number of consistent sampled fleets, else fall back to the weighted marginals
+WEIGHT_HIT = 50.0         # weight of each open hit covered by a placement in the marginal fallback
+
+DICT_PLACEMENT: Dict[Tuple[int, int], np.ndarray] = {}
+""" Placement matrix (placements x ship length) of cell indices of each (board size, ship length) in use """
+
+
+def get_placement(length: int, board_size: int) -> np.ndarray:
+    """ Cell indices of every placement of a ship of the given length (built once per board size) """
+    if (board_size, length) not in DICT_PLACEMENT:
+        DICT_PLACEMENT[(board_size, length)] = np.array(get_list_placement(length, board_size), dtype=np.int32)
+    return DICT_PLACEMENT[(board_size, length)]
+
+
+def get_cell_mask(list_location: List[str], board_size: int) -> np.ndarray:
+    """ Boolean cell vector of the given location names """
+    cells = np.zeros(board_size * board_size, dtype=bool)
+    cells[[get_idx(location, board_size) for location in list_location]] = True
+    return cells
+
+
+def get_list_valid(list_length: List[int], blocked: np.ndarray, board_size: int) -> List[np.ndarray]:
+    """ Placements of each remaining ship which do not touch a blocked cell (miss or sunk ship) """
+    dict_valid = {}
+    for length in set(list_length):
+        placement = get_placement(length, board_size)
+        dict_valid[length] = placement[~blocked[placement].any(axis=1)]
+    return [dict_valid[length] for length in list_length]
+
+
+def get_density_exact(list_valid: List[np.ndarray], hits: np.ndarray) -> np.ndarray:
+    """ Enumerate all non-overlapping fleets covering every open hit and count the ships on each cell """
+    fleet = np.zeros((1, 0), dtype=np.int32)
+    for valid in list_valid:
+        overlap = (fleet[:, None, :, None] == valid[None, :, None, :]).any(axis=(2, 3))
+        idx_fleet, idx_valid = np.nonzero(~overlap)
+        fleet = np.concatenate([fleet[idx_fleet], valid[idx_valid]], axis=1)
+    fleet = fleet[hits[fleet].sum(axis=1) == hits.sum()]
+    density: np.ndarray = np.bincount(fleet.ravel(), minlength=hits.size).astype(float)
+    return density
+
+
+def get_density_sampled(list_valid: List[np.ndarray], hits: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """ Draw random fleets, reject overlapping ones and those missing an open hit, and count the ships per cell """
+    fleet = np.concatenate([valid[rng.integers(len(valid), size=CNT_SAMPLES)] for valid in list_valid], axis=1)
+    fleet_sorted = np.sort(fleet, axis=1)
+    is_consistent = ~(fleet_sorted[:, 1:] == fleet_sorted[:, :-1]).any(axis=1) & \
+        (hits[fleet].sum(axis=1) == hits.sum())
+    if is_consistent.sum() < CNT_SAMPLES_MIN:
+        return get_density_marginal(list_valid, hits)
+    density: np.ndarray = np.bincount(fleet[is_consistent].ravel(), minlength=hits.size).astype(float)
+    return density
+
+
+def get_density_marginal(list_valid: List[np.ndarray], hits: np.ndarray) -> np.ndarray:
+    """ Sum the placements of each ship on its own, placements through open hits weighted higher """
+    density = np.zeros(hits.size)
+    for valid in list_valid:
+        weight = 1.0 + WEIGHT_HIT * hits[valid].sum(axis=1)
+        density += np.bincount(valid.ravel(), weights=np.repeat(weight, valid.shape[1]), minlength=hits.size)
+    return density
+
+
+def get_density(  # pylint: disable=too-many-arguments
+        list_length: List[int], shots: np.ndarray, hits: np.ndarray, sunk: np.ndarray,
+        rng: np.random.Generator, board_size: int) -> np.ndarray:
+    """ Number of consistent fleets (resp. samples) with a ship on each cell, exact if the fleet space is small """
+    blocked = (shots & ~hits) | sunk
+    hits_open = hits & ~sunk
+    list_valid = get_list_valid(list_length, blocked, board_size)
+    if any(len(valid) == 0 for valid in list_valid):
+        return np.zeros(hits.size)
+    cnt_fleet = 1
+    for valid in list_valid:
+        cnt_fleet *= len(valid)
+    if cnt_fleet <= CNT_FLEET_EXACT:
+        density = get_density_exact(list_valid, hits_open)
+    else:
+        density = get_density_sampled(list_valid, hits_open, rng)
+    density[shots] = 0.0
+    return density
+
+
+class DensityPlayer(Player):
+    """ Shoots at the cell most likely to hold a ship given the observed hits, misses and sunk ships """
+
+    def __init__(self, seed: Seed = None) -> None:
+        self.generator = np.random.default_rng(seed)
+
+    def seed(self, seed: Seed) -> None:
+        """ Seed the NumPy generator of the sampled fleets and the ties """
+        self.generator = np.random.default_rng(seed)
+
+    def select_action(self, state: BattleshipGameState, actions: List[BattleshipAction]) -> Optional[BattleshipAction]:
+        """ Given masked game state and possible actions, select the next action """
+        if len(actions) == 0:
+            return None
+        if state.phase != GamePhase.RUNNING:
+            return actions[self.generator.integers(len(actions))]
+
+        config = get_board_config(state.board_size)
+        player = state.players[state.idx_player_active]
+        enemy = state.players[(state.idx_player_active + 1) % 2]
+        shots = get_cell_mask(player.shots, config.board_size)
+        hits = get_cell_mask(player.successful_shots, config.board_size)
+
+        sunk = np.zeros_like(shots)
+        list_length = [length for _, length in config.fleet]
+        for ship in enemy.ships:
+            cells = get_cell_mask(ship.location or [], config.board_size)
+            if ship.length in list_length and not (cells & ~hits).any():
+                sunk |= cells
+                list_length.remove(ship.length)
+
+        density = get_density(list_length, shots, hits, sunk, self.generator, config.board_size)
+        if density.max() <= 0.0:
+            density = (~shots).astype(float)
+        list_idx = np.flatnonzero(density == density.max())
+        return config.get_list_action_shoot()[int(self.generator.choice(list_idx))]
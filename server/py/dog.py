@@ -1,8 +1,15 @@
-from server.py.game import Game, Player
-from typing import List, Optional, ClassVar
-from pydantic import BaseModel
+from typing import Callable, Iterator, List, NamedTuple, Optional, ClassVar, Dict, Tuple
+from collections import Counter
 from enum import Enum
 import random
+from pydantic import BaseModel
+from server.py.game import (Game, UniformPlayer, Snapshot, DICT_SNAPSHOT_LAST, construct_trusted,
+                            copy_trusted)
+from server.py.state_codec import StateWriter, StateReader
+from server.py.tracing import get_tracer
+from server.py.zobrist import get_keys, get_key
+from server.py.dog_movegen import (CNT_STEPS, CNT_BALLS, LIST_RANK_START, RANK_SPLIT, DICT_MOVEGEN_GENERATED,
+                                   MoveGen)
 
 
 class Card(BaseModel):
@@ -25,7 +32,57 @@ class Action(BaseModel):
     card: Card                 # card to play
     pos_from: Optional[int]    # position to move the marble from
     pos_to: Optional[int]      # position to move the marble to
-    card_swap: Optional[Card]  # optional card to swap ()
+    card_swap: Optional[Card] = None  # optional card to swap ()
+
+
+class CardDealt(NamedTuple):
+    """ Event: a card was dealt to a player """
+    idx_player: int
+    card: Card
+
+
+class CardsReshuffled(NamedTuple):
+    """ Event: all cards were shuffled into a new draw pile (the discard pile is empty) """
+    cnt_cards: int
+
+
+class CardExchanged(NamedTuple):
+    """ Event: a player gave a card to the partner at the start of a round """
+    idx_player: int
+    idx_partner: int
+    card: Card
+
+
+class CardPlayed(NamedTuple):
+    """ Event: a player played a card (put on the discard pile unless it stands in for a JOKER) """
+    idx_player: int
+    card: Card
+
+
+class CardFolded(NamedTuple):
+    """ Event: a player without a possible action discarded a card """
+    idx_player: int
+    card: Card
+
+
+class MarbleMoved(NamedTuple):
+    """ Event: a marble of the owner moved (also swapped by a JACK) """
+    idx_owner: int
+    pos_from: int
+    pos_to: int
+
+
+class MarbleSentHome(NamedTuple):
+    """ Event: a marble of the owner was sent back to its kennel """
+    idx_owner: int
+    pos_from: int
+    pos_to: int
+
+
+class SevenUndone(NamedTuple):
+    """ Event: the moves of an unfinished SEVEN were taken back (the state is as before the SEVEN, the card played) """
+    idx_player: int
+    card: Card
 
 
 class GamePhase(str, Enum):
@@ -84,44 +141,698 @@ class GameState(BaseModel):
     card_active: Optional[Card]        # active card (for 7 and JKR with sequence of actions)
 
 
-class Dog(Game):
+LIST_CARD_CODE: List[Card] = [Card(suit='', rank='')]   # card back (masked cards) and distinct cards of the deck
+for card_deck in GameState.LIST_CARD:
+    if card_deck not in LIST_CARD_CODE:
+        LIST_CARD_CODE.append(card_deck)
+DICT_CARD_CODE: Dict[Tuple[str, str], int] = {(card.suit, card.rank): code for code, card in enumerate(LIST_CARD_CODE)}
+CODE_CARD_OTHER = 255   # code of a card not in LIST_CARD_CODE (its suit and rank follow the list of codes)
+VERSION_CODEC = 1       # version of the binary state encoding (first byte of an encoded state)
+TRACER = get_tracer('dog')
+
+CNT_KEYS_COPY = 8       # Zobrist keys of the copies of a card in a hand repeat after this many copies
+CNT_KEYS_POS = 128      # Zobrist keys of the positions in a pile and on the board repeat after this many
+KEYS_HAND: List[List[List[int]]] = get_keys('dog.hand', 4, CODE_CARD_OTHER + 1, CNT_KEYS_COPY)  # player, code, copy
+KEYS_DRAW: List[List[int]] = get_keys('dog.draw', CNT_KEYS_POS, CODE_CARD_OTHER + 1)     # position in pile, code
+KEYS_DISCARD: List[List[int]] = get_keys('dog.discard', CNT_KEYS_POS, CODE_CARD_OTHER + 1)
+KEYS_MARBLE: List[List[int]] = get_keys('dog.marble', 4, CNT_KEYS_POS)     # owner, position of a marble
+KEYS_SAVE: List[List[int]] = get_keys('dog.save', 4, CNT_KEYS_POS)         # owner, position of a save marble
+KEYS_FIELD: List[List[int]] = get_keys('dog.field', 5, 257)  # cnt_round, idx_player_started, idx_player_active,
+                                                             # card_active code, cnt_steps_seven (last key: None)
+KEY_CARD_EXCHANGED: int = get_keys('dog.exchanged', 1)[0]    # used when the cards were exchanged
+DICT_KEY_PHASE: Dict[GamePhase, int] = dict(zip(GamePhase, get_keys('dog.phase', len(GamePhase))))
+
+
+def get_card_code(card: Card) -> int:
+    """ Code of a card (CODE_CARD_OTHER if it is not in LIST_CARD_CODE) """
+    return DICT_CARD_CODE.get((card.suit, card.rank), CODE_CARD_OTHER)
+
+
+def get_key_hand(idx_player: int, list_card: List[Card], card: Card) -> int:
+    """ Zobrist key of a card added to (or removed from) a hand: one key per copy of the card in the hand, the copy
+    is the number of equal cards in the hand before adding (after removing) it """
+    code = get_card_code(card)
+    copy = sum(1 for card_hand in list_card if get_card_code(card_hand) == code)
+    return KEYS_HAND[idx_player % 4][code][copy % CNT_KEYS_COPY]
+
+
+def get_key_marble(idx_player: int, marble: Marble) -> int:
+    """ Zobrist key of a marble at its position """
+    key = KEYS_MARBLE[idx_player % 4][marble.pos % CNT_KEYS_POS]
+    if marble.is_save:
+        key ^= KEYS_SAVE[idx_player % 4][marble.pos % CNT_KEYS_POS]
+    return key
+
+
+def get_hash_items(state: GameState) -> int:
+    """ Zobrist hash of the hands (sets of cards), the draw and discard piles (ordered) and the marbles of a state """
+    hash_items = 0
+    for keys, list_card in ((KEYS_DRAW, state.list_card_draw), (KEYS_DISCARD, state.list_card_discard)):
+        for pos, card in enumerate(list_card):
+            hash_items ^= keys[pos % CNT_KEYS_POS][get_card_code(card)]
+    for idx_player, player in enumerate(state.list_player):
+        dict_cnt_code: Dict[int, int] = {}
+        for card in player.list_card:
+            code = get_card_code(card)
+            copy = dict_cnt_code[code] = dict_cnt_code.get(code, -1) + 1
+            hash_items ^= KEYS_HAND[idx_player % 4][code][copy % CNT_KEYS_COPY]
+        for marble in player.list_marble:
+            hash_items ^= get_key_marble(idx_player, marble)
+    return hash_items
+
+
+def get_hash_fields(state: GameState, cnt_steps_seven: Optional[int]) -> int:
+    """ Zobrist hash of the other fields of a state and the remaining steps of a SEVEN (names are not hashed) """
+    code_card_active = None if state.card_active is None else get_card_code(state.card_active)
+    hash_fields = DICT_KEY_PHASE[state.phase] ^ (KEY_CARD_EXCHANGED if state.bool_card_exchanged else 0)
+    for keys, value in zip(KEYS_FIELD, (state.cnt_round, state.idx_player_started, state.idx_player_active,
+                                        code_card_active, cnt_steps_seven)):
+        hash_fields ^= get_key(keys, value)
+    return hash_fields
+
+
+def write_list_card(writer: StateWriter, list_card: List[Card]) -> None:
+    """ Write a list of cards as one byte per card """
+    list_code = [DICT_CARD_CODE.get((card.suit, card.rank), CODE_CARD_OTHER) for card in list_card]
+    writer.write_array(list_code)
+    for card, code in zip(list_card, list_code):
+        if code == CODE_CARD_OTHER:
+            writer.write_str(card.suit)
+            writer.write_str(card.rank)
+
+
+def read_list_card(reader: StateReader) -> List[Card]:
+    """ Read a list of cards written by write_list_card """
+    return [LIST_CARD_CODE[code] if code != CODE_CARD_OTHER else
+            construct_trusted(Card, suit=reader.read_str(), rank=reader.read_str()) for code in reader.read_array()]
+
+
+def write_state(writer: StateWriter, state: GameState) -> None:
+    """ Write a state (see Dog.encode_state_parts) """
+    writer.write_u8(list(GamePhase).index(state.phase))
+    for value in (state.cnt_player, state.cnt_round, state.idx_player_started, state.idx_player_active):
+        writer.write_int(value)
+    writer.write_bool(state.bool_card_exchanged)
+    writer.write_u8(len(state.list_player))
+    for player in state.list_player:
+        writer.split()
+        writer.write_str(player.name)
+        write_list_card(writer, player.list_card)
+        writer.write_array([marble.pos for marble in player.list_marble])
+        writer.write_array([marble.is_save for marble in player.list_marble])
+    writer.split()
+    write_list_card(writer, state.list_card_draw)
+    writer.split()
+    write_list_card(writer, state.list_card_discard)
+    write_list_card(writer, [] if state.card_active is None else [state.card_active])
+
+
+def read_state(reader: StateReader) -> GameState:  # pylint: disable=too-many-locals
+    """ Read a state written by write_state """
+    phase = list(GamePhase)[reader.read_u8()]
+    cnt_player, cnt_round, idx_player_started, idx_player_active = (reader.read_int() for _ in range(4))
+    bool_card_exchanged = reader.read_bool()
+    list_player = []
+    for _ in range(reader.read_u8()):
+        name = reader.read_str()
+        list_card = read_list_card(reader)
+        list_marble = [construct_trusted(Marble, pos=pos, is_save=bool(is_save))
+                       for pos, is_save in zip(reader.read_array(), reader.read_array())]
+        list_player.append(construct_trusted(PlayerState, name=name, list_card=list_card, list_marble=list_marble))
+    list_card_draw = read_list_card(reader)
+    list_card_discard = read_list_card(reader)
+    list_card_active = read_list_card(reader)
+    return construct_trusted(GameState, cnt_player=cnt_player, phase=phase, cnt_round=cnt_round,
+                             bool_card_exchanged=bool_card_exchanged, idx_player_started=idx_player_started,
+                             idx_player_active=idx_player_active, list_player=list_player,
+                             list_card_draw=list_card_draw, list_card_discard=list_card_discard,
+                             card_active=list_card_active[0] if list_card_active else None)
+
+
+def copy_state(state: GameState) -> GameState:
+    """ Copy of a state without validation, for the engine's own copies: new lists and marbles, the cards are
+    shared (the engine never changes a card, the deck itself is dealt) """
+    return copy_trusted(
+        state, list_player=[copy_trusted(player, list_card=list(player.list_card),
+                                         list_marble=[copy_trusted(marble) for marble in player.list_marble])
+                            for player in state.list_player],
+        list_card_draw=list(state.list_card_draw), list_card_discard=list(state.list_card_discard))
+
+
+ActionGroup = Tuple[int, Callable[[int], Action]]   # number of actions, function building the i-th action
+
+
+def get_action_none(idx: int) -> Action:
+    """ Action of an empty group (never called) """
+    raise IndexError(idx)
+
+
+def determinize(state: GameState, rng: random.Random) -> GameState:
+    """ Complete state consistent with a player's view: the face down cards (card backs) of the other hands and of
+    the draw pile are dealt at random from the cards not seen (the deck minus the visible cards) """
+    state = copy_state(state)
+    card_back = LIST_CARD_CODE[0]
+    cnt_unseen = Counter((card.suit, card.rank) for card in GameState.LIST_CARD)
+    list_back: List[Tuple[List[Card], int]] = []
+    for list_card in [player.list_card for player in state.list_player] + [state.list_card_draw]:
+        for idx, card in enumerate(list_card):
+            if card == card_back:
+                list_back.append((list_card, idx))
+            else:
+                cnt_unseen[(card.suit, card.rank)] -= 1
+    for card in state.list_card_discard:
+        cnt_unseen[(card.suit, card.rank)] -= 1
+    list_unseen = [LIST_CARD_CODE[DICT_CARD_CODE[key]] for key, cnt in cnt_unseen.items() for _ in range(cnt)]
+    rng.shuffle(list_unseen)
+    while len(list_unseen) < len(list_back):   # more face down cards than cards not seen: not a state of one deck
+        list_unseen.append(rng.choice(GameState.LIST_CARD))
+    for (list_card, idx), card in zip(list_back, list_unseen):
+        list_card[idx] = card
+    return state
+
+
+class Dog(Game):  # pylint: disable=too-many-public-methods
+
+    CNT_STEPS: ClassVar[int] = CNT_STEPS  # number of positions on the track
+    CNT_BALLS: ClassVar[int] = CNT_BALLS  # number of marbles per player
+    DICT_MOVEGEN: ClassVar[Dict[str, MoveGen]] = DICT_MOVEGEN_GENERATED  # move generator per rank
+    CNT_TEAMS: ClassVar[int] = 2  # the team t are the partners in the seats t and t + 2
 
     def __init__(self) -> None:
         """ Game initialization (set_state call not necessary, we expect 4 players) """
-        pass
+        self.state: GameState
+        self.cnt_steps_seven: Optional[int] = None       # remaining steps of the SEVEN being played
+        self.state_seven: Optional[GameState] = None     # state before the SEVEN (to reset if it can't be finished)
+        self.hash_items = 0   # Zobrist hash of the cards and marbles (the other fields are hashed on demand)
+        self.start()
+
+    def start(self, rng: Optional[random.Random] = None) -> None:
+        """ Start a new game: shuffle the cards and deal the first round (a given generator becomes the game's) """
+        if rng is not None:
+            self.rng = rng
+        list_card_draw = list(GameState.LIST_CARD)
+        self.rng.shuffle(list_card_draw)
+        list_player = []
+        for idx_player in range(4):
+            pos_kennel = self.get_pos_kennel(idx_player)
+            list_marble = [construct_trusted(Marble, pos=pos_kennel + idx_marble, is_save=False)
+                           for idx_marble in range(self.CNT_BALLS)]
+            list_player.append(construct_trusted(PlayerState, name=f'Player {idx_player + 1}', list_card=[],
+                                                 list_marble=list_marble))
+
+        state = construct_trusted(GameState, cnt_player=4, phase=GamePhase.RUNNING, cnt_round=1,
+                                  bool_card_exchanged=False, idx_player_started=0, idx_player_active=0,
+                                  list_player=list_player, list_card_draw=list_card_draw, list_card_discard=[],
+                                  card_active=None)
+        self.set_state(state)
+        self.deal_cards(self.get_cnt_cards_round(state.cnt_round))
 
     def set_state(self, state: GameState) -> None:
         """ Set the game to a given state """
-        pass
+        self.state = state
+        self.cnt_steps_seven = None
+        self.state_seven = None
+        self.hash_items = get_hash_items(state)
 
     def get_state(self) -> GameState:
         """ Get the complete, unmasked game state """
-        pass
+        return self.state
 
     def print_state(self) -> None:
-        """ Print the current game state """
-        pass
+        """ Trace the current game state (level INFO) """
+        if TRACER.is_info:
+            TRACER.info('%s', str(self.state))
+
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the state and the remaining steps of a SEVEN being played """
+        return self.hash_items ^ get_hash_fields(self.state, self.cnt_steps_seven)
+
+    def compute_state_hash(self) -> int:
+        """ The value of 'state_hash' computed from scratch """
+        return get_hash_items(self.state) ^ get_hash_fields(self.state, self.cnt_steps_seven)
+
+    def touch(self) -> None:
+        """ Start a new version and recompute the hash after the state was changed directly """
+        super().touch()
+        self.hash_items = get_hash_items(self.state)
+
+    # --- board helpers ---
+
+    @classmethod
+    def get_pos_start(cls, idx_player: int) -> int:
+        """ Position on the track where the marbles of the player enter from the kennel """
+        return idx_player * cls.CNT_STEPS // 4
+
+    @classmethod
+    def get_pos_kennel(cls, idx_player: int) -> int:
+        """ First kennel position of the player """
+        return cls.CNT_STEPS + idx_player * cls.CNT_BALLS * 2
+
+    @classmethod
+    def get_pos_finish(cls, idx_player: int) -> int:
+        """ First finish position of the player """
+        return cls.CNT_STEPS + idx_player * cls.CNT_BALLS * 2 + cls.CNT_BALLS
+
+    @classmethod
+    def is_in_kennel(cls, pos: int) -> bool:
+        return pos >= cls.CNT_STEPS and (pos - cls.CNT_STEPS) % (cls.CNT_BALLS * 2) < cls.CNT_BALLS
+
+    @classmethod
+    def is_in_finish(cls, pos: int) -> bool:
+        return pos >= cls.CNT_STEPS and (pos - cls.CNT_STEPS) % (cls.CNT_BALLS * 2) >= cls.CNT_BALLS
+
+    @staticmethod
+    def get_cnt_cards_round(cnt_round: int) -> int:
+        """ Number of cards dealt per player in the given round (6, 5, 4, 3, 2, 6, ...) """
+        return 6 - (cnt_round - 1) % 5
+
+    def get_idx_player_marbles(self, idx_player: int) -> int:
+        """ Player whose marbles are moved (the partner's once all own marbles are in the finish) """
+        pos_finish = self.get_pos_finish(idx_player)
+        player = self.state.list_player[idx_player]
+        if all(pos_finish <= marble.pos < pos_finish + self.CNT_BALLS for marble in player.list_marble):
+            return (idx_player + 2) % self.state.cnt_player
+        return idx_player
+
+    def get_dict_board(self) -> Dict[int, Tuple[int, Marble]]:
+        """ Map of all occupied positions to the owner and the marble """
+        return {marble.pos: (idx_player, marble)
+                for idx_player, player in enumerate(self.state.list_player)
+                for marble in player.list_marble}
+
+    def get_finish_occ(self, idx_player: int) -> int:
+        """ Bitmask of the occupied finish positions of the player """
+        pos_finish = self.get_pos_finish(idx_player)
+        finish_occ = 0
+        for marble in self.state.list_player[idx_player].list_marble:
+            if pos_finish <= marble.pos < pos_finish + self.CNT_BALLS:
+                finish_occ |= 1 << (marble.pos - pos_finish)
+        return finish_occ
+
+    def get_blocked(self) -> int:
+        """ Bitmask of the track positions occupied by save marbles """
+        blocked = 0
+        for player in self.state.list_player:
+            for marble in player.list_marble:
+                if marble.is_save and marble.pos < self.CNT_STEPS:
+                    blocked |= 1 << marble.pos
+        return blocked
+
+    # --- actions ---
 
     def get_list_action(self) -> List[Action]:
         """ Get a list of possible actions for the active player """
-        pass
+        return [get_action(idx) for cnt_actions, get_action in self.get_list_group() for idx in range(cnt_actions)]
+
+    def iter_actions(self) -> Iterator[Action]:
+        """ Possible actions one by one, in the order of 'get_list_action' (built when reached) """
+        for cnt_actions, get_action in self.get_list_group():
+            for idx in range(cnt_actions):
+                yield get_action(idx)
+
+    def count_actions(self) -> int:
+        """ Number of possible actions (counted per card without building them) """
+        return sum(cnt_actions for cnt_actions, _ in self.get_list_group())
+
+    def sample_action(self, rng: random.Random) -> Optional[Action]:
+        """ Uniformly random possible action, None if there is none: a group is drawn weighted by its number of
+        actions, then only the drawn action is built """
+        list_group = self.get_list_group()
+        idx = rng.randrange(sum(cnt_actions for cnt_actions, _ in list_group) or 1)
+        for cnt_actions, get_action in list_group:
+            if idx < cnt_actions:
+                return get_action(idx)
+            idx -= cnt_actions
+        return None
 
-    def apply_action(self, action: Action) -> None:
+    def get_list_group(self) -> List[ActionGroup]:
+        """ Possible actions of the active player as groups (number of actions, function building the i-th action),
+        the actions of all groups in order are those of 'get_list_action' """
+        state = self.state
+        if state.phase != GamePhase.RUNNING:
+            return []
+
+        player = state.list_player[state.idx_player_active]
+
+        if not state.bool_card_exchanged:
+            list_card: List[Card] = []
+            for card in player.list_card:
+                if card not in list_card:
+                    list_card.append(card)
+            return [(len(list_card), lambda idx: construct_trusted(Action, card=list_card[idx], pos_from=None,
+                                                                   pos_to=None, card_swap=None))]
+
+        idx_player = self.get_idx_player_marbles(state.idx_player_active)
+        list_group: List[ActionGroup] = []
+        set_card = set()
+        for card in [state.card_active] if state.card_active is not None else player.list_card:
+            if (card.suit, card.rank) in set_card:
+                continue
+            set_card.add((card.suit, card.rank))
+            if card.rank == 'J':
+                list_group.append(self._get_group_jake(card, idx_player))
+                continue
+            if card.rank in LIST_RANK_START:
+                list_group.append(self._get_group_start(card, idx_player))
+            if card.rank == 'JKR':
+                list_group.append(self._get_group_joker(card, idx_player))
+            else:
+                list_group.append(self._get_group_move(card, idx_player))
+        return list_group
+
+    def _get_group_start(self, card: Card, idx_player: int) -> ActionGroup:
+        """ Move a marble out of the kennel to the start """
+        pos_kennel = self.get_pos_kennel(idx_player)
+        pos_start = self.get_pos_start(idx_player)
+        list_marble = self.state.list_player[idx_player].list_marble
+        list_pos_kennel = [marble.pos for marble in list_marble
+                           if pos_kennel <= marble.pos < pos_kennel + self.CNT_BALLS]
+        if not list_pos_kennel or any(marble.pos == pos_start for marble in list_marble):
+            return 0, get_action_none
+        pos_from = min(list_pos_kennel)
+        return 1, lambda idx: construct_trusted(Action, card=card, pos_from=pos_from, pos_to=pos_start, card_swap=None)
+
+    def _get_group_move(self, card: Card, idx_player: int) -> ActionGroup:
+        """ Move a marble on the track or inside the finish with the generated move generator of the rank """
+        movegen = self.DICT_MOVEGEN.get(card.rank)
+        if movegen is None:
+            return 0, get_action_none
+        pos_start = self.get_pos_start(idx_player)
+        pos_finish = self.get_pos_finish(idx_player)
+        finish_occ = self.get_finish_occ(idx_player)
+        blocked = self.get_blocked()
+        cnt_steps = 7 if self.cnt_steps_seven is None else self.cnt_steps_seven
+        list_move: List[Tuple[int, int]] = []
+        for marble in self.state.list_player[idx_player].list_marble:
+            if self.is_in_kennel(marble.pos):
+                continue
+            for pos_to in movegen(marble.pos, marble.is_save, pos_start, pos_finish, finish_occ, blocked, cnt_steps):
+                list_move.append((marble.pos, pos_to))
+        return len(list_move), lambda idx: construct_trusted(
+            Action, card=card, pos_from=list_move[idx][0], pos_to=list_move[idx][1], card_swap=None)
+
+    def _get_group_jake(self, card: Card, idx_player: int) -> ActionGroup:
+        """ Swap an own marble with a marble of another player (or two own marbles if there is no other) """
+        list_pos_own = []
+        list_pos_other = []
+        for idx, player in enumerate(self.state.list_player):
+            for marble in player.list_marble:
+                if marble.pos >= self.CNT_STEPS:
+                    continue
+                if idx == idx_player:
+                    list_pos_own.append(marble.pos)
+                elif not marble.is_save:
+                    list_pos_other.append(marble.pos)
+
+        if list_pos_other:
+            def get_action_swap(idx: int) -> Action:
+                """ Own marble i, other marble j, direction k at index (i * others + j) * 2 + k """
+                idx_pair, is_back = divmod(idx, 2)
+                pos_own, pos_other = list_pos_own[idx_pair // len(list_pos_other)], \
+                    list_pos_other[idx_pair % len(list_pos_other)]
+                pos_from, pos_to = (pos_other, pos_own) if is_back else (pos_own, pos_other)
+                return construct_trusted(Action, card=card, pos_from=pos_from, pos_to=pos_to, card_swap=None)
+            return 2 * len(list_pos_own) * len(list_pos_other), get_action_swap
+
+        cnt_own = len(list_pos_own)
+
+        def get_action_own(idx: int) -> Action:
+            """ Own marble i to own marble j != i at index i * (own - 1) + (j if j < i else j - 1) """
+            idx_from, idx_to = divmod(idx, cnt_own - 1)
+            idx_to += idx_to >= idx_from
+            return construct_trusted(Action, card=card, pos_from=list_pos_own[idx_from], pos_to=list_pos_own[idx_to],
+                                     card_swap=None)
+        return cnt_own * (cnt_own - 1), get_action_own
+
+    def _get_group_joker(self, card: Card, idx_player: int) -> ActionGroup:
+        """ Replace the JOKER by any other card (only start cards while all marbles are in the kennel) """
+        list_marble = self.state.list_player[idx_player].list_marble
+        if all(self.is_in_kennel(marble.pos) for marble in list_marble):
+            list_rank = ['A', 'K']
+        else:
+            list_rank = [rank for rank in GameState.LIST_RANK if rank != 'JKR']
+        return len(GameState.LIST_SUIT) * len(list_rank), lambda idx: construct_trusted(
+            Action, card=card, pos_from=None, pos_to=None, card_swap=construct_trusted(
+                Card, suit=GameState.LIST_SUIT[idx // len(list_rank)], rank=list_rank[idx % len(list_rank)]))
+
+    def apply_action(self, action: Optional[Action]) -> None:
         """ Apply the given action to the game """
-        pass
+        state = self.state
+        if state.phase != GamePhase.RUNNING:
+            raise ValueError("Game is not running.")
+
+        if action is None:
+            self._apply_action_none()
+            return
+
+        if not state.bool_card_exchanged:
+            self._remove_card(state.idx_player_active, action.card)
+            self._add_card((state.idx_player_active + 2) % state.cnt_player, action.card)
+            if self.list_listener:
+                self.emit(CardExchanged(state.idx_player_active, (state.idx_player_active + 2) % state.cnt_player,
+                                        action.card))
+            state.idx_player_active = (state.idx_player_active + 1) % state.cnt_player
+            if len({len(p.list_card) for p in state.list_player}) == 1:
+                state.bool_card_exchanged = True
+            return
+
+        if action.card_swap is not None:
+            self._remove_card(state.idx_player_active, action.card)
+            self._discard_card(action.card)
+            state.card_active = action.card_swap
+            if self.list_listener:
+                self.emit(CardPlayed(state.idx_player_active, action.card))
+            return
+
+        if action.pos_from is None or action.pos_to is None:
+            raise ValueError(f"Invalid action: {action}")
+
+        dict_board = self.get_dict_board()
+        if action.pos_from not in dict_board:
+            raise ValueError(f"No marble at position {action.pos_from}.")
+        idx_owner, marble = dict_board[action.pos_from]
+
+        if action.card.rank == 'J':
+            self._play_card(action.card)
+            idx_owner_other, marble_other = dict_board[action.pos_to]
+            self._move_marble(idx_owner, marble, action.pos_to, False)
+            self._move_marble(idx_owner_other, marble_other, action.pos_from, False)
+            self._end_turn()
+            return
+
+        if self.is_in_kennel(action.pos_from):
+            self._play_card(action.card)
+            self._send_home_at(dict_board, action.pos_to)
+            self._move_marble(idx_owner, marble, action.pos_to, True)
+            self._end_turn()
+            return
+
+        if action.card.rank == RANK_SPLIT:
+            self._apply_action_seven(action, dict_board, idx_owner, marble)
+            return
+
+        self._play_card(action.card)
+        self._send_home_at(dict_board, action.pos_to)
+        self._move_marble(idx_owner, marble, action.pos_to, False)
+        self._end_turn()
+
+    def _apply_action_seven(self, action: Action, dict_board: Dict[int, Tuple[int, Marble]],
+                            idx_owner: int, marble: Marble) -> None:
+        """ Move a marble some steps of the SEVEN, sending home all marbles it passes """
+        state = self.state
+        assert action.pos_from is not None and action.pos_to is not None
+        if self.cnt_steps_seven is None:
+            self.state_seven = copy_state(state)
+            self.cnt_steps_seven = 7
+            if state.card_active is None:
+                self._play_card(action.card)
+            state.card_active = action.card
+
+        pos_from, pos_to = action.pos_from, action.pos_to
+        if pos_from >= self.CNT_STEPS:
+            steps_track = 0
+            steps = pos_to - pos_from
+        elif pos_to >= self.CNT_STEPS:
+            steps_track = (self.get_pos_start(idx_owner) - pos_from) % self.CNT_STEPS
+            steps = steps_track + pos_to - self.get_pos_finish(idx_owner) + 1
+        else:
+            steps_track = steps = (pos_to - pos_from) % self.CNT_STEPS
+
+        for k in range(1, steps_track + 1):
+            self._send_home_at(dict_board, (pos_from + k) % self.CNT_STEPS)
+        self._send_home_at(dict_board, pos_to)
+        self._move_marble(idx_owner, marble, pos_to, False)
+
+        self.cnt_steps_seven -= steps
+        if self.cnt_steps_seven <= 0:
+            self.cnt_steps_seven = None
+            self.state_seven = None
+            self._end_turn()
+        elif self._is_game_finished():
+            state.phase = GamePhase.FINISHED
+
+    def _apply_action_none(self) -> None:
+        """ No action possible: reset an unfinished SEVEN (the hash is recomputed) or fold all cards """
+        state = self.state
+        if self.state_seven is not None and state.card_active is not None:
+            card_seven = state.card_active
+            state = self.state = self.state_seven
+            self.hash_items = get_hash_items(state)
+            if self.list_listener:
+                self.emit(SevenUndone(state.idx_player_active, card_seven))
+            if state.card_active is None:
+                self._remove_card(state.idx_player_active, card_seven)
+                self._discard_card(card_seven)
+            self.cnt_steps_seven = None
+            self.state_seven = None
+        else:
+            for card in list(state.list_player[state.idx_player_active].list_card):
+                self._remove_card(state.idx_player_active, card)
+                self._discard_card(card)
+                if self.list_listener:
+                    self.emit(CardFolded(state.idx_player_active, card))
+        self._end_turn()
+
+    def _play_card(self, card: Card) -> None:
+        """ Discard the played card (unless it replaces a JOKER) """
+        if self.state.card_active is not None:
+            return
+        self._remove_card(self.state.idx_player_active, card)
+        self._discard_card(card)
+        if self.list_listener:
+            self.emit(CardPlayed(self.state.idx_player_active, card))
+
+    def _remove_card(self, idx_player: int, card: Card) -> None:
+        """ Remove a card from the hand of a player """
+        list_card = self.state.list_player[idx_player].list_card
+        list_card.remove(card)
+        self.hash_items ^= get_key_hand(idx_player, list_card, card)
+
+    def _add_card(self, idx_player: int, card: Card) -> None:
+        """ Add a card to the hand of a player """
+        list_card = self.state.list_player[idx_player].list_card
+        self.hash_items ^= get_key_hand(idx_player, list_card, card)
+        list_card.append(card)
+
+    def _discard_card(self, card: Card) -> None:
+        """ Put a card on the discard pile """
+        list_card_discard = self.state.list_card_discard
+        self.hash_items ^= KEYS_DISCARD[len(list_card_discard) % CNT_KEYS_POS][get_card_code(card)]
+        list_card_discard.append(card)
+
+    def _move_marble(self, idx_owner: int, marble: Marble, pos: int, is_save: bool,  # pylint: disable=too-many-arguments
+                     is_sent_home: bool = False) -> None:
+        """ Move a marble of the given owner """
+        if self.list_listener:
+            self.emit(MarbleSentHome(idx_owner, marble.pos, pos) if is_sent_home else
+                      MarbleMoved(idx_owner, marble.pos, pos))
+        self.hash_items ^= get_key_marble(idx_owner, marble)
+        marble.pos = pos
+        marble.is_save = is_save
+        self.hash_items ^= get_key_marble(idx_owner, marble)
+
+    def _send_home_at(self, dict_board: Dict[int, Tuple[int, Marble]], pos: int) -> None:
+        """ Send the marble on the given track position (if any) back to its kennel """
+        if pos >= self.CNT_STEPS or pos not in dict_board:
+            return
+        idx_owner, marble = dict_board.pop(pos)
+        pos_kennel = self.get_pos_kennel(idx_owner)
+        set_pos = {m.pos for m in self.state.list_player[idx_owner].list_marble}
+        self._move_marble(idx_owner, marble,
+                          next(p for p in range(pos_kennel, pos_kennel + self.CNT_BALLS) if p not in set_pos), False,
+                          is_sent_home=True)
+
+    def get_team_won(self) -> Optional[int]:
+        """ Team that has won (all marbles of both partners are in their finish), None while no team has """
+        for idx_team in range(self.CNT_TEAMS):
+            if all(self.is_in_finish(marble.pos)
+                   for idx_player in (idx_team, idx_team + 2)
+                   for marble in self.state.list_player[idx_player].list_marble):
+                return idx_team
+        return None
+
+    def _is_game_finished(self) -> bool:
+        """ A team has won """
+        return self.get_team_won() is not None
+
+    def _end_turn(self) -> None:
+        """ Continue with the next player and start a new round once all cards are played """
+        state = self.state
+        state.card_active = None
+        if self._is_game_finished():
+            state.phase = GamePhase.FINISHED
+            return
+        state.idx_player_active = (state.idx_player_active + 1) % state.cnt_player
+        if state.idx_player_active == state.idx_player_started and \
+                all(len(player.list_card) == 0 for player in state.list_player):
+            state.cnt_round += 1
+            state.idx_player_started = (state.idx_player_started + 1) % state.cnt_player
+            state.bool_card_exchanged = False
+            self.deal_cards(self.get_cnt_cards_round(state.cnt_round))
+
+    def deal_cards(self, cnt_cards: int) -> None:
+        """ Deal the cards of a round, re-shuffle all cards if the stock is running out (the hash is recomputed) """
+        state = self.state
+        if len(state.list_card_draw) < cnt_cards * state.cnt_player:
+            state.list_card_draw = list(GameState.LIST_CARD)
+            self.rng.shuffle(state.list_card_draw)
+            state.list_card_discard = []
+            self.hash_items = get_hash_items(state)
+            if self.list_listener:
+                self.emit(CardsReshuffled(len(state.list_card_draw)))
+        for _ in range(cnt_cards):
+            for idx_player in range(len(state.list_player)):
+                card = state.list_card_draw.pop()
+                self.hash_items ^= KEYS_DRAW[len(state.list_card_draw) % CNT_KEYS_POS][get_card_code(card)]
+                self._add_card(idx_player, card)
+                if self.list_listener:
+                    self.emit(CardDealt(idx_player, card))
+
+    def copy_state(self, state: GameState) -> GameState:
+        """ Copy of a state without validation (see copy_state) """
+        return copy_state(state)
 
     def get_player_view(self, idx_player: int) -> GameState:
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        pass
+        state = copy_state(self.state)
+        card_back = LIST_CARD_CODE[0]
+        for idx, player in enumerate(state.list_player):
+            if idx != idx_player:
+                player.list_card = [card_back] * len(player.list_card)
+        state.list_card_draw = [card_back] * len(state.list_card_draw)
+        return state
 
+    def encode_state_parts(self) -> List[bytes]:
+        """ Compact binary encoding of the complete state (one byte per card and per marble position), split into
+        the header, each player and the card piles """
+        writer = StateWriter(VERSION_CODEC)
+        write_state(writer, self.state)
+        return writer.get_parts()
 
-class RandomPlayer(Player):
+    def decode_state(self, data: bytes) -> GameState:
+        """ State of an encoding of 'encode_state' (the game itself is not changed) """
+        return read_state(StateReader(data, VERSION_CODEC))
 
-    def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
-        """ Given masked game state and possible actions, select the next action """
-        if len(actions) > 0:
-            return random.choice(actions)
-        return None
+    def get_snapshot_parts(self) -> List[bytes]:
+        """ Parts of a snapshot: the encoded state and, as last part, the SEVEN being played """
+        writer = StateWriter(VERSION_CODEC)
+        writer.write_optional_int(self.cnt_steps_seven)
+        writer.write_bool(self.state_seven is not None)
+        if self.state_seven is not None:
+            write_state(writer, self.state_seven)
+        return self.encode_state_parts() + [writer.get_bytes()]
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """ Set the game back to the state of a snapshot (including a SEVEN being played) """
+        super().restore(snapshot[:-1])
+        reader = StateReader(snapshot[-1], VERSION_CODEC)
+        self.cnt_steps_seven = reader.read_optional_int()
+        self.state_seven = read_state(reader) if reader.read_bool() else None
+        DICT_SNAPSHOT_LAST[self] = snapshot
+
+
+class RandomPlayer(UniformPlayer):
+    """ Random player of Dog """
 
 
 if __name__ == '__main__':
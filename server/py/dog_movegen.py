@@ -0,0 +1,138 @@
+from typing import Callable, Dict, List, Tuple
+from functools import partial
+
+
+CNT_STEPS = 64   # number of positions on the track (0 to 63)
+CNT_BALLS = 4    # number of marbles per player
+
+# steps a marble moves forward (resp. backward) for each rank, the SEVEN is split into single steps
+DICT_RANK_STEPS: Dict[str, Tuple[int, ...]] = {
+    '2': (2,), '3': (3,), '4': (4,), '5': (5,), '6': (6,), '7': (1, 2, 3, 4, 5, 6, 7),
+    '8': (8,), '9': (9,), '10': (10,), 'Q': (12,), 'K': (13,), 'A': (1, 11),
+}
+DICT_RANK_STEPS_BACKWARD: Dict[str, Tuple[int, ...]] = {'4': (4,)}
+LIST_RANK_START: List[str] = ['A', 'K', 'JKR']  # ranks to move a marble out of the kennel
+RANK_SPLIT = '7'                                # rank whose steps can be split over several moves
+
+# signature of a move generator (see get_list_pos_to for the arguments):
+# (pos, is_save, pos_start, pos_finish, finish_occ, blocked, cnt_steps) -> list of pos_to
+MoveGen = Callable[[int, bool, int, int, int, int, int], List[int]]
+
+
+def get_list_pos_to(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+        rank: str, pos: int, is_save: bool, pos_start: int, pos_finish: int,
+        finish_occ: int, blocked: int, cnt_steps: int = 7) -> List[int]:
+    """ Interpret the rank tables to get all target positions of a marble of the given rank (the reference of the
+    generated move generators)
+
+    pos         position of the marble (track or finish)
+    is_save     marble was moved out of the kennel and was not yet moved
+    pos_start   start position of the marble's owner on the track
+    pos_finish  first finish position of the marble's owner
+    finish_occ  bitmask of occupied finish positions of the owner (bit 0 = pos_finish)
+    blocked     bitmask of track positions occupied by save marbles (they can't be passed)
+    cnt_steps   remaining steps of the SEVEN (ignored for all other ranks) """
+    list_pos_to = []
+    list_steps = DICT_RANK_STEPS.get(rank, ())
+    if rank == RANK_SPLIT:
+        list_steps = tuple(steps for steps in list_steps if steps <= cnt_steps)
+
+    if pos >= CNT_STEPS:  # inside finish, move forward without overtaking
+        idx = pos - pos_finish
+        for steps in list_steps:
+            if idx + steps > CNT_BALLS - 1:
+                continue
+            if all(not finish_occ >> (idx + k) & 1 for k in range(1, steps + 1)):
+                list_pos_to.append(pos + steps)
+        return list_pos_to
+
+    for steps in list_steps:
+        dist_blocked = steps + 1
+        for k in range(1, steps + 1):
+            if blocked >> ((pos + k) % CNT_STEPS) & 1:
+                dist_blocked = k
+                break
+        if dist_blocked > steps:
+            list_pos_to.append((pos + steps) % CNT_STEPS)
+        if is_save:
+            continue
+        dist = (pos_start - pos) % CNT_STEPS
+        steps_finish = steps - dist
+        if dist < steps and steps_finish <= CNT_BALLS and dist < dist_blocked:
+            if all(not finish_occ >> k & 1 for k in range(steps_finish)):
+                list_pos_to.append(pos_finish + steps_finish - 1)
+
+    for steps in DICT_RANK_STEPS_BACKWARD.get(rank, ()):
+        if pos >= CNT_STEPS:
+            continue
+        if all(not blocked >> ((pos - k) % CNT_STEPS) & 1 for k in range(1, steps + 1)):
+            list_pos_to.append((pos - steps) % CNT_STEPS)
+
+    return list_pos_to
+
+
+def get_movegen_source(rank: str) -> str:
+    """ Emit the source of a straight-line move generator for the given rank (constants inlined) """
+    list_steps = DICT_RANK_STEPS.get(rank, ())
+    is_split = rank == RANK_SPLIT
+    mask_path = (1 << max(list_steps, default=0)) - 1
+    name = f'_movegen_{rank}'
+    lines = [f'def {name}(pos, is_save, pos_start, pos_finish, finish_occ, blocked, cnt_steps):',
+             '    list_pos_to = []']
+
+    # moves inside the finish
+    list_steps_finish = [steps for steps in list_steps if steps <= CNT_BALLS - 1]
+    lines.append(f'    if pos >= {CNT_STEPS}:')
+    if list_steps_finish:
+        lines.append('        idx = pos - pos_finish')
+        for steps in list_steps_finish:
+            cond = f'idx <= {CNT_BALLS - 1 - steps} and not (finish_occ >> (idx + 1)) & {(1 << steps) - 1}'
+            if is_split:
+                cond = f'cnt_steps >= {steps} and {cond}'
+            lines.append(f'        if {cond}:')
+            lines.append(f'            list_pos_to.append(pos + {steps})')
+    lines.append('        return list_pos_to')
+
+    # moves on the track (forward, with entry to the finish)
+    if list_steps:
+        lines.append(f'    path = ((blocked >> (pos + 1)) | (blocked << {CNT_STEPS - 1} - pos)) & {mask_path}')
+        lines.append(f'    dist = (pos_start - pos) & {CNT_STEPS - 1}')
+        lines.append('    path_start = path & ((1 << dist) - 1)')
+        for steps in list_steps:
+            indent = '    '
+            if is_split:
+                lines.append(f'    if cnt_steps >= {steps}:')
+                indent = '        '
+            lines.append(f'{indent}if not path & {(1 << steps) - 1}:')
+            lines.append(f'{indent}    list_pos_to.append((pos + {steps}) & {CNT_STEPS - 1})')
+            dist_min = max(0, steps - CNT_BALLS)
+            cond = f'dist == {dist_min}' if dist_min == steps - 1 else f'{dist_min} <= dist <= {steps - 1}'
+            lines.append(f'{indent}if not is_save and {cond} and not path_start'
+                         f' and not finish_occ & ((1 << ({steps} - dist)) - 1):')
+            lines.append(f'{indent}    list_pos_to.append(pos_finish + {steps - 1} - dist)')
+
+    # moves on the track (backward)
+    for steps in DICT_RANK_STEPS_BACKWARD.get(rank, ()):
+        cond = ' or '.join(f'blocked >> ((pos - {k}) & {CNT_STEPS - 1}) & 1' for k in range(1, steps + 1))
+        lines.append(f'    if not ({cond}):')
+        lines.append(f'        list_pos_to.append((pos - {steps}) & {CNT_STEPS - 1})')
+
+    lines.append('    return list_pos_to')
+    return '\n'.join(lines) + '\n'
+
+
+def build_dict_movegen() -> Dict[str, MoveGen]:
+    """ Compile the generated move generators of all ranks with steps """
+    dict_movegen: Dict[str, MoveGen] = {}
+    for rank in DICT_RANK_STEPS:
+        namespace: Dict[str, MoveGen] = {}
+        code = compile(get_movegen_source(rank), f'<movegen {rank}>', 'exec')
+        exec(code, namespace)  # pylint: disable=exec-used
+        dict_movegen[rank] = namespace[f'_movegen_{rank}']
+    return dict_movegen
+
+
+DICT_MOVEGEN_GENERATED: Dict[str, MoveGen] = build_dict_movegen()
+DICT_MOVEGEN_GENERIC: Dict[str, MoveGen] = {
+    rank: partial(get_list_pos_to, rank) for rank in DICT_RANK_STEPS
+}
@@ -1,11 +1,196 @@
-from typing import List, Any
+from typing import Callable, Dict, Iterator, List, Any, Optional, Sequence, Tuple, Type, TypeVar, Union
 from abc import ABCMeta, abstractmethod
+from enum import Enum
+import copy
+import functools
+import random
+import weakref
+import numpy as np
 
 GameState = Any
 GameAction = Any
+Snapshot = Tuple[bytes, ...]   # token of 'Game.snapshot': the parts of an encoded state
+Seed = Union[None, int, np.random.SeedSequence]   # seed of a generator (None: from OS entropy)
+Listener = Callable[[Any], None]   # receiver of the events of a game (see Game.add_listener)
+Model = TypeVar('Model')   # pydantic model class of a game's states and actions
 
 
-class Game(metaclass=ABCMeta):
+def get_seed_sequence(seed_root: int, *path: int) -> np.random.SeedSequence:
+    """ Seed of one random stream of a run, e.g. (root seed, game index, seat): the same root seed and path, the same
+    stream (the path is the spawn key of SeedSequence.spawn, given directly to find any stream without the others) """
+    return np.random.SeedSequence(seed_root, spawn_key=path)
+
+
+def get_rng(seed: Seed) -> random.Random:
+    """ Python generator of a seed (a seed sequence gives 128 bits of its state) """
+    if isinstance(seed, np.random.SeedSequence):
+        return random.Random(int.from_bytes(seed.generate_state(4).tobytes(), 'little'))
+    return random.Random(seed)
+
+
+class Seeded:
+    """ Owner of a generator for all its random decisions ('rng'), seeded by 'seed', else from OS entropy """
+
+    _rng: Optional[random.Random] = None
+
+    @property
+    def rng(self) -> random.Random:
+        """ Generator of the random decisions """
+        if self._rng is None:
+            self._rng = random.Random()
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng: random.Random) -> None:
+        self._rng = rng
+
+    def seed(self, seed: Seed) -> None:
+        """ Seed the generator of the random decisions """
+        self._rng = get_rng(seed)
+
+
+class QueryCache:
+    """ Version of a game's state and the results of queries on this version """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.dict_result: Dict[Tuple[Any, ...], Any] = {}
+
+    def bump(self) -> None:
+        """ Start a new version, forgetting the results of the old one """
+        self.version += 1
+        self.dict_result.clear()
+
+
+DICT_QUERY_CACHE: 'weakref.WeakKeyDictionary[Any, QueryCache]' = weakref.WeakKeyDictionary()
+""" Query cache of each game, created on first use """
+
+
+def get_query_cache(game: Any) -> QueryCache:
+    """ Query cache of a game """
+    cache = DICT_QUERY_CACHE.get(game)
+    if cache is None:
+        cache = DICT_QUERY_CACHE[game] = QueryCache()
+    return cache
+
+
+def get_mutating(method: Callable[..., Any]) -> Callable[..., Any]:
+    """ Wrap a method changing the state to start a new version when it returns (or raises) """
+    @functools.wraps(method)
+    def mutating(self: Any, *args: Any, **kwargs: Any) -> Any:
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            get_query_cache(self).bump()
+    return mutating
+
+
+def get_memoized(method: Callable[..., Any], copy_result: Callable[[Any, Any], Any]) -> Callable[..., Any]:
+    """ Wrap a query to compute it once per version and arguments, each caller gets its own copy (copy_result with
+    the game and the memoized result) """
+    @functools.wraps(method)
+    def memoized(self: Any, *args: Any, **kwargs: Any) -> Any:
+        dict_result = get_query_cache(self).dict_result
+        key = (method, *args, *sorted(kwargs.items()))
+        if key not in dict_result:
+            dict_result[key] = method(self, *args, **kwargs)
+        return copy_result(self, dict_result[key])
+    return memoized
+
+
+DICT_COPY_RESULT: Dict[str, Callable[[Any, Any], Any]] = {
+    'get_list_action': lambda game, list_action: list(list_action),
+    'get_player_view': lambda game, state: game.copy_state(state),
+}
+""" Memoized queries of the games and how their results are copied for each caller (see get_memoized) """
+
+
+def get_data(value: Any) -> Any:
+    """ JSON compatible data of a state or action (pydantic models, plain objects, enums and lists of them) """
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (list, tuple)):
+        return [get_data(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return {key: get_data(item) for key, item in vars(value).items()}
+    return value
+
+
+DICT_FIELD_DEFAULT: Dict[type, Tuple[int, Dict[str, Any], Dict[str, Callable[[], Any]]]] = {}
+""" Number of fields, defaults and default factories of the optional fields of each model (see construct_trusted) """
+
+
+DICT_SLOT_SETTER: Dict[type, Tuple[Callable[[Any, Any], None], ...]] = {}
+""" Setters of the slots '__pydantic_fields_set__', '__pydantic_extra__' and '__pydantic_private__' of each model """
+
+
+def get_slot_setters(cls: type) -> Tuple[Callable[[Any, Any], None], ...]:
+    """ Setters of the pydantic slots of a model class (the descriptors of the base model defining them) """
+    list_setter = []
+    for name in ('__pydantic_fields_set__', '__pydantic_extra__', '__pydantic_private__'):
+        base = next(base for base in cls.__mro__ if name in vars(base))
+        list_setter.append(vars(base)[name].__set__)
+    DICT_SLOT_SETTER[cls] = setters = tuple(list_setter)
+    return setters
+
+
+def construct_trusted(cls: Type[Model], **fields: Any) -> Model:
+    """ Instance of a pydantic model built from trusted values without validation: for the objects the engine
+    creates itself (actions, copies and decoded states), while untrusted input (websockets, 'set_state') is validated
+
+    Faster than validating and than 'model_construct' (which inspects every field); no field is converted or
+    checked, omitted fields get their defaults. """
+    field_default = DICT_FIELD_DEFAULT.get(cls)
+    if field_default is None:
+        dict_info = cls.model_fields  # type: ignore[attr-defined]
+        field_default = DICT_FIELD_DEFAULT[cls] = (
+            len(dict_info),
+            {name: info.default for name, info in dict_info.items()
+             if not info.is_required() and info.default_factory is None},
+            {name: info.default_factory for name, info in dict_info.items() if info.default_factory is not None})
+    cnt_field, dict_default, dict_factory = field_default
+    if len(fields) < cnt_field:
+        fields = {**dict_default, **{name: factory() for name, factory in dict_factory.items() if name not in fields},
+                  **fields}
+    model = object.__new__(cls)
+    object.__setattr__(model, '__dict__', fields)
+    set_fields_set, set_extra, set_private = DICT_SLOT_SETTER.get(cls) or get_slot_setters(cls)
+    set_fields_set(model, set(fields))
+    set_extra(model, None)
+    set_private(model, None)
+    return model
+
+
+def copy_trusted(model: Model, **update: Any) -> Model:
+    """ Shallow copy of a pydantic model with some fields replaced, without validation (see construct_trusted) """
+    return construct_trusted(type(model), **{**model.__dict__, **update})
+
+
+class Game(Seeded, metaclass=ABCMeta):  # pylint: disable=too-many-public-methods
+    """ Base of all games, shuffling and dealing with their own generator 'rng'
+
+    The state has a version, bumped by every 'set_state' and 'apply_action', and the results of 'get_list_action',
+    'get_player_view' and 'get_payload' are memoized per version: repeated calls on an unchanged state cost a copy
+    (a new list of the actions, 'copy_state' of the view), payloads are shared between callers and must not be
+    changed; changing the state other than by 'set_state' or 'apply_action' must be followed by 'touch' (which also
+    recomputes the state hash of games keeping one).
+
+    'apply_action' emits typed events (NamedTuples defined by each game: card played, marble moved, shot hit, ...)
+    to the listeners added with 'add_listener'; an event is only built when someone listens. """
+
+    list_listener: List[Listener] = []   # receivers of the events (a new list on every change, never changed in place)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """ Wrap the state changing methods and the queries of every game class """
+        super().__init_subclass__(**kwargs)
+        for name in ('set_state', 'apply_action'):
+            if name in vars(cls):
+                setattr(cls, name, get_mutating(vars(cls)[name]))
+        for name, copy_result in DICT_COPY_RESULT.items():
+            if name in vars(cls):
+                setattr(cls, name, get_memoized(vars(cls)[name], copy_result))
 
     @abstractmethod
     def set_state(self, state: GameState) -> None:
@@ -19,7 +204,7 @@ class Game(metaclass=ABCMeta):
 
     @abstractmethod
     def print_state(self) -> None:
-        """ Print the current game state """
+        """ Trace the current game state (see tracing, level INFO) """
         pass
 
     @abstractmethod
@@ -37,10 +222,232 @@ class Game(metaclass=ABCMeta):
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
         pass
 
+    def iter_actions(self) -> Iterator[GameAction]:
+        """ Possible actions of the active player one by one, in the order of 'get_list_action' (games override this
+        to build them lazily) """
+        yield from self.get_list_action()
+
+    def count_actions(self) -> int:
+        """ Number of possible actions of the active player (games override this to count without building them) """
+        return len(self.get_list_action())
+
+    def sample_action(self, rng: random.Random) -> Optional[GameAction]:
+        """ Uniformly random possible action of the active player, None if there is none (games override this to
+        build only the sampled action) """
+        list_action = self.get_list_action()
+        return rng.choice(list_action) if list_action else None
+
+    def add_listener(self, listener: Listener) -> None:
+        """ Receive the events of 'apply_action', in the order they happen """
+        self.list_listener = self.list_listener + [listener]
+
+    def remove_listener(self, listener: Listener) -> None:
+        """ Stop receiving events """
+        self.list_listener = [item for item in self.list_listener if item != listener]
+
+    def emit(self, event: Any) -> None:
+        """ Send an event to the listeners (callers check 'list_listener' first to not build events nobody gets) """
+        for listener in self.list_listener:
+            listener(event)
+
+    def copy_state(self, state: GameState) -> GameState:
+        """ Copy of a state sharing nothing the caller could change (games override this with a faster copy) """
+        return state.model_copy(deep=True) if hasattr(state, 'model_copy') else copy.deepcopy(state)
+
+    def get_version(self) -> int:
+        """ Version of the state (number of changes so far) """
+        return get_query_cache(self).version
+
+    def touch(self) -> None:
+        """ Start a new version after the state was changed directly """
+        get_query_cache(self).bump()
+
+    def get_payload(self, idx_player: int, with_actions: bool = True) -> Dict[str, Any]:
+        """ Data of the player's view for a client (plus the player's index and the possible actions), memoized per
+        version like the queries it is built from """
+        dict_result = get_query_cache(self).dict_result
+        key = ('payload', idx_player, with_actions)
+        if key not in dict_result:
+            payload = get_data(self.get_player_view(idx_player))
+            payload['idx_player_you'] = idx_player
+            payload['list_action'] = get_data(self.get_list_action()) if with_actions else []
+            dict_result[key] = payload
+        payload_cached: Dict[str, Any] = dict_result[key]
+        return payload_cached
+
+    @abstractmethod
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the state, kept up to date by 'apply_action' (equal states, equal hashes) """
+        pass
+
+    @abstractmethod
+    def compute_state_hash(self) -> int:
+        """ The value of 'state_hash' computed from scratch (recomputed by 'set_state', used to check the updates) """
+        pass
+
+    def encode_state(self) -> bytes:
+        """ Compact binary encoding of the complete state (for snapshots, keys and transfer between processes) """
+        return b''.join(self.encode_state_parts())
+
+    @abstractmethod
+    def encode_state_parts(self) -> List[bytes]:
+        """ Binary encoding of the complete state split into parts that usually change independently """
+        pass
+
+    @abstractmethod
+    def decode_state(self, data: bytes) -> GameState:
+        """ State of an encoding of 'encode_state' (the game itself is not changed) """
+        pass
+
+    def snapshot(self) -> Snapshot:
+        """ Immutable token of the current state for 'restore'
 
-class Player(metaclass=ABCMeta):
+        Parts equal to those of the game's previous snapshot (or restored token) are shared, not copied, so the
+        snapshots of a search tree branching from each other store only the parts that changed. """
+        snapshot_last = DICT_SNAPSHOT_LAST.get(self, ())
+        list_part = self.get_snapshot_parts()
+        if len(snapshot_last) == len(list_part):
+            list_part = [part_last if part_last == part else part for part, part_last in zip(list_part, snapshot_last)]
+        snapshot = tuple(list_part)
+        DICT_SNAPSHOT_LAST[self] = snapshot
+        return snapshot
+
+    def get_snapshot_parts(self) -> List[bytes]:
+        """ Parts of a snapshot: the encoded state (games with more to restore than their state add parts) """
+        return self.encode_state_parts()
+
+    def restore(self, snapshot: Snapshot) -> None:
+        """ Set the game back to the state of a snapshot """
+        self.set_state(self.decode_state(b''.join(snapshot)))
+        DICT_SNAPSHOT_LAST[self] = snapshot
+
+    @classmethod
+    def make_batch(cls, list_game: List['Game']) -> 'BatchGame':
+        """ Batch over the given games, vectorized if the game class provides it, else a loop over the games """
+        return LoopBatchGame(list_game)
+
+
+DICT_SNAPSHOT_LAST: 'weakref.WeakKeyDictionary[Game, Snapshot]' = weakref.WeakKeyDictionary()
+""" Last snapshot taken or restored of each game, whose unchanged parts the next snapshot shares """
+
+
+class BatchGame(metaclass=ABCMeta):
+    """ Many games of one kind advanced together, actions are given as column indices of 'legal_masks' """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """ Number of games """
+        pass
+
+    @abstractmethod
+    def legal_masks(self) -> np.ndarray:
+        """ Legal actions as a boolean (games x actions) array, no legal action when a game is finished """
+        pass
+
+    @abstractmethod
+    def step(self, actions: np.ndarray) -> None:
+        """ Apply one action (column index, -1 = pass) to every game """
+        pass
+
+    @abstractmethod
+    def get_player_view(self, idx_game: int, idx_player: int) -> GameState:
+        """ Get the masked state of one game for a player """
+        pass
+
+
+class LoopBatchGame(BatchGame):
+    """ Generic batch: one Game instance per game, stepped in a Python loop
+
+    With an action space the columns are the actions of that fixed list (matched by repr), else a column is the
+    position of an action in the game's current 'get_list_action'. """
+
+    def __init__(self, list_game: List[Game], list_action_space: Optional[List[GameAction]] = None) -> None:
+        self.list_game = list_game
+        self.list_action_space = list_action_space
+        self.dict_action_idx: Dict[str, int] = {}
+        if list_action_space is not None:
+            self.dict_action_idx = {repr(action): idx for idx, action in enumerate(list_action_space)}
+        self.list_list_action: List[List[GameAction]] = [game.get_list_action() for game in list_game]
+
+    def __len__(self) -> int:
+        return len(self.list_game)
+
+    def legal_masks(self) -> np.ndarray:
+        """ Legal actions as a boolean (games x actions) array, no legal action when a game is finished """
+        if self.list_action_space is not None:
+            legal = np.zeros((len(self.list_game), len(self.list_action_space)), dtype=bool)
+            for idx_game, list_action in enumerate(self.list_list_action):
+                legal[idx_game, [self.dict_action_idx[repr(action)] for action in list_action]] = True
+            return legal
+        cnt_actions = max((len(list_action) for list_action in self.list_list_action), default=0)
+        legal = np.arange(cnt_actions) < np.array([len(list_action) for list_action in self.list_list_action])[:, None]
+        return legal
+
+    def step(self, actions: np.ndarray) -> None:
+        """ Apply one action (column index, -1 = pass) to every game """
+        for idx_game, (game, idx_action) in enumerate(zip(self.list_game, np.asarray(actions).tolist())):
+            if idx_action < 0:
+                continue
+            if self.list_action_space is not None:
+                action = self.list_action_space[idx_action]
+            else:
+                action = self.list_list_action[idx_game][idx_action]
+            game.apply_action(action)
+            self.list_list_action[idx_game] = game.get_list_action()
+
+    def get_player_view(self, idx_game: int, idx_player: int) -> GameState:
+        """ Get the masked state of one game for a player """
+        return self.list_game[idx_game].get_player_view(idx_player)
+
+
+def sample_legal_columns(action_masks: np.ndarray, rng: Optional[random.Random] = None) -> np.ndarray:
+    """ Uniformly random legal column of each row of a boolean (games x actions) array, -1 for rows without any """
+    action_masks = np.asarray(action_masks, dtype=bool)
+    actions = np.full(len(action_masks), -1, dtype=np.int64)
+    if action_masks.size == 0:
+        return actions
+    keys = np.random.default_rng(rng.getrandbits(64) if rng is not None else None).random(action_masks.shape)
+    idx_best = np.where(action_masks, keys, -1.0).argmax(axis=1)
+    has_action = action_masks.any(axis=1)
+    actions[has_action] = idx_best[has_action]
+    return actions
+
+
+class Player(Seeded, metaclass=ABCMeta):
+    """ Base of all players, deciding at random with their own generator 'rng' """
 
     @abstractmethod
     def select_action(self, state: GameState, actions: List[GameAction]) -> GameAction:
         """ Given masked game state and possible actions, select the next action """
         pass
+
+    def select_actions(self, states: Sequence[GameState], action_masks: np.ndarray,
+                       action_space: Optional[Sequence[GameAction]] = None) -> np.ndarray:
+        """ Select the next action of many games in one call: a column index of each row of the boolean
+        (games x actions) masks as given by 'BatchGame.legal_masks', -1 to pass
+
+        The default asks 'select_action' game by game with the legal actions of the action space (the column indices
+        without one), players able to decide for all games at once override this. """
+        actions = np.full(len(states), -1, dtype=np.int64)
+        for idx_game, (state, mask) in enumerate(zip(states, action_masks)):
+            list_column = np.flatnonzero(mask).tolist()
+            list_action = list_column if action_space is None else [action_space[idx] for idx in list_column]
+            action = self.select_action(state, list_action)
+            if action is not None:
+                actions[idx_game] = list_column[list_action.index(action)]
+        return actions
+
+
+class UniformPlayer(Player):
+    """ Player selecting a uniformly random possible action (base of the random players of the games) """
+
+    def select_action(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Given masked game state and possible actions, select the next action """
+        if len(actions) > 0:
+            return self.rng.choice(actions)
+        return None
+
+    def select_actions(self, states: Sequence[GameState], action_masks: np.ndarray,
+                       action_space: Optional[Sequence[GameAction]] = None) -> np.ndarray:
+        """ Uniformly random legal action of every game, drawn for all games at once """
+        return sample_legal_columns(action_masks, self.rng)
@@ -1,21 +1,78 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 import random
 from enum import Enum
-from server.py.game import Game, Player
 import string
+import numpy as np
+from server.py.game import Game, BatchGame, LoopBatchGame, UniformPlayer
+from server.py.hangman_words import get_word_store
+from server.py.state_codec import StateWriter, StateReader
+from server.py.zobrist import get_keys, get_mask_hash
+from server.py.tracing import get_tracer
+
+
+MAX_MISSES = 8                      # the game is lost with this number of incorrect guesses
+MASK_ALPHABET = (1 << 26) - 1       # bit i = letter chr(ord('A') + i)
+VERSION_CODEC = 1                   # version of the binary state encoding (first byte of an encoded state)
+CNT_KEYS_WORD = 64                  # Zobrist keys of the word's letters repeat after this many positions
+
+KEYS_WORD: List[List[int]] = get_keys('hangman.word', CNT_KEYS_WORD, 26)   # key of each (position, letter)
+KEYS_GUESSED: List[int] = get_keys('hangman.guessed', 26)                  # key of each guessed letter
+TRACER = get_tracer('hangman')
 
 
 class GuessLetterAction:
 
     def __init__(self, letter: str) -> None:
-        """ Ensure that the letter isalpha() and that there is only one, and lowercase """
-        if not isinstance(letter, str) or not letter.isalpha() or len(letter) != 1:
-            raise ValueError("The guessed letter must be a single alphabetic character.")
-        self.letter = letter.lower()
+        """ Ensure that the letter is one of a-z (any case) and that there is only one, and uppercase """
+        if not isinstance(letter, str) or not letter.isascii() or not letter.isalpha() or len(letter) != 1:
+            raise ValueError("The guessed letter must be a single letter a-z.")
+        self.letter = letter.upper()
+
+    def __repr__(self) -> str:
+        """ String representation of self """
+        return f"GuessLetterAction(letter='{self.letter}')"
+
+
+class LetterRevealed(NamedTuple):
+    """ Event: the guessed letter is in the word at these positions """
+    letter: str
+    list_pos: Tuple[int, ...]
+
+
+class LetterMissed(NamedTuple):
+    """ Event: the guessed letter is not in the word """
+    letter: str
+    cnt_misses: int
+
+
+LIST_ACTION_GUESS: List[GuessLetterAction] = [GuessLetterAction(letter) for letter in string.ascii_uppercase]
+""" Interned guess action of each letter (index = letter index) """
+
 
-    def __repr__(self):
-       """ String representation of self """
-       return f"GuessLetterAction(letter='{self.letter}')"
+def get_letter_idx(letter: str) -> int:
+    """ Letter index 0-25 of a letter of any case, -1 for other characters """
+    idx = ord(letter.upper()) - ord('A')
+    return idx if 0 <= idx < 26 else -1
+
+
+def get_letter_mask(letters: Sequence[str]) -> int:
+    """ Bitmask of the letters (any case, other characters ignored) """
+    mask = 0
+    for letter in letters:
+        idx = get_letter_idx(letter)
+        if idx >= 0:
+            mask |= 1 << idx
+    return mask
+
+
+def get_word_masked(word: str, mask_guessed: int) -> str:
+    """ Word as shown to the player: letters not guessed yet as '_', other characters (spaces, hyphens, accented
+    letters) always shown """
+    list_char = []
+    for char in word:
+        idx = get_letter_idx(char)
+        list_char.append('_' if idx >= 0 and not mask_guessed >> idx & 1 else char)
+    return ''.join(list_char)
 
 
 class GamePhase(str, Enum):
@@ -24,9 +81,28 @@ class GamePhase(str, Enum):
     FINISHED = 'finished'      # when the game is finished
 
 
+DICT_KEY_PHASE: Dict[GamePhase, int] = dict(zip(GamePhase, get_keys('hangman.phase', len(GamePhase))))
+
+
+def get_word_hash(word: str) -> int:
+    """ Zobrist hash of the letters of a word (any case, other characters ignored) """
+    hash_word = 0
+    for pos, letter in enumerate(word):
+        idx = get_letter_idx(letter)
+        if idx >= 0:
+            hash_word ^= KEYS_WORD[pos % CNT_KEYS_WORD][idx]
+    return hash_word
+
+
+def get_hash_items(state: 'HangmanGameState') -> int:
+    """ Zobrist hash of the word and the guessed letters of a state """
+    return get_word_hash(state.word_to_guess) ^ get_mask_hash(KEYS_GUESSED, get_letter_mask(state.guesses))
+
+
 class HangmanGameState:
 
-    def __init__(self, word_to_guess: str, phase: GamePhase, guesses: List[str], incorrect_guesses: List[str] = None) -> None:
+    def __init__(self, word_to_guess: str, phase: GamePhase, guesses: List[str],
+                 incorrect_guesses: Optional[List[str]] = None) -> None:
         self.word_to_guess = word_to_guess.lower()
         self.phase = phase
         self.guesses = guesses
@@ -36,16 +112,28 @@ class HangmanGameState:
 
 
 class Hangman(Game):
+    """ Hangman backed by letter bitmasks: the guessed letters, the letters of the word and the number of misses """
 
     def __init__(self) -> None:
         """ Important: Game initialization also requires a set_state call to set the 'word_to_guess' """
-        self.state = None
+        self.state: HangmanGameState
+        self.mask_guessed = 0   # letters guessed so far
+        self.mask_word = 0      # letters of the word to guess
+        self.cnt_misses = 0     # number of guessed letters not in the word
+        self.hash_items = 0     # Zobrist hash of the word and the guessed letters (the phase is hashed on demand)
         initial_state = HangmanGameState(word_to_guess="DevOps",
                                          phase=GamePhase.SETUP,
                                          guesses=[],
                                          incorrect_guesses=[])
         self.set_state(initial_state)
 
+    def start(self, length: Optional[int] = None, rng: Optional[random.Random] = None) -> None:
+        """ Start a game with a random word of the shared word store (of the given length if any), drawn with the
+        given generator, else the game's """
+        word_to_guess = get_word_store().random_word(rng or self.rng, length=length)
+        self.set_state(HangmanGameState(word_to_guess=word_to_guess, phase=GamePhase.RUNNING, guesses=[],
+                                        incorrect_guesses=[]))
+
     def get_state(self) -> HangmanGameState:
         """ Get the complete, unmasked game state """
         return self.state
@@ -53,87 +141,197 @@ class Hangman(Game):
     def set_state(self, state: HangmanGameState) -> None:
         """ Set the game to a given state """
         self.state = state
+        self.mask_guessed = get_letter_mask(state.guesses)
+        self.set_word_to_guess(state.word_to_guess)
+        self.hash_items = get_hash_items(state)
 
-    def print_state(self) -> None:
-        """ Print the current game state """
-        if self.state:
-            print("Word:" , ''.join([char if char in self.guesses else '_' for char in self.word_to_guess]))
-            print(f"Guesses: {', '.join(self.state.guesses)}")
-
+    def set_word_to_guess(self, word_to_guess: str) -> None:
+        """ Replace the word to guess (the guesses are kept) """
+        self.hash_items ^= get_word_hash(self.state.word_to_guess) ^ get_word_hash(word_to_guess)
+        self.state.word_to_guess = word_to_guess
+        self.mask_word = get_letter_mask(word_to_guess)
+        self.cnt_misses = (self.mask_guessed & ~self.mask_word).bit_count()
 
+    def print_state(self) -> None:
+        """ Trace the current game state (level INFO) """
+        if not TRACER.is_info:
+            return
+        TRACER.info('Word: %s, guesses: %s', get_word_masked(self.state.word_to_guess, self.mask_guessed),
+                    ', '.join(self.state.guesses))
 
     def get_list_action(self) -> List[GuessLetterAction]:
         """ Get a list of possible actions for the active player """
-
-        # check if the game state is set or not - if not set return only an empty list
-        if not self.state or not self.state.word_to_guess:
-            return []
-        
-        # now get all letters from the alphabet to see all possible guesses
-        all_letters = set(string.ascii_lowercase)
-
-        # now get all guessed letters 
-        guessed_letters = set(self.state.guesses)
-
-        # now filter out all the guessed letters and get a sset with all letter that are remaining
-        avlb_letters = all_letters - guessed_letters
-
-        return [GuessLetterAction(letter) for letter in sorted(avlb_letters)]
-
-
-
+        mask_free = self.get_mask_free()
+        return [action for idx, action in enumerate(LIST_ACTION_GUESS) if mask_free >> idx & 1]
+
+    def get_mask_free(self) -> int:
+        """ Letters that can be guessed (none when the game is finished) """
+        if self.state.phase == GamePhase.FINISHED:
+            return 0
+        return ~self.mask_guessed & MASK_ALPHABET
+
+    def iter_actions(self) -> Iterator[GuessLetterAction]:
+        """ Possible actions one by one, in the order of 'get_list_action' """
+        mask_free = self.get_mask_free()
+        for idx, action in enumerate(LIST_ACTION_GUESS):
+            if mask_free >> idx & 1:
+                yield action
+
+    def count_actions(self) -> int:
+        """ Number of possible actions """
+        return self.get_mask_free().bit_count()
+
+    def sample_action(self, rng: random.Random) -> Optional[GuessLetterAction]:
+        """ Uniformly random letter not guessed yet, None if there is none """
+        mask_free = self.get_mask_free()
+        if not mask_free:
+            return None
+        for _ in range(rng.randrange(mask_free.bit_count())):
+            mask_free &= mask_free - 1
+        return LIST_ACTION_GUESS[(mask_free & -mask_free).bit_length() - 1]
 
     def apply_action(self, action: GuessLetterAction) -> None:
-        """ Apply the given action to the game """
-        
-        # first check whether the game is running or not - again through the state
-        if not self.state or self.state.phase != GamePhase.RUNNING:
-            print("The game is currently not running - no actions can be applied.")
-            return
-        
-        # define the letter already guessed - make sure lowercase
-        guessed_letter = action.letter.lower()
-        
-        # check whether the letter was already guessed (whether there has been an attempt to guess this letter)
-        if guessed_letter in self.state.guesses or guessed_letter in self.state.incorrect_guesses:
-            print("The letter", guessed_letter, "has been already guessed.")
+        """ Apply the given action to the game (guesses of letters already guessed are ignored) """
+        if self.state.phase != GamePhase.RUNNING:
             return
-        
-        # add the letter to the list of guessed letters
-        self.state.guesses.append(guessed_letter)
-
-        # check if the guessed letter is in the word
-        if guessed_letter in self.state.word_to_guess:
-            print("Correct guess.")
-        else:
-            print("Incorrect guess")
-            self.state.incorrect_guesses.append(guessed_letter)
-        
-        # check if the game is won - the word is guessed
-        if all(char in self.state.guesses for char in self.state.word_to_guess):
-            print("THe word has been guessed!")
-            self.state.phase = GamePhase.FINISHED
-
-        # set a maximum number of guessed in order to finish the game faster
-        max_number_of_guesses = 5
 
-        if len(self.state.incorrect_guesses) >= max_number_of_guesses:
-            print("You have reached the maximum number of guesses. You therefore lose the game.")
-            print(f"The word to guess was {self.state.word_to_guess}")
+        idx = get_letter_idx(action.letter)
+        bit = 1 << idx
+        if self.mask_guessed & bit:
+            return
 
+        self.mask_guessed |= bit
+        self.hash_items ^= KEYS_GUESSED[idx]
+        letter = action.letter.upper()
+        self.state.guesses.append(letter)
+        if not self.mask_word & bit:
+            self.cnt_misses += 1
+            self.state.incorrect_guesses.append(letter)
+        if self.list_listener:
+            if self.mask_word & bit:
+                self.emit(LetterRevealed(letter, tuple(pos for pos, char in enumerate(self.state.word_to_guess.upper())
+                                                       if char == letter)))
+            else:
+                self.emit(LetterMissed(letter, self.cnt_misses))
+
+        if self.mask_guessed & self.mask_word == self.mask_word or self.cnt_misses >= MAX_MISSES:
+            self.state.phase = GamePhase.FINISHED
 
     def get_player_view(self, idx_player: int) -> HangmanGameState:
-        """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
-        pass
-
-
-class RandomPlayer(Player):
-
-    def select_action(self, state: HangmanGameState, actions: List[GuessLetterAction]) -> Optional[GuessLetterAction]:
-        """ Given masked game state and possible actions, select the next action """
-        if len(actions) > 0:
-            return random.choice(actions)
-        return None
+        """ Get the masked state for the active player (letters not guessed yet are shown as '_' until the end) """
+        word_to_guess = self.state.word_to_guess
+        if self.state.phase != GamePhase.FINISHED:
+            word_to_guess = get_word_masked(word_to_guess, self.mask_guessed)
+        return HangmanGameState(word_to_guess=word_to_guess, phase=self.state.phase, guesses=list(self.state.guesses),
+                                incorrect_guesses=list(self.state.incorrect_guesses))
+
+    def is_won(self) -> bool:
+        """ Check whether all letters of the word have been guessed """
+        return self.mask_guessed & self.mask_word == self.mask_word
+
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the state (the word, the guessed letters and the phase) """
+        return self.hash_items ^ DICT_KEY_PHASE[self.state.phase]
+
+    def compute_state_hash(self) -> int:
+        """ The value of 'state_hash' computed from scratch """
+        return get_hash_items(self.state) ^ DICT_KEY_PHASE[self.state.phase]
+
+    def touch(self) -> None:
+        """ Start a new version and recompute the letter masks and the hash after the state was changed directly """
+        self.set_state(self.state)
+
+    def encode_state_parts(self) -> List[bytes]:
+        """ Compact binary encoding of the complete state (a single part) """
+        writer = StateWriter(VERSION_CODEC)
+        writer.write_u8(list(GamePhase).index(self.state.phase))
+        writer.write_str(self.state.word_to_guess)
+        writer.write_list_str(self.state.guesses)
+        writer.write_list_str(self.state.incorrect_guesses)
+        return writer.get_parts()
+
+    def decode_state(self, data: bytes) -> HangmanGameState:
+        """ State of an encoding of 'encode_state' (the game itself is not changed) """
+        reader = StateReader(data, VERSION_CODEC)
+        phase = list(GamePhase)[reader.read_u8()]
+        return HangmanGameState(word_to_guess=reader.read_str(), phase=phase, guesses=reader.read_list_str(),
+                                incorrect_guesses=reader.read_list_str())
+
+    @classmethod
+    def make_batch(cls, list_game: List[Game]) -> BatchGame:
+        """ Vectorized batch of plain Hangman games, a loop over the games for subclasses (e.g. EvilHangman) """
+        list_hangman = [game for game in list_game if type(game) is Hangman]  # pylint: disable=unidiomatic-typecheck
+        if len(list_hangman) < len(list_game):
+            return LoopBatchGame(list_game, list(LIST_ACTION_GUESS))
+        return HangmanBatch.from_games(list_hangman)
+
+
+class HangmanBatch(BatchGame):
+    """ Many Hangman games advanced together: one guessed mask, word mask and miss counter per game in NumPy arrays
+
+    Made for evaluating bots: a step applies one guess to every running game with a few vectorized operations.
+    The action columns are the letters 0-25 (as LIST_ACTION_GUESS). """
+
+    def __init__(self, list_word: List[str]) -> None:
+        self.list_word = [word.lower() for word in list_word]
+        self.mask_word = np.array([get_letter_mask(word) for word in list_word], dtype=np.int64)
+        self.mask_guessed = np.zeros(len(list_word), dtype=np.int64)
+        self.cnt_misses = np.zeros(len(list_word), dtype=np.int64)
+        self.cnt_guesses = np.zeros(len(list_word), dtype=np.int64)
+        self.is_finished = self.mask_word == 0
+
+    @classmethod
+    def from_games(cls, list_game: List[Hangman]) -> 'HangmanBatch':
+        """ Batch continuing the given games (the games themselves are not updated by the batch) """
+        batch = cls([game.get_state().word_to_guess for game in list_game])
+        batch.mask_guessed[:] = [game.mask_guessed for game in list_game]
+        batch.cnt_misses[:] = [game.cnt_misses for game in list_game]
+        batch.cnt_guesses[:] = [game.mask_guessed.bit_count() for game in list_game]
+        batch.is_finished[:] = [game.get_state().phase != GamePhase.RUNNING for game in list_game]
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.list_word)
+
+    def is_won(self) -> np.ndarray:
+        """ Games in which all letters of the word have been guessed """
+        is_won: np.ndarray = self.mask_guessed & self.mask_word == self.mask_word
+        return is_won
+
+    def get_legal_mask(self) -> np.ndarray:
+        """ Letters not guessed yet of each game (0 for finished games) """
+        legal: np.ndarray = np.where(self.is_finished, 0, ~self.mask_guessed & MASK_ALPHABET)
+        return legal
+
+    def legal_masks(self) -> np.ndarray:
+        """ Legal letters as a boolean (games x 26) array """
+        legal: np.ndarray = (self.get_legal_mask()[:, None] >> np.arange(26)) & 1 == 1
+        return legal
+
+    def step(self, actions: np.ndarray) -> None:
+        """ Apply one guess (letter index 0-25, -1 = pass) to every running game, repeated guesses are ignored """
+        letters = np.asarray(actions, dtype=np.int64)
+        bit = np.where(letters >= 0, np.left_shift(1, np.maximum(letters, 0)), 0)
+        bit = np.where(self.is_finished | (self.mask_guessed & bit != 0), 0, bit)
+        self.mask_guessed |= bit
+        self.cnt_guesses += bit != 0
+        self.cnt_misses += (bit != 0) & (self.mask_word & bit == 0)
+        self.is_finished |= self.is_won() | (self.cnt_misses >= MAX_MISSES)
+
+    def get_player_view(self, idx_game: int, idx_player: int = 0) -> HangmanGameState:
+        """ Masked state of one game, as seen by a player """
+        mask_guessed = int(self.mask_guessed[idx_game])
+        word = self.list_word[idx_game]
+        phase = GamePhase.FINISHED if self.is_finished[idx_game] else GamePhase.RUNNING
+        guesses = [letter for idx, letter in enumerate(string.ascii_uppercase) if mask_guessed >> idx & 1]
+        incorrect_guesses = [letter for letter in guesses if letter.lower() not in word]
+        if phase != GamePhase.FINISHED:
+            word = get_word_masked(word, mask_guessed)
+        return HangmanGameState(word_to_guess=word, phase=phase, guesses=guesses, incorrect_guesses=incorrect_guesses)
+
+
+class RandomPlayer(UniformPlayer):
+    """ Random player of Hangman """
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional
+import os
+import json
+import hashlib
+import numpy as np
+from server.py.hangman_words import WordStore, PATH_WORDS, get_word_store
+from server.py.tracing import get_tracer
+
+
+DEPTH_BOOK = 3   # number of guesses covered by the opening book
+DIR_CACHE = os.environ.get('HANGMAN_BOOK_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'hangman_book')
+TRACER = get_tracer('hangman_book')
+
+
+def get_store_hash(store: WordStore) -> str:
+    """ Hash of the words of a store (same words give the same hash, independent of the file format) """
+    sha = hashlib.sha256()
+    for length in store.list_length:
+        offset, count = store.dict_block[length]
+        sha.update(f'{length}:{count};'.encode('ascii'))
+        sha.update(store.buffer[offset:offset + length * count])
+    return sha.hexdigest()[:16]
+
+
+def get_book_key(length: int, guessed: str, pattern: str) -> str:
+    """ Key of a book position: word length, guessed letters (any order and case) and revealed pattern """
+    return f"{length}:{''.join(sorted(guessed.upper()))}:{pattern.lower()}"
+
+
+class HangmanBook:
+    """ Precomputed solver guesses of the first positions of each word length and the solver's misses of each word """
+
+    def __init__(self, store_hash: str, depth: int, dict_book: Dict[str, str],
+                 dict_misses: Dict[int, List[int]]) -> None:
+        self.store_hash = store_hash
+        self.depth = depth
+        self.dict_book = dict_book
+        self.dict_misses = dict_misses
+
+    def get_letter(self, length: int, guessed: str, pattern: str) -> Optional[str]:
+        """ Book guess (upper case) of a position, None if the position is not in the book """
+        return self.dict_book.get(get_book_key(length, guessed, pattern))
+
+    def apply_difficulty(self, store: WordStore) -> None:
+        """ Use the solver's misses as difficulty score of the store's words """
+        for length, list_misses in self.dict_misses.items():
+            store.set_difficulty(length, np.array(list_misses))
+
+    def save(self, path: str) -> None:
+        """ Write the book as JSON """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as fout:
+            json.dump({'store_hash': self.store_hash, 'depth': self.depth, 'book': self.dict_book,
+                       'misses': {str(length): misses for length, misses in self.dict_misses.items()}}, fout)
+
+    @classmethod
+    def load(cls, path: str) -> 'HangmanBook':
+        """ Read a book written by 'save' """
+        with open(path, encoding='utf-8') as fin:
+            data = json.load(fin)
+        return cls(data['store_hash'], data['depth'], data['book'],
+                   {int(length): misses for length, misses in data['misses'].items()})
+
+
+def get_path_book(store_hash: str, depth: int = DEPTH_BOOK, dir_cache: str = DIR_CACHE) -> str:
+    """ Path of the cached book of a dictionary (keyed by the hash of its words) """
+    return os.path.join(dir_cache, f'hangman_book_{store_hash}_{depth}.json')
+
+
+DICT_BOOK: Dict[str, Optional[HangmanBook]] = {}
+""" Book of each cache path read by 'load_book' (None if missing), shared by all sessions of the process """
+
+
+def load_book(path: str = PATH_WORDS, depth: int = DEPTH_BOOK, dir_cache: str = DIR_CACHE) -> Optional[HangmanBook]:
+    """ Cached book of a word file, None if it was not built (then the solver decides alone and the words are
+    chosen uniformly); never builds one, run 'python -m server.py.hangman_book_build' offline for that """
+    path_book = get_path_book(get_store_hash(get_word_store(path)), depth, dir_cache)
+    if path_book not in DICT_BOOK:
+        try:
+            DICT_BOOK[path_book] = HangmanBook.load(path_book)
+        except FileNotFoundError:
+            TRACER.warning('No opening book %s, build it with: python -m server.py.hangman_book_build', path_book)
+            DICT_BOOK[path_book] = None
+        except (OSError, ValueError, KeyError) as error:
+            TRACER.warning('Opening book %s not readable: %s', path_book, error)
+            DICT_BOOK[path_book] = None
+    return DICT_BOOK[path_book]
@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional, Tuple
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from server.py.hangman_words import PATH_WORDS, get_word_store
+from server.py.hangman_solver import HangmanSolver, get_index, get_bitset
+from server.py.hangman_evil import get_family_key
+from server.py.hangman_book import DEPTH_BOOK, DIR_CACHE, HangmanBook, get_book_key, get_path_book, get_store_hash
+
+
+def build_length(path: str, length: int, depth: int) -> Tuple[Dict[str, str], List[int]]:  # pylint: disable=too-many-locals
+    """ Play the solver against every word of a length at once (one decision tree), return the book positions of the
+    first guesses and the misses of each word """
+    index = get_index(length, get_word_store(path))
+    solver = HangmanSolver(index)
+    dict_book: Dict[str, str] = {}
+    list_misses = [0] * index.cnt_words
+    stack: List[Tuple[np.ndarray, int, str, int, int]] = [
+        (np.arange(index.cnt_words), 0, '_' * length, 0, 0)
+    ]
+    while stack:
+        idx_candidates, guessed, pattern, cnt_misses, level = stack.pop()
+        if len(idx_candidates) == 1:
+            # the solver only guesses letters of the word once a single candidate is left
+            list_misses[int(idx_candidates[0])] = cnt_misses
+            continue
+        is_candidate = np.zeros(index.cnt_words, dtype=bool)
+        is_candidate[idx_candidates] = True
+        solver.candidates = get_bitset(is_candidate)
+        solver.guessed = guessed
+        letter = solver.get_best_letter()
+        if letter is None:
+            for idx in idx_candidates:
+                list_misses[int(idx)] = cnt_misses
+            continue
+        idx_letter = ord(letter) - ord('a')
+        if level < depth:
+            guessed_letters = ''.join(chr(ord('A') + idx) for idx in range(26) if guessed >> idx & 1)
+            dict_book[get_book_key(length, guessed_letters, pattern)] = letter.upper()
+
+        is_letter = index.letters[idx_candidates] == idx_letter
+        key = get_family_key(is_letter)
+        _, idx_first, idx_family = np.unique(key, return_index=True, return_inverse=True)
+        for family, idx_row in enumerate(idx_first):
+            pattern_family = ''.join(letter if is_hit else char for char, is_hit in zip(pattern, is_letter[idx_row]))
+            stack.append((idx_candidates[idx_family.ravel() == family], guessed | 1 << idx_letter, pattern_family,
+                          cnt_misses + (not is_letter[idx_row].any()), level + 1))
+    return dict_book, list_misses
+
+
+def build_book(path: str = PATH_WORDS, depth: int = DEPTH_BOOK, cnt_workers: Optional[int] = None) -> HangmanBook:
+    """ Build the book of a word file, one word length per task in a process pool (offline, see __main__) """
+    store = get_word_store(path)
+    list_length = sorted(store.list_length, key=store.count, reverse=True)
+    with ProcessPoolExecutor(max_workers=cnt_workers) as executor:
+        list_result = list(executor.map(build_length, [path] * len(list_length), list_length,
+                                        [depth] * len(list_length)))
+    dict_book: Dict[str, str] = {}
+    dict_misses: Dict[int, List[int]] = {}
+    for length, (dict_book_length, list_misses) in zip(list_length, list_result):
+        dict_book.update(dict_book_length)
+        dict_misses[length] = list_misses
+    return HangmanBook(get_store_hash(store), depth, dict_book, dict_misses)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Precompute the Hangman opening book and word difficulty table")
+    parser.add_argument('path', nargs='?', default=PATH_WORDS, help="word file (JSON, text or binary store)")
+    parser.add_argument('--depth', type=int, default=DEPTH_BOOK, help="number of guesses covered by the book")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('--cache', default=DIR_CACHE, help="directory of the books read by the server "
+                                                          "(default $HANGMAN_BOOK_DIR or ~/.cache/hangman_book)")
+    args = parser.parse_args()
+
+    book_built = build_book(args.path, args.depth, cnt_workers=args.workers)
+    book_built.save(get_path_book(book_built.store_hash, args.depth, args.cache))
+    print(f"{len(book_built.dict_book)} book positions, {sum(map(len, book_built.dict_misses.values()))} words "
+          f"(dictionary {book_built.store_hash})", file=sys.stderr)
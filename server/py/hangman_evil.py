@@ -0,0 +1,93 @@
+from typing import Optional
+import random
+import numpy as np
+from server.py.hangman import Hangman, HangmanGameState, GamePhase, GuessLetterAction
+from server.py.hangman_words import WordStore, get_word_store, normalize_word
+
+
+MAGIC_PACK = np.uint64(0x0102040810204080)  # multiplier gathering the low bit of each of 8 bytes into the top byte
+
+
+def get_pattern_key(is_letter: np.ndarray) -> np.ndarray:
+    """ One integer key per row of a (count x length) boolean pattern matrix (length up to 64)
+
+    The raw pattern bytes (one 0/1 byte per position) are read 8 at a time as uint64 and packed to 8 bits with a
+    single multiplication, so no per-row Python work or bit packing by position is needed. """
+    cnt_rows, length = is_letter.shape
+    cnt_chunks = (length + 7) // 8
+    padded = np.zeros((cnt_rows, cnt_chunks * 8), dtype=np.uint8)
+    padded[:, :length] = is_letter
+    chunks = padded.view(np.uint64)
+    key = np.zeros(cnt_rows, dtype=np.uint64)
+    for idx_chunk in range(cnt_chunks):
+        key |= ((chunks[:, idx_chunk] * MAGIC_PACK) >> np.uint64(56)) << np.uint64(8 * idx_chunk)
+    return key
+
+
+def get_family_key(is_letter: np.ndarray) -> np.ndarray:
+    """ Key of the reveal pattern of each row, integers up to length 64, packed bytes beyond """
+    if is_letter.shape[1] <= 64:
+        return get_pattern_key(is_letter)
+    key = np.packbits(is_letter, axis=1)
+    key_void: np.ndarray = np.ascontiguousarray(key).view(np.dtype((np.void, key.shape[1]))).ravel()
+    return key_void
+
+
+def get_family(letters: np.ndarray, letter: int) -> np.ndarray:
+    """ Row indices of the largest family of words sharing the reveal pattern of a letter
+
+    On equal size the family revealing fewer positions (a miss first) is kept. """
+    key = get_family_key(letters == letter)
+    key_family, cnt_family = np.unique(key, return_counts=True)
+    cnt_revealed = np.unpackbits(key_family.view(np.uint8).reshape(len(key_family), -1), axis=1).sum(axis=1)
+    family_best = np.lexsort((cnt_revealed, -cnt_family))[0]
+    family: np.ndarray = np.flatnonzero(key == key_family[family_best])
+    return family
+
+
+class EvilHangman(Hangman):
+    """ Hangman where the server does not commit to a word: every guess keeps the largest family of candidate words
+    with the same reveal pattern, 'word_to_guess' is just a representative of the current family """
+
+    def __init__(self, store: Optional[WordStore] = None) -> None:
+        self.store = store or get_word_store()
+        self.length = 0
+        self.candidates = np.zeros(0, dtype=np.int64)   # indices of the candidate words in the store's length block
+        self.letters_candidates = np.zeros((0, 0), dtype=np.uint8)  # letters of the candidate words
+        super().__init__()
+
+    def start(self, length: Optional[int] = None, rng: Optional[random.Random] = None) -> None:
+        """ Start a game with all words of the given (else a random) length as candidates """
+        rng = rng or self.rng
+        if length is None:
+            length = len(self.store.random_word(rng))
+        word_to_guess = self.store.random_word(rng, length=length)
+        self.set_state(HangmanGameState(word_to_guess=word_to_guess, phase=GamePhase.RUNNING, guesses=[],
+                                        incorrect_guesses=[]))
+
+    def set_state(self, state: HangmanGameState) -> None:
+        """ Set the game to a given state, the candidates are all store words consistent with the revealed letters """
+        word = normalize_word(state.word_to_guess)
+        if word is None:
+            raise ValueError(f'Word to guess {state.word_to_guess!r} is not made of letters a-z (see normalize_word)')
+        state.word_to_guess = word
+        super().set_state(state)
+        self.length = len(word)
+        letters = self.store.get_array(self.length)
+        is_candidate = np.ones(len(letters), dtype=bool)
+        for guess in {guess.lower() for guess in state.guesses}:
+            letter = ord(guess) - ord('a')
+            is_letter_word = np.frombuffer(word.encode('ascii'), dtype=np.uint8) - ord('a') == letter
+            is_candidate &= ((letters == letter) == is_letter_word).all(axis=1)
+        self.candidates = np.flatnonzero(is_candidate)
+        self.letters_candidates = letters if is_candidate.all() else letters[self.candidates]
+
+    def apply_action(self, action: GuessLetterAction) -> None:
+        """ Apply the given action to the game after switching to the largest family of the guessed letter """
+        if self.state and self.state.phase == GamePhase.RUNNING and len(self.candidates) > 0 and \
+                action.letter.lower() not in {guess.lower() for guess in self.state.guesses}:
+            family = get_family(self.letters_candidates, ord(action.letter.lower()) - ord('a'))
+            self.candidates = self.candidates[family]
+            self.letters_candidates = self.letters_candidates[family]
+            self.set_word_to_guess(self.store.get_word(self.length, int(self.candidates[0])))
+        super().apply_action(action)
@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Protocol
+import math
+import string
+import weakref
+import numpy as np
+from server.py.game import Player
+from server.py.hangman import HangmanGameState, GuessLetterAction
+from server.py.hangman_words import WordStore, get_word_store
+from server.py.hangman_book import load_book
+
+
+CNT_EXACT_MAX = 1024   # max number of candidates to score guesses by their exact reveal pattern partition
+
+
+def get_bitset(is_set: np.ndarray) -> int:
+    """ Bitset (bit i = word i) of a boolean vector """
+    return int.from_bytes(np.packbits(is_set, bitorder='little').tobytes(), 'little')
+
+
+def get_entropy(list_cnt: List[int], cnt_total: int) -> float:
+    """ Entropy (bits) of a partition given the size of each part """
+    return -sum(cnt / cnt_total * math.log2(cnt / cnt_total) for cnt in list_cnt if cnt)
+
+
+def get_list_idx(bitset: int) -> np.ndarray:
+    """ Indices of the set bits of a bitset """
+    array = np.frombuffer(bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(array, bitorder='little'))
+
+
+class HangmanIndex:
+    """ Bitsets over the words of one length (bit i = word i): one per (position, letter) and one per absent letter """
+
+    def __init__(self, store: WordStore, length: int) -> None:
+        self.store = store
+        self.length = length
+        self.cnt_words = store.count(length)
+        self.mask_all = (1 << self.cnt_words) - 1
+        letters = store.get_array(length)
+        self.letters = letters
+        self.list_pos_letter: List[List[int]] = [
+            [get_bitset(letters[:, pos] == letter) for letter in range(26)] for pos in range(length)
+        ]
+        self.list_absent: List[int] = [get_bitset(~(letters == letter).any(axis=1)) for letter in range(26)]
+        cnt_letter = [self.cnt_words - self.list_absent[letter].bit_count() for letter in range(26)]
+        self.list_letter_by_frequency: List[int] = sorted(range(26), key=lambda letter: -cnt_letter[letter])
+
+    def filter_hit(self, candidates: int, letter: int, list_pos: List[int]) -> int:
+        """ Keep the candidates with the letter at exactly the given positions """
+        for pos in range(self.length):
+            if pos in list_pos:
+                candidates &= self.list_pos_letter[pos][letter]
+            else:
+                candidates &= ~self.list_pos_letter[pos][letter]
+        return candidates
+
+    def filter_miss(self, candidates: int, letter: int) -> int:
+        """ Keep the candidates without the letter """
+        return candidates & self.list_absent[letter]
+
+    def get_list_word(self, candidates: int) -> List[str]:
+        """ Words of the candidate bitset """
+        list_word = []
+        while candidates:
+            bit = candidates & -candidates
+            list_word.append(self.store.get_word(self.length, bit.bit_length() - 1))
+            candidates ^= bit
+        return list_word
+
+
+DICT_INDEX: 'weakref.WeakKeyDictionary[WordStore, Dict[int, HangmanIndex]]' = weakref.WeakKeyDictionary()
+""" Index of each word length of each word store, built on first use """
+
+
+def get_index(length: int, store: Optional[WordStore] = None) -> HangmanIndex:
+    """ Shared index of the words of a length """
+    store = store or get_word_store()
+    dict_index = DICT_INDEX.setdefault(store, {})
+    if length not in dict_index:
+        dict_index[length] = HangmanIndex(store, length)
+    return dict_index[length]
+
+
+class HangmanSolver:
+    """ Candidate words of one game, narrowed down after every guess """
+
+    def __init__(self, index: HangmanIndex) -> None:
+        self.index = index
+        self.candidates = index.mask_all
+        self.guessed = 0   # bit i = letter i was guessed
+
+    def apply_guess(self, letter: str, pattern: str) -> None:
+        """ Narrow the candidates with a guessed letter and the pattern revealed afterwards ('_' = hidden) """
+        idx_letter = ord(letter.lower()) - ord('a')
+        if self.guessed >> idx_letter & 1:
+            return
+        self.guessed |= 1 << idx_letter
+        list_pos = [pos for pos, char in enumerate(pattern.lower()) if char == letter.lower()]
+        if list_pos:
+            self.candidates = self.index.filter_hit(self.candidates, idx_letter, list_pos)
+        else:
+            self.candidates = self.index.filter_miss(self.candidates, idx_letter)
+
+    def get_cnt_candidates(self) -> int:
+        """ Number of remaining candidate words """
+        return self.candidates.bit_count()
+
+    def get_list_score(self, cnt_candidates: int, list_cnt_miss: List[int]) -> List[float]:
+        """ Information gain (bits) of guessing each letter, exact for few candidates, else from the hit frequency """
+        if cnt_candidates > CNT_EXACT_MAX:
+            return [get_entropy([cnt_miss, cnt_candidates - cnt_miss], cnt_candidates) for cnt_miss in list_cnt_miss]
+        # reveal pattern of each letter in each candidate (bit pos = letter at pos), partitioned in one pass
+        letters = self.index.letters[get_list_idx(self.candidates)]
+        is_letter = letters[:, :, None] == np.arange(26, dtype=np.uint8)
+        pattern = (is_letter * (1 << np.arange(self.index.length, dtype=np.int64))[None, :, None]).sum(axis=1)
+        key, cnt_part = np.unique(pattern * 26 + np.arange(26), return_counts=True)
+        prob = cnt_part / cnt_candidates
+        list_score: List[float] = np.bincount(key % 26, weights=-prob * np.log2(prob), minlength=26).tolist()
+        return list_score
+
+    def get_best_letter(self) -> Optional[str]:
+        """ Unguessed letter with the highest information gain (most frequent letter if no candidate is left) """
+        list_letter = [letter for letter in range(26) if not self.guessed >> letter & 1]
+        if not list_letter:
+            return None
+        cnt_candidates = self.get_cnt_candidates()
+        if cnt_candidates == 0:
+            letter_best = next(letter for letter in self.index.list_letter_by_frequency if letter in list_letter)
+            return chr(ord('a') + letter_best)
+        list_cnt_miss = [(self.candidates & absent).bit_count() for absent in self.index.list_absent]
+        list_score = self.get_list_score(cnt_candidates, list_cnt_miss)
+        letter_best = max(list_letter, key=lambda letter: (list_score[letter], -list_cnt_miss[letter], -letter))
+        return chr(ord('a') + letter_best)
+
+
+class OpeningBook(Protocol):
+    """ Precomputed guesses of positions (see hangman_book.HangmanBook) """
+
+    def get_letter(self, length: int, guessed: str, pattern: str) -> Optional[str]:
+        """ Book guess of a position, None if the position is not in the book """
+
+
+class SolverPlayer(Player):
+    """ Guesses the letter with the highest information gain over the dictionary words matching the pattern,
+    the first guesses are looked up in the opening book if one is given (on the default dictionary the cached
+    book, if it was built) """
+
+    def __init__(self, store: Optional[WordStore] = None, book: Optional[OpeningBook] = None) -> None:
+        if store is None and book is None:
+            book = load_book()
+        self.store = store
+        self.book = book
+        self.solver: Optional[HangmanSolver] = None
+        self.list_guess: List[str] = []
+
+    def select_action(self, state: HangmanGameState, actions: List[GuessLetterAction]) -> Optional[GuessLetterAction]:
+        """ Given masked game state and possible actions, select the next action """
+        if len(actions) == 0:
+            return None
+        pattern = state.word_to_guess
+        list_guess = [guess.lower() for guess in state.guesses]
+        if self.solver is None or self.solver.index.length != len(pattern) or \
+                list_guess[:len(self.list_guess)] != self.list_guess:
+            self.solver = HangmanSolver(get_index(len(pattern), self.store))
+            self.list_guess = []
+        for guess in list_guess[len(self.list_guess):]:
+            if guess in string.ascii_lowercase:
+                self.solver.apply_guess(guess, pattern)
+        self.list_guess = list_guess
+
+        dict_action = {action.letter.lower(): action for action in actions}
+        if self.book is not None:
+            letter_book = self.book.get_letter(len(pattern), ''.join(list_guess), pattern)
+            if letter_book is not None and letter_book.lower() in dict_action:
+                return dict_action[letter_book.lower()]
+        letter = self.solver.get_best_letter()
+        while letter is not None and letter not in dict_action:
+            self.solver.guessed |= 1 << ord(letter) - ord('a')
+            letter = self.solver.get_best_letter()
+        return dict_action[letter] if letter is not None else actions[0]
@@ -0,0 +1,203 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import os
+import json
+import mmap
+import random
+import struct
+import unicodedata
+from bisect import bisect_right
+import numpy as np
+
+
+PATH_WORDS = os.path.join(os.path.dirname(__file__), 'hangman_words.json')
+
+MAGIC = b'HWS1'         # header of a binary word store file
+CNT_DIFFICULTY = 3      # difficulty levels: 0 = easy, 1 = medium, 2 = hard
+
+
+def normalize_word(word: str) -> Optional[str]:
+    """ Word as lowercase letters a-z (accents removed, e.g. 'Café' -> 'cafe'), None if other characters remain """
+    word = ''.join(char for char in unicodedata.normalize('NFKD', word.strip().lower())
+                   if not unicodedata.combining(char))
+    return word if word and word.isascii() and word.isalpha() else None
+
+
+class WordStore:
+    """ Read-only word list, grouped by length in one contiguous buffer of lowercase ASCII letters
+
+    The words of length L are stored back to back (L bytes each) in one block per length, so a word is a slice
+    of the buffer and a length block is a (count x L) array view without copies. The buffer is either in memory
+    or memory-mapped from a binary file written by 'save', which lets worker processes share the pages. """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], list_block: List[Tuple[int, int, int]]) -> None:
+        self.buffer = buffer
+        self.dict_block: Dict[int, Tuple[int, int]] = {length: (offset, count) for length, offset, count in list_block}
+        self.list_length: List[int] = sorted(self.dict_block)
+        self.list_cnt_cumulated: List[int] = []   # number of words up to and including each length
+        cnt_words = 0
+        for length in self.list_length:
+            cnt_words += self.dict_block[length][1]
+            self.list_cnt_cumulated.append(cnt_words)
+        self._letter_rank: Optional[np.ndarray] = None
+        self._dict_difficulty: Dict[int, np.ndarray] = {}
+        self._dict_idx_difficulty: Dict[Tuple[Optional[int], int], np.ndarray] = {}
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> 'WordStore':
+        """ Build a store from words (normalized by normalize_word, other words and duplicates dropped) """
+        dict_words: Dict[int, List[str]] = {}
+        for word in sorted({word for word in map(normalize_word, words) if word is not None}):
+            dict_words.setdefault(len(word), []).append(word)
+        list_block = []
+        list_chunk = []
+        offset = 0
+        for length in sorted(dict_words):
+            list_block.append((length, offset, len(dict_words[length])))
+            chunk = ''.join(dict_words[length]).encode('ascii')
+            list_chunk.append(chunk)
+            offset += len(chunk)
+        return cls(b''.join(list_chunk), list_block)
+
+    @classmethod
+    def load(cls, path: str) -> 'WordStore':
+        """ Load a binary store (memory-mapped), a JSON list of words or a text file with one word per line """
+        with open(path, 'rb') as fin:
+            if fin.read(len(MAGIC)) == MAGIC:
+                return cls.open(path)
+        with open(path, encoding='utf-8') as fin:
+            store = cls.from_words(json.load(fin) if path.endswith('.json') else fin)
+        if len(store) == 0:
+            raise ValueError(f'No word of letters a-z in {path}')
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> 'WordStore':
+        """ Memory-map a binary store written by 'save' (read-only, pages shared between processes) """
+        with open(path, 'rb') as fin:
+            buffer = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        cnt_block, = struct.unpack_from('<I', buffer, len(MAGIC))
+        offset_data = len(MAGIC) + 4 + cnt_block * 12
+        list_block = []
+        offset = offset_data
+        for idx in range(cnt_block):
+            length, count = struct.unpack_from('<IQ', buffer, len(MAGIC) + 4 + idx * 12)
+            list_block.append((length, offset, count))
+            offset += length * count
+        return cls(buffer, list_block)
+
+    def save(self, path: str) -> None:
+        """ Write the store as a binary file (header with length and count of each block, then the blocks) """
+        with open(path, 'wb') as fout:
+            fout.write(MAGIC)
+            fout.write(struct.pack('<I', len(self.list_length)))
+            for length in self.list_length:
+                fout.write(struct.pack('<IQ', length, self.dict_block[length][1]))
+            for length in self.list_length:
+                offset, count = self.dict_block[length]
+                fout.write(self.buffer[offset:offset + length * count])
+
+    def __len__(self) -> int:
+        return self.list_cnt_cumulated[-1] if self.list_cnt_cumulated else 0
+
+    def count(self, length: int) -> int:
+        """ Number of words of the given length """
+        return self.dict_block.get(length, (0, 0))[1]
+
+    def get_word(self, length: int, idx: int) -> str:
+        """ Word at the given index of a length block """
+        offset, _ = self.dict_block[length]
+        start = offset + idx * length
+        return self.buffer[start:start + length].decode('ascii')
+
+    def get_list_word(self, length: int) -> List[str]:
+        """ All words of the given length """
+        return [self.get_word(length, idx) for idx in range(self.count(length))]
+
+    def get_array(self, length: int) -> np.ndarray:
+        """ Words of the given length as a (count x length) array of letter indices 0-25 ('a' = 0) """
+        offset, count = self.dict_block.get(length, (0, 0))
+        array = np.frombuffer(self.buffer, dtype=np.uint8, count=count * length, offset=offset).reshape(count, length)
+        letters: np.ndarray = array - ord('a')
+        return letters
+
+    def get_difficulty(self, length: int) -> np.ndarray:
+        """ Difficulty level (0 to CNT_DIFFICULTY - 1) of each word of the given length (computed on first use)
+
+        Scored by the misses of a guesser who tries the letters in order of their frequency in the store, split
+        into equal thirds per length. 'set_difficulty' replaces it with a better table. """
+        if length not in self._dict_difficulty:
+            rank = self._get_letter_rank()
+            letters = self.get_array(length)
+            mask = np.bitwise_or.reduce(np.left_shift(1, letters.astype(np.int64)), axis=1)
+            cnt_distinct = ((mask[:, None] >> np.arange(26)) & 1).sum(axis=1)
+            score = rank[letters].max(axis=1, initial=0) + 1 - cnt_distinct
+            self.set_difficulty(length, score)
+        return self._dict_difficulty[length]
+
+    def set_difficulty(self, length: int, score: np.ndarray) -> None:
+        """ Set the difficulty levels of a length block from a score per word (higher = harder) """
+        level = np.zeros(len(score), dtype=np.int8)
+        level[np.argsort(score, kind='stable')] = np.arange(len(score)) * CNT_DIFFICULTY // max(1, len(score))
+        self._dict_difficulty[length] = level
+        self._dict_idx_difficulty = {key: idx for key, idx in self._dict_idx_difficulty.items()
+                                     if key[0] not in (None, length)}
+
+    def random_word(self, rng: Optional[random.Random] = None, length: Optional[int] = None,
+                    difficulty: Optional[int] = None) -> str:
+        """ Uniformly random word, optionally of the given length and/or difficulty level (O(1) after first use) """
+        randrange = rng.randrange if rng else random.randrange
+        if difficulty is not None:
+            list_pos = self._get_idx_difficulty(length, difficulty)
+            if len(list_pos) == 0:
+                raise ValueError(f"No word of length {length} with difficulty {difficulty}.")
+            pos = int(list_pos[randrange(len(list_pos))])
+        elif length is not None:
+            if self.count(length) == 0:
+                raise ValueError(f"No word of length {length}.")
+            return self.get_word(length, randrange(self.count(length)))
+        else:
+            if len(self) == 0:
+                raise ValueError("The word store is empty.")
+            pos = randrange(len(self))
+        idx_length = bisect_right(self.list_cnt_cumulated, pos)
+        cnt_before = self.list_cnt_cumulated[idx_length - 1] if idx_length > 0 else 0
+        return self.get_word(self.list_length[idx_length], pos - cnt_before)
+
+    def _get_idx_difficulty(self, length: Optional[int], difficulty: int) -> np.ndarray:
+        """ Global positions (over all lengths) of the words of a difficulty level, optionally of one length """
+        key = (length, difficulty)
+        if key not in self._dict_idx_difficulty:
+            list_pos = []
+            cnt_before = 0
+            for length_block, cnt_cumulated in zip(self.list_length, self.list_cnt_cumulated):
+                if length is None or length == length_block:
+                    list_pos.append(cnt_before + np.flatnonzero(self.get_difficulty(length_block) == difficulty))
+                cnt_before = cnt_cumulated
+            self._dict_idx_difficulty[key] = np.concatenate(list_pos) if list_pos else np.zeros(0, dtype=np.int64)
+        return self._dict_idx_difficulty[key]
+
+    def _get_letter_rank(self) -> np.ndarray:
+        """ Rank of each letter by the number of words containing it (0 = most frequent) """
+        if self._letter_rank is not None:
+            return self._letter_rank
+        cnt_letter = np.zeros(26, dtype=np.int64)
+        for length in self.list_length:
+            letters = self.get_array(length)
+            present = np.zeros((len(letters), 26), dtype=bool)
+            present[np.arange(len(letters))[:, None], letters] = True
+            cnt_letter += present.sum(axis=0)
+        rank = np.zeros(26, dtype=np.int64)
+        rank[np.argsort(-cnt_letter, kind='stable')] = np.arange(26)
+        self._letter_rank = rank
+        return rank
+
+
+DICT_WORD_STORE: Dict[str, WordStore] = {}
+""" Word store of each loaded path, shared by all sessions of the process """
+
+
+def get_word_store(path: str = PATH_WORDS) -> WordStore:
+    """ Shared word store of a word file, loaded on first use """
+    if path not in DICT_WORD_STORE:
+        DICT_WORD_STORE[path] = WordStore.load(path)
+    return DICT_WORD_STORE[path]
@@ -1,15 +1,13 @@
+from typing import Optional
+import asyncio
+
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-import json
-import asyncio
-
-import server.py.hangman as hangman
-import server.py.battleship as battleship
-
-import random
+from server.py import (hangman, hangman_words, hangman_evil, hangman_book, battleship, battleship_bot, async_player,
+                       tracing)
 
 app = FastAPI()
 
@@ -17,6 +15,14 @@ app.mount("/inc/static", StaticFiles(directory="server/inc/static"), name="stati
 
 templates = Jinja2Templates(directory="server/inc/templates")
 
+hangman_word_store = hangman_words.get_word_store()
+hangman_opening_book = hangman_book.load_book()   # None until built offline: no difficulty levels then
+if hangman_opening_book is not None:
+    hangman_opening_book.apply_difficulty(hangman_word_store)
+
+BOT_TIMEOUT = 5.0   # seconds a bot may think before a random action is taken instead
+TRACER = tracing.get_tracer('main')
+
 
 @app.get("/", response_class=HTMLResponse)
 async def get(request: Request):
@@ -30,35 +36,33 @@ async def hangman_singleplayer(request: Request):
     return templates.TemplateResponse("game/hangman/singleplayer_local.html", {"request": request})
 
 @app.websocket("/hangman/singleplayer/ws")
-async def hangman_singleplayer_ws(websocket: WebSocket):
+async def hangman_singleplayer_ws(websocket: WebSocket, mode: str = 'classic', difficulty: Optional[int] = None):
     await websocket.accept()
 
     idx_player_you = 0
 
     try:
 
-        game = hangman.Hangman()
+        if mode == 'evil':
+            game = hangman_evil.EvilHangman(hangman_word_store)
+            game.start()
+        else:
+            game = hangman.Hangman()
 
-        words = []
-        with open('server/py/hangman_words.json') as fin:
-            words = json.load(fin)
-        word_to_guess = random.choice(words)
+            word_to_guess = hangman_word_store.random_word(
+                game.rng, difficulty=difficulty if hangman_opening_book is not None else None)
 
-        state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING, guesses=[], incorrect_guesses=[])
-        game.set_state(state)
+            state = hangman.HangmanGameState(word_to_guess=word_to_guess, phase=hangman.GamePhase.RUNNING,
+                                             guesses=[], incorrect_guesses=[])
+            game.set_state(state)
 
         while True:
 
-            state = game.get_player_view(idx_player_you)
-
             game.print_state()
 
             state = game.get_player_view(idx_player_you)
             list_action = game.get_list_action()
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = [action.model_dump() for action in list_action]
-            data = {'type': 'update', 'state': dict_state}
+            data = {'type': 'update', 'state': game.get_payload(idx_player_you)}
             await websocket.send_json(data)
 
             if state.phase == hangman.GamePhase.FINISHED:
@@ -71,19 +75,10 @@ async def hangman_singleplayer_ws(websocket: WebSocket):
                 if data['type'] == 'action':
                     action = hangman.GuessLetterAction.model_validate(data['action'])
                     game.apply_action(action)
-                    print(action)
-
-            continue
-            state = game.get_player_view(idx_player_you)
-            dict_state = state.model_dump()
-            dict_state['idx_player_you'] = idx_player_you
-            dict_state['list_action'] = []
-
-            data = {'type': 'update', 'state': dict_state}
-            await websocket.send_json(data)
+                    TRACER.debug('action %s', action)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 # ----- Battleship -----
@@ -99,17 +94,16 @@ async def battleship_simulation_ws(websocket: WebSocket):
 
     idx_player_you = 0
 
+    player = async_player.ThreadPlayer(battleship.RandomPlayer(), BOT_TIMEOUT)
+
     try:
         game = battleship.Battleship()
-        player = battleship.RandomPlayer()
 
         while True:
 
             state = game.get_state()
-            list_action = game.get_list_action()
-            action = None
-            if len(list_action) > 0:
-                action = player.select_action(state, list_action)
+            list_action = await asyncio.to_thread(game.get_list_action)
+            action = await player.select_action(state, list_action)
 
             dict_state = state.model_dump()
             dict_state['idx_player_you'] = idx_player_you
@@ -128,7 +122,10 @@ async def battleship_simulation_ws(websocket: WebSocket):
                 game.apply_action(action)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
+
+    finally:
+        player.close()
 
 
 @app.get("/battleship/singleplayer", response_class=HTMLResponse)
@@ -141,11 +138,11 @@ async def battleship_singleplayer_ws(websocket: WebSocket):
     await websocket.accept()
 
     idx_player_you = 0
+    player = async_player.ThreadPlayer(battleship_bot.DensityPlayer(), BOT_TIMEOUT, battleship.RandomPlayer())
 
     try:
 
         game = battleship.Battleship()
-        player = battleship.RandomPlayer()
 
         while True:
 
@@ -157,12 +154,8 @@ async def battleship_singleplayer_ws(websocket: WebSocket):
 
             if state.idx_player_active == idx_player_you:
 
-                state = game.get_player_view(idx_player_you)
                 list_action = game.get_list_action()
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = [action.model_dump() for action in list_action]
-                data = {'type': 'update', 'state': dict_state}
+                data = {'type': 'update', 'state': game.get_payload(idx_player_you)}
                 await websocket.send_json(data)
 
                 if len(list_action) == 0:
@@ -172,33 +165,27 @@ async def battleship_singleplayer_ws(websocket: WebSocket):
                     if data['type'] == 'action':
                         action = battleship.BattleshipAction.model_validate(data['action'])
                         game.apply_action(action)
-                        print(action)
+                        TRACER.debug('action %s', action)
 
-                state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-
-                data = {'type': 'update', 'state': dict_state}
+                data = {'type': 'update', 'state': game.get_payload(idx_player_you, with_actions=False)}
                 await websocket.send_json(data)
 
             else:
 
                 state = game.get_player_view(state.idx_player_active)
-                list_action = game.get_list_action()
-                action = player.select_action(state, list_action)
+                list_action = await asyncio.to_thread(game.get_list_action)
+                action = await player.select_action(state, list_action)
                 if action is not None:
                     await asyncio.sleep(1)
                 game.apply_action(action)
-                state = game.get_player_view(idx_player_you)
-                dict_state = state.model_dump()
-                dict_state['idx_player_you'] = idx_player_you
-                dict_state['list_action'] = []
-                data = {'type': 'update', 'state': dict_state}
+                data = {'type': 'update', 'state': game.get_payload(idx_player_you, with_actions=False)}
                 await websocket.send_json(data)
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
+
+    finally:
+        player.close()
 
 
 # ----- UNO -----
@@ -217,7 +204,7 @@ async def uno_simulation_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 @app.get("/uno/singleplayer", response_class=HTMLResponse)
@@ -234,7 +221,7 @@ async def uno_singleplayer_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 @app.websocket("/uno/random_player/ws")
@@ -246,7 +233,7 @@ async def uno_random_player_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 # ----- Dog -----
@@ -265,7 +252,7 @@ async def dog_simulation_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 @app.get("/dog/singleplayer", response_class=HTMLResponse)
@@ -282,7 +269,7 @@ async def dog_singleplayer_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
 
 
 @app.websocket("/dog/random_player/ws")
@@ -294,4 +281,4 @@ async def dog_random_player_ws(websocket: WebSocket):
         pass
 
     except WebSocketDisconnect:
-        print('DISCONNECTED')
+        TRACER.info('disconnected', path=websocket.url.path)
@@ -0,0 +1,346 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import copy
+import math
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor
+from server.py.game import Game, GameState, GameAction, Player, Snapshot
+from server.py.selfplay import get_winner
+
+
+C_EXPLORE = 1.4            # exploration constant of the UCT formula
+MAX_DEPTH_ROLLOUT = 1000   # random playouts still running after this number of steps are scored as a draw
+CNT_BATCH = 2              # leaves per worker and batch of tree parallelism (a batch may overrun the budget)
+
+Determinize = Callable[[GameState, random.Random], GameState]   # complete state sampled from a player's view
+Evaluate = Callable[[Game, Optional[int]], List[float]]         # reward of each player (game, last player to move)
+RootStats = Dict[str, Tuple[int, float]]                        # visits and reward of each root action (by repr)
+
+
+def determinize_copy(state: GameState, rng: random.Random) -> GameState:  # pylint: disable=unused-argument
+    """ Determinization of games with perfect information (or of a complete state): a copy of the state """
+    return copy.deepcopy(state)
+
+
+def get_cnt_players(state: GameState) -> int:
+    """ Number of players of a state ('list_player' or 'players', else single player) """
+    players = getattr(state, 'list_player', None) or getattr(state, 'players', None)
+    return len(players) if players else 1
+
+
+def get_idx_player(state: GameState) -> int:
+    """ Player to move in a state """
+    return getattr(state, 'idx_player_active', None) or 0
+
+
+def get_rewards(game: Game, idx_player_last: Optional[int]) -> List[float]:
+    """ Reward of each player: 1 for the winner (see selfplay.get_winner, in team games all players of the winning
+    team) and 0 for the others, if the game is not finished the draw reward 1 / max(2, number of players) for all """
+    state = game.get_state()
+    cnt_players = get_cnt_players(state)
+    if state.phase != 'finished':
+        return [1 / max(2, cnt_players)] * cnt_players
+    winner = get_winner(game, idx_player_last)
+    cnt_teams = getattr(game, 'CNT_TEAMS', cnt_players)
+    return [1.0 if idx % cnt_teams == winner else 0.0 for idx in range(cnt_players)]
+
+
+class GameSaver:
+    """ Saves and restores the state of a game with its snapshots """
+
+    def __init__(self, game: Game) -> None:
+        self.game = game
+
+    def save(self) -> Snapshot:
+        """ Token of the current state """
+        return self.game.snapshot()
+
+    def load(self, token: Snapshot) -> None:
+        """ Set the game back to the state of a token """
+        self.game.restore(token)
+
+
+class SearchConfig:
+    """ What a search needs to know about a game, shared with the worker processes (must be picklable) """
+
+    def __init__(self, game_class: type, determinize: Determinize = determinize_copy,  # pylint: disable=too-many-arguments
+                 evaluate: Evaluate = get_rewards, with_pass: bool = True, c_explore: float = C_EXPLORE,
+                 max_depth: int = MAX_DEPTH_ROLLOUT) -> None:
+        self.game_class = game_class
+        self.determinize = determinize   # information set sampling: the complete state of a player's view
+        self.evaluate = evaluate         # reward of each player at the end of a playout
+        self.with_pass = with_pass       # without actions the game takes None (else the playout ends there)
+        self.c_explore = c_explore
+        self.max_depth = max_depth
+
+
+def play_rollout(game: Game, rng: random.Random, config: SearchConfig) -> List[float]:
+    """ Play random actions (sampled without listing all actions) to the end of the game (or the depth limit),
+    return the reward of each player """
+    idx_player_last = None
+    for _ in range(config.max_depth):
+        state = game.get_state()
+        if state.phase == 'finished':
+            break
+        action = game.sample_action(rng)
+        if action is None and not config.with_pass:
+            break
+        idx_player_last = get_idx_player(state)
+        game.apply_action(action)
+    return config.evaluate(game, idx_player_last)
+
+
+class Node:
+    """ Node of a search tree: the saved state, its actions and the statistics of the move leading to it """
+
+    __slots__ = ('token', 'idx_player', 'idx_player_parent', 'list_action', 'list_child', 'is_terminal',
+                 'cnt_visits', 'cnt_virtual', 'sum_reward')
+
+    def __init__(self, token: Any, state: GameState, list_action: List[GameAction], idx_player_parent: int) -> None:
+        self.token = token
+        self.idx_player = get_idx_player(state)       # player to move
+        self.idx_player_parent = idx_player_parent    # player who made the move leading to this node
+        self.list_action = list_action
+        self.list_child: List[Optional[Node]] = [None] * len(list_action)
+        self.is_terminal = not list_action   # finished, or no action and no pass
+        self.cnt_visits = 0
+        self.cnt_virtual = 0       # playouts running below this node (virtual losses of tree parallelism)
+        self.sum_reward = 0.0      # reward of 'idx_player_parent' summed over the playouts below this node
+
+
+class SearchTree:
+    """ UCT search tree over a game (the game is used for expansion and changed by the search) """
+
+    def __init__(self, game: Game, config: SearchConfig) -> None:
+        self.game = game
+        self.config = config
+        self.saver = GameSaver(game)
+        self.root = self.make_node(-1)
+
+    def make_node(self, idx_player_parent: int) -> Node:
+        """ Node of the current state of the game """
+        state = self.game.get_state()
+        list_action: List[GameAction] = []
+        if state.phase != 'finished':
+            list_action = self.game.get_list_action()
+            if not list_action and self.config.with_pass:
+                list_action = [None]
+        return Node(self.saver.save(), state, list_action, idx_player_parent)
+
+    def get_idx_child(self, node: Node) -> int:
+        """ Child to descend to: the first not expanded, else the best by UCT (virtual losses count as visits) """
+        for idx, child in enumerate(node.list_child):
+            if child is None:
+                return idx
+        log_visits = math.log(node.cnt_visits + node.cnt_virtual)
+        idx_best, score_best = 0, -math.inf
+        for idx, child in enumerate(node.list_child):
+            assert child is not None
+            cnt = child.cnt_visits + child.cnt_virtual
+            score = child.sum_reward / cnt + self.config.c_explore * math.sqrt(log_visits / cnt)
+            if score > score_best:
+                idx_best, score_best = idx, score
+        return idx_best
+
+    def select(self) -> List[Node]:
+        """ Path from the root to a new leaf (or a terminal node), marked as running until 'backpropagate' """
+        node = self.root
+        path = [node]
+        while not node.is_terminal:
+            idx_child = self.get_idx_child(node)
+            child = node.list_child[idx_child]
+            if child is None:
+                self.saver.load(node.token)
+                self.game.apply_action(node.list_action[idx_child])
+                child = node.list_child[idx_child] = self.make_node(node.idx_player)
+                path.append(child)
+                break
+            node = child
+            path.append(node)
+        for node in path:
+            node.cnt_virtual += 1
+        return path
+
+    def backpropagate(self, path: List[Node], rewards: List[float]) -> None:
+        """ Add the rewards of a playout from the leaf of a path """
+        for node in path:
+            node.cnt_virtual -= 1
+            node.cnt_visits += 1
+            if node.idx_player_parent >= 0:
+                node.sum_reward += rewards[node.idx_player_parent % len(rewards)]
+
+    def get_root_stats(self) -> RootStats:
+        """ Visits and reward of each root action by its repr """
+        return {repr(action): (child.cnt_visits, child.sum_reward)
+                for action, child in zip(self.root.list_action, self.root.list_child) if child is not None}
+
+
+def search_tree(game: Game, config: SearchConfig, state: GameState, rng: random.Random,  # pylint: disable=too-many-arguments
+                time_budget: Optional[float], max_iterations: Optional[int]) -> Tuple[RootStats, int]:
+    """ Search one tree of a determinization of the state until the budget is used up, return the root statistics
+    and the number of iterations (the game's own random decisions, e.g. reshuffles, are drawn with the search's rng) """
+    game.rng = rng
+    game.set_state(config.determinize(state, rng))
+    tree = SearchTree(game, config)
+    time_end = time.perf_counter() + time_budget if time_budget is not None else math.inf
+    cnt_iterations = 0
+    while (max_iterations is None or cnt_iterations < max_iterations) and time.perf_counter() < time_end:
+        path = tree.select()
+        tree.saver.load(path[-1].token)
+        tree.backpropagate(path, play_rollout(game, rng, config))
+        cnt_iterations += 1
+    return tree.get_root_stats(), cnt_iterations
+
+
+WORKER: Dict[str, Any] = {}
+""" Search configuration and game of a worker process, created once by 'init_worker' """
+
+
+def init_worker(config: SearchConfig) -> None:
+    """ Create the game of a worker (reused for all its searches and playouts) """
+    WORKER['config'] = config
+    WORKER['game'] = config.game_class()
+    WORKER['saver'] = GameSaver(WORKER['game'])
+
+
+def run_search(state: GameState, seed: int, time_budget: Optional[float],
+               max_iterations: Optional[int]) -> Tuple[RootStats, int]:
+    """ Search one tree in a worker (root parallelism) """
+    return search_tree(WORKER['game'], WORKER['config'], state, random.Random(seed), time_budget, max_iterations)
+
+
+def run_rollouts(list_token: List[Any], seed: int) -> List[List[float]]:
+    """ Play a random playout from each saved state in a worker (tree parallelism) """
+    rng = random.Random(seed)
+    list_rewards = []
+    for token in list_token:
+        WORKER['saver'].load(token)
+        list_rewards.append(play_rollout(WORKER['game'], rng, WORKER['config']))
+    return list_rewards
+
+
+class SearchStats:
+    """ Iterations and time of the searches of a player """
+
+    def __init__(self) -> None:
+        self.cnt_searches = 0
+        self.cnt_iterations = 0
+        self.time_search = 0.0
+        self.cnt_iterations_last = 0
+        self.time_search_last = 0.0
+
+    def add(self, cnt_iterations: int, time_search: float) -> None:
+        """ Add a search """
+        self.cnt_searches += 1
+        self.cnt_iterations += cnt_iterations
+        self.time_search += time_search
+        self.cnt_iterations_last = cnt_iterations
+        self.time_search_last = time_search
+
+    def get_iterations_per_sec(self) -> float:
+        """ Iterations per second over all searches """
+        return self.cnt_iterations / max(self.time_search, 1e-9)
+
+    def get_report(self) -> str:
+        """ Throughput of the last and of all searches """
+        return (f'Last search: {self.cnt_iterations_last} iterations in {self.time_search_last:.3f} s '
+                f'({self.cnt_iterations_last / max(self.time_search_last, 1e-9):.0f} it/s), '
+                f'all {self.cnt_searches} searches: {self.get_iterations_per_sec():.0f} it/s')
+
+
+class MctsPlayer(Player):
+    """ Monte Carlo tree search (UCT with random playouts) for any Game
+
+    The tree is searched on determinizations of the player's view (see SearchConfig.determinize) and saves states
+    by the game's snapshots. The search is anytime: it stops when the wall-clock
+    'time_budget' (seconds) or 'max_iterations' is used up and plays the most visited action.
+
+    With workers the search runs in a process pool: 'root' parallelism searches one tree per worker (each on its
+    own determinization) and adds up the visits of the root actions, 'tree' parallelism grows one tree and plays
+    batches of playouts from leaves selected with virtual losses in the workers. """
+
+    def __init__(self, config: SearchConfig, time_budget: Optional[float] = 1.0,  # pylint: disable=too-many-arguments
+                 max_iterations: Optional[int] = None, cnt_workers: int = 0, parallelism: str = 'root',
+                 seed: Optional[int] = None) -> None:
+        if parallelism not in ('root', 'tree'):
+            raise ValueError(f"Unknown parallelism '{parallelism}' (expected 'root' or 'tree').")
+        if time_budget is None and max_iterations is None:
+            raise ValueError("A search needs a time budget or a maximum number of iterations.")
+        self.config = config
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.cnt_workers = cnt_workers
+        self.parallelism = parallelism
+        self.rng = random.Random(seed)
+        self.stats = SearchStats()
+        self.game: Optional[Game] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        """ Process pool of the workers, started on first use """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.cnt_workers, initializer=init_worker,
+                                                initargs=(self.config,))
+        return self.executor
+
+    def close(self) -> None:
+        """ Stop the worker processes """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def select_action(self, state: GameState, actions: List[GameAction]) -> Optional[GameAction]:
+        """ Given masked game state and possible actions, select the most visited action of the search """
+        if len(actions) <= 1:
+            return actions[0] if actions else None
+        time_start = time.perf_counter()
+        if self.cnt_workers <= 0:
+            if self.game is None:
+                self.game = self.config.game_class()
+            root_stats, cnt_iterations = search_tree(self.game, self.config, state, self.rng, self.time_budget,
+                                                     self.max_iterations)
+        elif self.parallelism == 'root':
+            root_stats, cnt_iterations = self.search_root_parallel(state)
+        else:
+            root_stats, cnt_iterations = self.search_tree_parallel(state)
+        self.stats.add(cnt_iterations, time.perf_counter() - time_start)
+        return max(actions, key=lambda action: root_stats.get(repr(action), (0, 0.0)))
+
+    def search_root_parallel(self, state: GameState) -> Tuple[RootStats, int]:
+        """ One tree per worker, the visits and rewards of the root actions are added up """
+        max_iterations = None if self.max_iterations is None else -(-self.max_iterations // self.cnt_workers)
+        list_future = [self.get_executor().submit(run_search, state, self.rng.getrandbits(64), self.time_budget,
+                                                  max_iterations)
+                       for _ in range(self.cnt_workers)]
+        root_stats: Dict[str, Tuple[int, float]] = {}
+        cnt_iterations = 0
+        for future in list_future:
+            root_stats_tree, cnt_iterations_tree = future.result()
+            cnt_iterations += cnt_iterations_tree
+            for key, (cnt_visits, sum_reward) in root_stats_tree.items():
+                cnt_visits_all, sum_reward_all = root_stats.get(key, (0, 0.0))
+                root_stats[key] = (cnt_visits_all + cnt_visits, sum_reward_all + sum_reward)
+        return root_stats, cnt_iterations
+
+    def search_tree_parallel(self, state: GameState) -> Tuple[RootStats, int]:
+        """ One tree, the playouts of each batch of leaves are played by the workers """
+        if self.game is None:
+            self.game = self.config.game_class()
+        self.game.set_state(self.config.determinize(state, self.rng))
+        tree = SearchTree(self.game, self.config)
+        executor = self.get_executor()
+        time_end = time.perf_counter() + self.time_budget if self.time_budget is not None else math.inf
+        cnt_iterations = 0
+        while (self.max_iterations is None or cnt_iterations < self.max_iterations) and time.perf_counter() < time_end:
+            cnt_batch = CNT_BATCH * self.cnt_workers
+            if self.max_iterations is not None:
+                cnt_batch = min(cnt_batch, self.max_iterations - cnt_iterations)
+            list_path = [tree.select() for _ in range(cnt_batch)]
+            list_token = [path[-1].token for path in list_path]
+            list_chunk = [list_token[idx::self.cnt_workers] for idx in range(self.cnt_workers)]
+            list_seed = [self.rng.getrandbits(64) for _ in list_chunk]
+            for idx, list_rewards in enumerate(executor.map(run_rollouts, list_chunk, list_seed)):
+                for path, rewards in zip(list_path[idx::self.cnt_workers], list_rewards):
+                    tree.backpropagate(path, rewards)
+            cnt_iterations += cnt_batch
+        return tree.get_root_stats(), cnt_iterations
@@ -0,0 +1,220 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import sys
+import time
+import random
+import argparse
+import importlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from server.py.game import Game, Player, get_rng, get_seed_sequence
+from server.py.tracing import get_tracer
+
+
+CNT_GAMES_SHARD = 64       # games per task sent to a worker
+MAX_STEPS = 100000         # games still running after this number of steps are counted as truncated
+
+GameResult = Tuple[Optional[int], int, str]   # winner, number of steps, status ('finished', 'truncated' or 'error')
+
+TRACER = get_tracer('selfplay')
+
+
+class GameFailed(Exception):
+    """ A game raised an exception while played (the cause), after a number of steps """
+
+    def __init__(self, cnt_steps: int) -> None:
+        super().__init__(f'game failed after {cnt_steps} steps')
+        self.cnt_steps = cnt_steps
+
+
+def get_class(name: str, name_default: Optional[str] = None) -> type:
+    """ Class of a 'module.Class' name of server/py (only 'module' takes 'name_default' as class) """
+    module_name, _, class_name = name.partition('.')
+    module = importlib.import_module(f'server.py.{module_name}')
+    return getattr(module, class_name or name_default or '')  # type: ignore[no-any-return]
+
+
+def seed_game(seed: int, idx_game: int) -> random.Random:
+    """ Generator of one game of a run, the stream (root seed, game index) of 'get_seed_sequence': any game of a run
+    is replayed from these two numbers (the global generators are seeded too, for players not using their own) """
+    rng_global = get_rng(get_seed_sequence(seed, idx_game, 0))
+    random.seed(rng_global.getrandbits(64))
+    np.random.seed(rng_global.getrandbits(32))
+    return get_rng(get_seed_sequence(seed, idx_game))
+
+
+def seed_player(player: Player, seed: int, idx_game: int, idx_player: int) -> None:
+    """ Seed a player for one game of a run with the stream (root seed, game index, 1 + seat) """
+    player.seed(get_seed_sequence(seed, idx_game, 1 + idx_player))
+
+
+def start_game(game: Game, rng: random.Random) -> None:
+    """ Bring a new game to its first move with the generator as its own: games with a 'start' method are started,
+    the others get their initial state set again (which runs the setup of e.g. Uno) """
+    game.rng = rng
+    if hasattr(game, 'start'):
+        game.start(rng=rng)
+    else:
+        game.set_state(game.get_state())
+
+
+def get_winner(game: Game, idx_player_last: Optional[int]) -> Optional[int]:
+    """ Winner of a finished game: for team games the winning team (team t: the seats t modulo 'CNT_TEAMS'), the
+    state's 'winner' if it has one, for single player games 0 if won, else the player who made the last move """
+    if hasattr(game, 'get_team_won'):
+        return game.get_team_won()  # type: ignore[no-any-return]
+    state = game.get_state()
+    if hasattr(state, 'winner'):
+        return state.winner  # type: ignore[no-any-return]
+    if hasattr(game, 'is_won'):
+        return 0 if game.is_won() else None
+    return idx_player_last
+
+
+def play_game(game: Game, dict_player: Dict[int, Player], max_steps: int = MAX_STEPS) -> GameResult:
+    """ Play a started game to the end, return the winner, the number of steps and the status
+
+    An exception of the game or a player is raised as GameFailed with the number of steps played. """
+    cnt_steps = 0
+    idx_player_last = None
+    try:
+        state = game.get_state()
+        while state.phase != 'finished':
+            if cnt_steps >= max_steps:
+                return None, cnt_steps, 'truncated'
+            idx_player = getattr(state, 'idx_player_active', None) or 0
+            list_action = game.get_list_action()
+            action = None
+            if list_action:
+                action = dict_player[idx_player].select_action(game.get_player_view(idx_player), list_action)
+            game.apply_action(action)
+            idx_player_last = idx_player
+            cnt_steps += 1
+            state = game.get_state()
+        return get_winner(game, idx_player_last), cnt_steps, 'finished'
+    except Exception as error:
+        raise GameFailed(cnt_steps) from error
+
+
+class SeatPlayers(dict):
+    """ Player of each seat, created on first use from the player classes (seat i plays class i modulo count) """
+
+    def __init__(self, list_player_class: List[type]) -> None:
+        super().__init__()
+        self.list_player_class = list_player_class
+        self.game_seeded: Optional[Tuple[int, int]] = None   # root seed and index of the game played
+
+    def seed_players(self, seed: int, idx_game: int) -> None:
+        """ Seed the players (also those created later) for one game of a run """
+        self.game_seeded = (seed, idx_game)
+        for idx_player, player in self.items():
+            seed_player(player, seed, idx_game, idx_player)
+
+    def __missing__(self, idx_player: int) -> Player:
+        player: Player = self.list_player_class[idx_player % len(self.list_player_class)]()
+        if self.game_seeded is not None:
+            seed_player(player, *self.game_seeded, idx_player)
+        self[idx_player] = player
+        return player
+
+
+WORKER: Dict[str, Any] = {}
+""" Game class and players of a worker process, created once by 'init_worker' and reused for all its games """
+
+
+def init_worker(game_name: str, list_player_name: List[str]) -> None:
+    """ Import the game and player classes and create the players of a worker (warm for all its games) """
+    WORKER['game_class'] = get_class(game_name)
+    WORKER['players'] = SeatPlayers([get_class(name, 'RandomPlayer') for name in list_player_name])
+
+
+def run_shard(seed: int, idx_first: int, cnt_games: int, max_steps: int = MAX_STEPS) -> List[GameResult]:
+    """ Play the games idx_first .. idx_first + cnt_games - 1 in a worker, return the result of each
+
+    A game raising an exception (e.g. a rule bug) is counted as an error with the steps played and does not stop
+    the others, the exception is traced with the seed and game index that replay it. """
+    list_result: List[GameResult] = []
+    for idx_game in range(idx_first, idx_first + cnt_games):
+        rng = seed_game(seed, idx_game)
+        WORKER['players'].seed_players(seed, idx_game)
+        try:
+            game = WORKER['game_class']()
+            start_game(game, rng)
+            list_result.append(play_game(game, WORKER['players'], max_steps))
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            cnt_steps = error.cnt_steps if isinstance(error, GameFailed) else 0
+            TRACER.error('game %d of seed %d failed after %d steps\n%s', idx_game, seed, cnt_steps,
+                         traceback.format_exc())
+            list_result.append((None, cnt_steps, 'error'))
+    return list_result
+
+
+def run_selfplay(game_name: str, list_player_name: List[str], cnt_games: int,  # pylint: disable=too-many-arguments
+                 cnt_workers: Optional[int] = None, seed: int = 0,
+                 max_steps: int = MAX_STEPS) -> Iterator[List[GameResult]]:
+    """ Play games in a process pool, yield the results of each shard as soon as it is done (in any order)
+
+    The games and players are seeded per game, so the games do not depend on the number of workers. """
+    with ProcessPoolExecutor(max_workers=cnt_workers, initializer=init_worker,
+                             initargs=(game_name, list_player_name)) as executor:
+        list_future = [executor.submit(run_shard, seed, idx_first, min(CNT_GAMES_SHARD, cnt_games - idx_first),
+                                       max_steps)
+                       for idx_first in range(0, cnt_games, CNT_GAMES_SHARD)]
+        for future in as_completed(list_future):
+            yield future.result()
+
+
+class SelfPlayStats:
+    """ Running totals of self-play results """
+
+    def __init__(self, name_winner: str = 'Player') -> None:
+        self.name_winner = name_winner   # what the winners are ('Team' for team games)
+        self.cnt_games = 0
+        self.cnt_steps = 0
+        self.dict_cnt_status: Dict[str, int] = {}
+        self.dict_cnt_winner: Dict[Optional[int], int] = {}
+        self.time_start = time.perf_counter()
+
+    def add(self, list_result: List[GameResult]) -> None:
+        """ Add the results of a shard """
+        for winner, cnt_steps, status in list_result:
+            self.cnt_games += 1
+            self.cnt_steps += cnt_steps
+            self.dict_cnt_status[status] = self.dict_cnt_status.get(status, 0) + 1
+            if status == 'finished':
+                self.dict_cnt_winner[winner] = self.dict_cnt_winner.get(winner, 0) + 1
+
+    def get_report(self) -> str:
+        """ Throughput and outcome summary """
+        time_run = max(time.perf_counter() - self.time_start, 1e-9)
+        status = ', '.join(f'{status} {cnt}' for status, cnt in sorted(self.dict_cnt_status.items()))
+        list_line = [f'Games:     {self.cnt_games} ({self.cnt_games / time_run:.0f} games/s)',
+                     f'Steps:     {self.cnt_steps} ({self.cnt_steps / time_run:.0f} steps/s, '
+                     f'{self.cnt_steps / max(1, self.cnt_games):.1f} per game)',
+                     f'Status:    {status}']
+        for winner, cnt in sorted(self.dict_cnt_winner.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+            name = 'No winner' if winner is None else f'{self.name_winner} {winner}'
+            list_line.append(f'{name + ":":11s}{cnt} ({cnt / max(1, self.cnt_games):.1%})')
+        return '\n'.join(list_line)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Play games between players in a process pool")
+    parser.add_argument('game', help="game class, e.g. battleship.Battleship")
+    parser.add_argument('players', nargs='*',
+                        help="player class of each seat (repeated over the seats), 'module' for module.RandomPlayer, "
+                             "default: the game module's RandomPlayer")
+    parser.add_argument('--games', type=int, default=1000, help="number of games")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed of the games")
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS, help="steps after which a game is truncated")
+    args = parser.parse_args()
+
+    stats = SelfPlayStats('Team' if hasattr(get_class(args.game), 'get_team_won') else 'Player')
+    for list_result_shard in run_selfplay(args.game, args.players or [args.game.partition('.')[0]], args.games,
+                                          args.workers, args.seed, args.max_steps):
+        stats.add(list_result_shard)
+        print(f'\r{stats.cnt_games}/{args.games} games', end='', file=sys.stderr)
+    print(file=sys.stderr)
+    print(stats.get_report())
@@ -0,0 +1,125 @@
+from typing import List, Optional, Sequence
+import struct
+import numpy as np
+
+
+class StateWriter:
+    """ Appends fixed size integers, strings and small integer arrays to a byte buffer (read back by StateReader) """
+
+    def __init__(self, version: int) -> None:
+        self.buffer = bytearray([version])
+        self.list_part_end: List[int] = []   # end of each part but the last
+
+    def get_bytes(self) -> bytes:
+        """ The encoded bytes """
+        return bytes(self.buffer)
+
+    def split(self) -> None:
+        """ End a part: parts are compared and shared separately by snapshots (see Game.snapshot) """
+        self.list_part_end.append(len(self.buffer))
+
+    def get_parts(self) -> List[bytes]:
+        """ The encoded bytes split into parts (joined they are 'get_bytes') """
+        list_start = [0] + self.list_part_end
+        list_end = self.list_part_end + [len(self.buffer)]
+        return [bytes(self.buffer[start:end]) for start, end in zip(list_start, list_end)]
+
+    def write_u8(self, value: int) -> None:
+        """ Integer 0 to 255 """
+        self.buffer.append(value)
+
+    def write_int(self, value: int) -> None:
+        """ Signed 32 bit integer """
+        self.buffer += struct.pack('<i', value)
+
+    def write_bool(self, value: bool) -> None:
+        """ Boolean as one byte """
+        self.buffer.append(1 if value else 0)
+
+    def write_optional_int(self, value: Optional[int]) -> None:
+        """ Signed 32 bit integer or None """
+        self.write_bool(value is not None)
+        if value is not None:
+            self.write_int(value)
+
+    def write_str(self, value: str) -> None:
+        """ UTF-8 string up to 65535 bytes """
+        data = value.encode('utf-8')
+        self.buffer += struct.pack('<H', len(data))
+        self.buffer += data
+
+    def write_optional_str(self, value: Optional[str]) -> None:
+        """ String or None """
+        self.write_bool(value is not None)
+        if value is not None:
+            self.write_str(value)
+
+    def write_list_str(self, list_value: Sequence[str]) -> None:
+        """ List of strings """
+        self.buffer += struct.pack('<H', len(list_value))
+        for value in list_value:
+            self.write_str(value)
+
+    def write_array(self, values: Sequence[int], dtype: type = np.uint8) -> None:
+        """ Array of unsigned integers (up to 65535 values), one byte per value for uint8 """
+        self.buffer += struct.pack('<H', len(values))
+        self.buffer += np.asarray(values, dtype=dtype).astype(np.dtype(dtype).newbyteorder('<')).tobytes()
+
+
+class StateReader:
+    """ Reads the values written by a StateWriter in the same order """
+
+    def __init__(self, data: bytes, version: int) -> None:
+        self.data = data
+        self.pos = 1
+        if not data or data[0] != version:
+            raise ValueError(f"Unsupported state encoding (expected version {version})")
+
+    def is_done(self) -> bool:
+        """ Check that all bytes were read """
+        return self.pos == len(self.data)
+
+    def read_u8(self) -> int:
+        """ Integer 0 to 255 """
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def read_int(self) -> int:
+        """ Signed 32 bit integer """
+        value: int = struct.unpack_from('<i', self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def read_bool(self) -> bool:
+        """ Boolean as one byte """
+        return self.read_u8() != 0
+
+    def read_optional_int(self) -> Optional[int]:
+        """ Signed 32 bit integer or None """
+        return self.read_int() if self.read_bool() else None
+
+    def read_str(self) -> str:
+        """ UTF-8 string """
+        length: int = struct.unpack_from('<H', self.data, self.pos)[0]
+        self.pos += 2 + length
+        return self.data[self.pos - length:self.pos].decode('utf-8')
+
+    def read_optional_str(self) -> Optional[str]:
+        """ String or None """
+        return self.read_str() if self.read_bool() else None
+
+    def read_list_str(self) -> List[str]:
+        """ List of strings """
+        count: int = struct.unpack_from('<H', self.data, self.pos)[0]
+        self.pos += 2
+        return [self.read_str() for _ in range(count)]
+
+    def read_array(self, dtype: type = np.uint8) -> List[int]:
+        """ Array of unsigned integers as a list """
+        count: int = struct.unpack_from('<H', self.data, self.pos)[0]
+        self.pos += 2
+        dtype_le = np.dtype(dtype).newbyteorder('<')
+        values: List[int] = np.frombuffer(self.data, dtype=dtype_le, count=count, offset=self.pos).tolist()
+        self.pos += count * dtype_le.itemsize
+        return values
@@ -0,0 +1,309 @@
+from typing import Any, Dict, Generator, Iterator, List, Optional, Set, Tuple
+import os
+import sys
+import json
+import math
+import time
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from server.py.game import Player
+from server.py.selfplay import MAX_STEPS, get_class, play_game, seed_game, seed_player, start_game
+
+
+CNT_MATCHES_TASK = 4           # matches per task sent to a worker
+CNT_TASKS_WORKER = 2           # tasks in flight per worker (no more are wasted when the tournament stops early)
+RATING_START = 1500.0          # rating of a new entrant
+DEVIATION_START = 350.0        # rating deviation of a new entrant
+Z_CONFIDENCE = 1.96            # half width of the confidence intervals in deviations (95 %)
+INTERVAL_CHECKPOINT = 10.0     # seconds between checkpoints
+Q_ELO = math.log(10) / 400     # logistic scale of Elo ratings
+
+Match = Tuple[int, int, int]                    # index of the match, entrants a and b
+MatchResult = Tuple[int, float, int, List[str]]  # index of the match, score of a, number of steps, status of each game
+
+
+class Ratings:
+    """ Elo ratings with a deviation per entrant, updated incrementally match by match (Glicko style)
+
+    A match of n games with mean score s of entrant a moves a's rating by q * var * n * (s - E) and b's by the
+    opposite, E being the expected score of the rating difference; each game shrinks the variances by its
+    information q^2 * E * (1 - E). """
+
+    def __init__(self, cnt_entrants: int) -> None:
+        self.list_rating = [RATING_START] * cnt_entrants
+        self.list_variance = [DEVIATION_START ** 2] * cnt_entrants
+
+    def get_expected(self, idx_a: int, idx_b: int) -> float:
+        """ Expected score of entrant a against b """
+        return 1 / (1 + 10 ** ((self.list_rating[idx_b] - self.list_rating[idx_a]) / 400))
+
+    def add(self, idx_a: int, idx_b: int, score_a: float, cnt_games: int = 1) -> None:
+        """ Update the ratings with the mean score of a in a match of some games against b """
+        expected = self.get_expected(idx_a, idx_b)
+        information = cnt_games * Q_ELO ** 2 * expected * (1 - expected)
+        for idx, sign in ((idx_a, 1), (idx_b, -1)):
+            self.list_variance[idx] = 1 / (1 / self.list_variance[idx] + information)
+            self.list_rating[idx] += sign * Q_ELO * self.list_variance[idx] * cnt_games * (score_a - expected)
+
+    def get_interval(self, idx: int, z: float = Z_CONFIDENCE) -> Tuple[float, float]:
+        """ Confidence interval of an entrant's rating """
+        half_width = z * math.sqrt(self.list_variance[idx])
+        return self.list_rating[idx] - half_width, self.list_rating[idx] + half_width
+
+    def get_ranking(self) -> List[int]:
+        """ Entrants from the highest to the lowest rating """
+        return sorted(range(len(self.list_rating)), key=lambda idx: -self.list_rating[idx])
+
+    def is_separated(self, z: float = Z_CONFIDENCE) -> bool:
+        """ Check that the confidence intervals of entrants next to each other in the ranking do not overlap """
+        list_idx = self.get_ranking()
+        return all(self.get_interval(idx_upper, z)[0] > self.get_interval(idx_lower, z)[1]
+                   for idx_upper, idx_lower in zip(list_idx, list_idx[1:]))
+
+
+WORKER: Dict[str, Any] = {}
+""" Game class and players of a worker process, created once by 'init_worker' and reused for all its matches """
+
+
+def init_worker(game_name: str, list_player_name: List[str]) -> None:
+    """ Import the game and player classes of a worker (the players are created on first use, one per seat) """
+    WORKER['game_class'] = get_class(game_name)
+    WORKER['list_player_class'] = [get_class(name, 'RandomPlayer') for name in list_player_name]
+    WORKER['players'] = {}
+
+
+class MatchSeats(dict):
+    """ Player of each seat of a game: the seats alternate between two entrants, starting with the first (the
+    players are seeded for the game of the match) """
+
+    def __init__(self, idx_first: int, idx_second: int, seed: int, idx_match: int) -> None:
+        super().__init__()
+        self.list_idx_entrant = [idx_first, idx_second]
+        self.seed = seed
+        self.idx_match = idx_match
+
+    def __missing__(self, idx_player: int) -> Player:
+        idx_entrant = self.list_idx_entrant[idx_player % 2]
+        key = (idx_entrant, idx_player)
+        if key not in WORKER['players']:
+            WORKER['players'][key] = WORKER['list_player_class'][idx_entrant]()
+        player: Player = WORKER['players'][key]
+        seed_player(player, self.seed, self.idx_match, idx_player)
+        self[idx_player] = player
+        return player
+
+
+def play_match_game(seed: int, idx_match: int, idx_a: int, idx_b: int, is_swapped: bool,  # pylint: disable=too-many-arguments
+                    max_steps: int = MAX_STEPS) -> Tuple[float, int, str]:
+    """ Play the deal of a match with entrant a in the seat 0 (b if swapped), return the score of a, the number of
+    steps and the status
+
+    A game scores 1 for the entrant of the winning seat, 0.5 for a draw, a truncated game or an error. In a single
+    player game only the seat 0 plays: its entrant scores 1 if won, else the other entrant scores 1. """
+    rng = seed_game(seed, idx_match)
+    seats = MatchSeats(idx_b, idx_a, seed, idx_match) if is_swapped else MatchSeats(idx_a, idx_b, seed, idx_match)
+    try:
+        game = WORKER['game_class']()
+        start_game(game, rng)
+        winner, cnt_steps, status = play_game(game, seats, max_steps)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return 0.5, 0, 'error'
+    if status != 'finished':
+        return 0.5, cnt_steps, status
+    if len(seats) == 1:
+        return float((winner == 0) != is_swapped), cnt_steps, status
+    if winner is None:
+        return 0.5, cnt_steps, status
+    return float(seats.list_idx_entrant[winner % 2] == idx_a), cnt_steps, status
+
+
+def run_matches(seed: int, list_match: List[Match], max_steps: int = MAX_STEPS) -> List[MatchResult]:
+    """ Play matches in a worker: a match is the same deal played twice with the seats of the entrants swapped """
+    list_result: List[MatchResult] = []
+    for idx_match, idx_a, idx_b in list_match:
+        list_game = [play_match_game(seed, idx_match, idx_a, idx_b, is_swapped, max_steps)
+                     for is_swapped in (False, True)]
+        list_result.append((idx_match, sum(score for score, _, _ in list_game) / len(list_game),
+                            sum(cnt_steps for _, cnt_steps, _ in list_game), [status for _, _, status in list_game]))
+    return list_result
+
+
+class Tournament:
+    """ Round-robin tournament between players of one game: every round each pair of entrants plays one match
+
+    Results are applied to the ratings in the order of the matches (whatever order the workers finish them in), so
+    the ratings, and where the tournament stops, do not depend on the number of workers. """
+
+    def __init__(self, game_name: str, list_player_name: List[str], seed: int = 0) -> None:
+        if len(list_player_name) < 2:
+            raise ValueError("A tournament needs at least two players")
+        self.game_name = game_name
+        self.list_player_name = list_player_name
+        self.seed = seed
+        self.list_pair = [(idx_a, idx_b) for idx_a in range(len(list_player_name))
+                          for idx_b in range(idx_a + 1, len(list_player_name))]
+        self.ratings = Ratings(len(list_player_name))
+        self.list_score: List[float] = []
+        self.dict_result_pending: Dict[int, MatchResult] = {}
+        self.cnt_games = 0
+        self.cnt_steps = 0
+        self.dict_cnt_status: Dict[str, int] = {}
+        self.time_start = time.perf_counter()
+
+    def get_match(self, idx_match: int) -> Match:
+        """ Match of an index: the matches of a round are the pairs of entrants in order """
+        idx_a, idx_b = self.list_pair[idx_match % len(self.list_pair)]
+        return idx_match, idx_a, idx_b
+
+    def get_cnt_rounds(self) -> int:
+        """ Number of completed rounds """
+        return len(self.list_score) // len(self.list_pair)
+
+    def apply_score(self, score_a: float) -> None:
+        """ Apply the score of the next match to the ratings """
+        _, idx_a, idx_b = self.get_match(len(self.list_score))
+        self.ratings.add(idx_a, idx_b, score_a, cnt_games=2)
+        self.list_score.append(score_a)
+
+    def add_results(self, list_result: List[MatchResult]) -> None:
+        """ Add the results of a task, applying those next in order """
+        for result in list_result:
+            idx_match, _, cnt_steps, list_status = result
+            self.dict_result_pending[idx_match] = result
+            self.cnt_games += len(list_status)
+            self.cnt_steps += cnt_steps
+            for status in list_status:
+                self.dict_cnt_status[status] = self.dict_cnt_status.get(status, 0) + 1
+        while len(self.list_score) in self.dict_result_pending:
+            self.apply_score(self.dict_result_pending.pop(len(self.list_score))[1])
+
+    def is_done(self, min_rounds: int, max_rounds: int, z: float = Z_CONFIDENCE) -> bool:
+        """ Check that all rounds are played, or enough to tell the entrants apart """
+        cnt_rounds = self.get_cnt_rounds()
+        return cnt_rounds >= max_rounds or (cnt_rounds >= min_rounds and self.ratings.is_separated(z))
+
+    def save(self, path: str) -> None:
+        """ Write a checkpoint of the applied matches (atomically, a crash leaves the previous checkpoint) """
+        data = {'game': self.game_name, 'players': self.list_player_name, 'seed': self.seed,
+                'list_score': self.list_score}
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        os.replace(f'{path}.tmp', path)
+
+    def load(self, path: str) -> None:
+        """ Resume from a checkpoint of the same tournament, replaying its matches into the ratings """
+        with open(path, encoding='utf-8') as file:
+            data = json.load(file)
+        if (data['game'], data['players'], data['seed']) != (self.game_name, self.list_player_name, self.seed):
+            raise ValueError(f"Checkpoint {path} is of another tournament ({data['game']}, {data['players']}, "
+                             f"seed {data['seed']})")
+        for score_a in data['list_score'][len(self.list_score):]:
+            self.apply_score(score_a)
+
+    def iter_tasks(self, max_rounds: int) -> Iterator[List[Match]]:
+        """ Matches still to play, in tasks of CNT_MATCHES_TASK """
+        cnt_matches = max_rounds * len(self.list_pair)
+        for idx_first in range(len(self.list_score), cnt_matches, CNT_MATCHES_TASK):
+            yield [self.get_match(idx) for idx in range(idx_first, min(idx_first + CNT_MATCHES_TASK, cnt_matches))]
+
+    def iter_results(self, max_rounds: int, cnt_workers: Optional[int],
+                     max_steps: int) -> Generator[List[MatchResult], None, None]:
+        """ Results of the matches still to play task by task, from a process pool (in this process for 0 workers)
+
+        Only a few tasks per worker are in flight, those pending are cancelled when the iteration is closed. """
+        iter_task = self.iter_tasks(max_rounds)
+        if cnt_workers == 0:
+            init_worker(self.game_name, self.list_player_name)
+            for list_match in iter_task:
+                yield run_matches(self.seed, list_match, max_steps)
+            return
+        cnt_tasks_max = CNT_TASKS_WORKER * (cnt_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=cnt_workers, initializer=init_worker,
+                                 initargs=(self.game_name, self.list_player_name)) as executor:
+            set_future: 'Set[Future[List[MatchResult]]]' = set()
+            try:
+                while True:
+                    for list_match in iter_task:
+                        set_future.add(executor.submit(run_matches, self.seed, list_match, max_steps))
+                        if len(set_future) >= cnt_tasks_max:
+                            break
+                    if not set_future:
+                        return
+                    set_done, set_future = wait(set_future, return_when=FIRST_COMPLETED)
+                    for future in set_done:
+                        yield future.result()
+            finally:
+                executor.shutdown(cancel_futures=True)
+
+    def run(self, max_rounds: int = 100, min_rounds: int = 2,  # pylint: disable=too-many-arguments
+            cnt_workers: Optional[int] = None, z: float = Z_CONFIDENCE, path_checkpoint: Optional[str] = None,
+            max_steps: int = MAX_STEPS) -> Iterator['Tournament']:
+        """ Play matches until done, yield the tournament after the results of each task (for live reports),
+        checkpoint every INTERVAL_CHECKPOINT seconds and at the end (resuming from the checkpoint if it exists) """
+        if path_checkpoint is not None and os.path.exists(path_checkpoint):
+            self.load(path_checkpoint)
+        time_checkpoint = time.perf_counter()
+        iter_result = self.iter_results(max_rounds, cnt_workers, max_steps)
+        try:
+            while not self.is_done(min_rounds, max_rounds, z):
+                list_result = next(iter_result, None)
+                if list_result is None:
+                    break
+                self.add_results(list_result)
+                if path_checkpoint is not None and time.perf_counter() - time_checkpoint > INTERVAL_CHECKPOINT:
+                    self.save(path_checkpoint)
+                    time_checkpoint = time.perf_counter()
+                yield self
+        finally:
+            iter_result.close()
+            if path_checkpoint is not None:
+                self.save(path_checkpoint)
+
+    def get_progress(self, z: float = Z_CONFIDENCE) -> str:
+        """ One line of live progress: matches, throughput and the widest confidence interval """
+        time_run = max(time.perf_counter() - self.time_start, 1e-9)
+        idx_leader = self.ratings.get_ranking()[0]
+        width_max = max(high - low for low, high in (self.ratings.get_interval(idx, z)
+                                                     for idx in range(len(self.list_player_name))))
+        return (f'{len(self.list_score)} matches, {self.cnt_games / time_run:.1f} games/s, '
+                f'leader {self.list_player_name[idx_leader]} {self.ratings.list_rating[idx_leader]:.0f}, '
+                f'widest interval {width_max:.0f}')
+
+    def get_report(self, z: float = Z_CONFIDENCE) -> str:
+        """ Throughput, convergence and the entrants by rating with their confidence intervals """
+        time_run = max(time.perf_counter() - self.time_start, 1e-9)
+        status = ', '.join(f'{status} {cnt}' for status, cnt in sorted(self.dict_cnt_status.items()))
+        list_line = [f'Matches:   {len(self.list_score)} ({self.get_cnt_rounds()} rounds), '
+                     f'separated: {self.ratings.is_separated(z)}',
+                     f'Games:     {self.cnt_games} ({self.cnt_games / time_run:.1f} games/s, '
+                     f'{self.cnt_steps / time_run:.0f} steps/s)',
+                     f'Status:    {status}']
+        for rank, idx in enumerate(self.ratings.get_ranking()):
+            rating_low, rating_high = self.ratings.get_interval(idx, z)
+            list_line.append(f'{rank + 1:3d}. {self.ratings.list_rating[idx]:7.1f} '
+                             f'[{rating_low:7.1f}, {rating_high:7.1f}]  {self.list_player_name[idx]}')
+        return '\n'.join(list_line)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Round-robin tournament with Elo ratings between players of a game")
+    parser.add_argument('game', help="game class, e.g. battleship.Battleship")
+    parser.add_argument('players', nargs='+',
+                        help="player classes, 'module' for module.RandomPlayer, "
+                             "e.g. battleship battleship_bot.DensityPlayer")
+    parser.add_argument('--rounds', type=int, default=100, help="maximal number of rounds")
+    parser.add_argument('--min-rounds', type=int, default=2, help="rounds before stopping on separated ratings")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0, help="base seed of the games")
+    parser.add_argument('--z', type=float, default=Z_CONFIDENCE,
+                        help="half width of the confidence intervals in deviations")
+    parser.add_argument('--checkpoint', default=None, help="checkpoint file, resumed from if it exists")
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS, help="steps after which a game is truncated")
+    args = parser.parse_args()
+
+    tournament = Tournament(args.game, args.players, args.seed)
+    for _ in tournament.run(args.rounds, args.min_rounds, args.workers, args.z, args.checkpoint, args.max_steps):
+        print(f'\r{tournament.get_progress(args.z)}', end='', file=sys.stderr)
+    print(file=sys.stderr)
+    print(tournament.get_report(args.z))
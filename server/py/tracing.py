@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional, TextIO, Tuple, Union
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from enum import IntEnum
+
+
+class Level(IntEnum):
+    DEBUG = 10       # details of every step (actions, states)
+    INFO = 20        # progress and states on request (print_state)
+    WARNING = 30     # unexpected but handled
+    ERROR = 40       # failures
+    OFF = 100        # nothing is traced
+
+
+CNT_RECORDS_BATCH = 1024   # records written by the sink thread with one write and flush
+
+Record = Tuple[float, Level, str, str, Tuple[Any, ...], Dict[str, Any]]   # time, level, tracer, message, args, fields
+
+
+def get_level(name: str, level_default: Level = Level.WARNING) -> Level:
+    """ Level of a name (any case), the default with a warning on standard error if there is no such level """
+    try:
+        return Level[name.upper()]
+    except KeyError:
+        print(f'Unknown trace level {name!r} (one of {", ".join(Level.__members__)}), using {level_default.name}',
+              file=sys.stderr)
+        return level_default
+
+
+LEVEL_DEFAULT = get_level(os.environ.get('TRACE_LEVEL', 'WARNING'))   # level of new tracers ($TRACE_LEVEL)
+
+
+def format_record(record: Record, is_json: bool = False) -> str:
+    """ Line of a record: the message is %-formatted with its args here (in the sink thread), not by the caller """
+    time_record, level, name, message, args, fields = record
+    try:
+        text = message % args if args else message
+    except (TypeError, ValueError):
+        text = f'{message} {args!r}'
+    if is_json:
+        return json.dumps({'time': time_record, 'level': level.name, 'tracer': name, 'message': text, **fields},
+                          default=str)
+    clock = time.strftime('%H:%M:%S', time.localtime(time_record)) + f'.{int(time_record * 1000) % 1000:03d}'
+    return ' '.join([clock, f'{level.name:7s}', f'{name}:', text] + [f'{key}={value}' for key, value in fields.items()])
+
+
+class Sink:
+    """ Writes trace records in batches from a background thread: tracing only puts a tuple into a queue, the
+    formatting and the (locked) stream I/O happen off the caller's thread
+
+    The thread is started on first use, again in a forked process. """
+
+    def __init__(self, stream: Optional[TextIO] = None, is_json: bool = False) -> None:
+        self.stream = stream   # None: sys.stderr at the time of writing
+        self.is_json = is_json
+        self.queue: 'queue.SimpleQueue[Union[Record, threading.Event]]' = queue.SimpleQueue()
+        self.pid: Optional[int] = None   # process of the sink thread
+        self.lock = threading.Lock()
+
+    def put(self, record: Record) -> None:
+        """ Queue a record for writing """
+        if self.pid != os.getpid():
+            self.start()
+        self.queue.put(record)
+
+    def start(self) -> None:
+        """ Start the sink thread of this process (a forked process has a copy of the queue but no thread) """
+        with self.lock:
+            if self.pid != os.getpid():
+                self.queue = queue.SimpleQueue()
+                threading.Thread(target=self.run, args=(self.queue,), name='tracing', daemon=True).start()
+                self.pid = os.getpid()
+
+    def run(self, queue_record: 'queue.SimpleQueue[Union[Record, threading.Event]]') -> None:
+        """ Loop of the sink thread: write what is queued, a batch at a time """
+        while True:
+            list_item = [queue_record.get()]
+            while len(list_item) < CNT_RECORDS_BATCH and not queue_record.empty():
+                list_item.append(queue_record.get())
+            list_line = [format_record(item, self.is_json) for item in list_item
+                         if not isinstance(item, threading.Event)]
+            if list_line:
+                stream = self.stream or sys.stderr
+                stream.write('\n'.join(list_line) + '\n')
+                stream.flush()
+            for item in list_item:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def flush(self, timeout: float = 1.0) -> None:
+        """ Wait until the records queued so far are written """
+        if self.pid != os.getpid():
+            return
+        event = threading.Event()
+        self.queue.put(event)
+        event.wait(timeout)
+
+
+class Tracer:
+    """ Named source of trace records with a level: records below it cost one comparison, and hot paths guard
+    building their arguments with the one attribute check 'is_debug' or 'is_info'
+
+    Messages are %-format strings formatted lazily by the sink: arguments must not be changed after the call
+    (pass e.g. str(state), built under the guard), extra keyword fields become key=value pairs or JSON keys. """
+
+    def __init__(self, name: str, level: Level = LEVEL_DEFAULT, sink: Optional[Sink] = None) -> None:
+        self.name = name
+        self.sink = sink or SINK_DEFAULT
+        self.level = level
+        self.is_debug = self.is_info = False
+        self.set_level(level)
+
+    def set_level(self, level: Level) -> None:
+        """ Trace the records of this level and above """
+        self.level = Level(level)
+        self.is_debug = self.level <= Level.DEBUG
+        self.is_info = self.level <= Level.INFO
+
+    def log(self, level: Level, message: str, *args: Any, **fields: Any) -> None:
+        """ Trace a record if its level is enabled """
+        if level >= self.level:
+            self.sink.put((time.time(), level, self.name, message, args, fields))
+
+    def debug(self, message: str, *args: Any, **fields: Any) -> None:
+        """ Trace a DEBUG record """
+        if self.is_debug:
+            self.sink.put((time.time(), Level.DEBUG, self.name, message, args, fields))
+
+    def info(self, message: str, *args: Any, **fields: Any) -> None:
+        """ Trace an INFO record """
+        if self.is_info:
+            self.sink.put((time.time(), Level.INFO, self.name, message, args, fields))
+
+    def warning(self, message: str, *args: Any, **fields: Any) -> None:
+        """ Trace a WARNING record """
+        self.log(Level.WARNING, message, *args, **fields)
+
+    def error(self, message: str, *args: Any, **fields: Any) -> None:
+        """ Trace an ERROR record """
+        self.log(Level.ERROR, message, *args, **fields)
+
+
+SINK_DEFAULT = Sink()
+""" Sink of the tracers (standard error as text lines), flushed at exit """
+
+DICT_TRACER: Dict[str, Tracer] = {}
+""" Tracer of each name """
+
+
+def get_tracer(name: str) -> Tracer:
+    """ Tracer of a name (usually the module's), created on first use """
+    tracer = DICT_TRACER.get(name)
+    if tracer is None:
+        tracer = DICT_TRACER[name] = Tracer(name)
+    return tracer
+
+
+def set_level(level: Level, list_name: Optional[List[str]] = None) -> None:
+    """ Set the level of the given tracers, default all """
+    for name in list_name if list_name is not None else list(DICT_TRACER):
+        get_tracer(name).set_level(level)
+
+
+def set_sink(sink: Sink) -> None:
+    """ Send the records of all tracers to another sink """
+    for tracer in DICT_TRACER.values():
+        tracer.sink = sink
+
+
+atexit.register(SINK_DEFAULT.flush)
@@ -1,8 +1,11 @@
 import random
 from enum import Enum
-from typing import List, Optional, Any, Union
+from typing import Dict, List, NamedTuple, Optional, Any, Union
 from pydantic import BaseModel, Field
-from server.py.game import Game, Player
+from server.py.game import Game, UniformPlayer, construct_trusted
+from server.py.state_codec import StateWriter, StateReader
+from server.py.tracing import get_tracer
+from server.py.zobrist import get_keys, get_key
 
 
 class Card(BaseModel):
@@ -97,6 +100,20 @@ class Action(BaseModel):
 
         return False
 
+
+class CardDrawn(NamedTuple):
+    """Event: a player drew a card from the draw pile."""
+    idx_player: int
+    card: Card
+
+
+class CardPlayed(NamedTuple):
+    """Event: a player played a card (with the chosen color)."""
+    idx_player: int
+    card: Card
+    color: Optional[str]
+
+
 class PlayerState(BaseModel):
     """
     Represents the state of a single UNO player.
@@ -130,6 +147,11 @@ class GamePhase(str, Enum):
     RUNNING = 'running'        # while the game is running
     FINISHED = 'finished'      # when the game is finished
 
+DICT_KEY_PHASE: Dict[GamePhase, int] = dict(zip(GamePhase, get_keys('uno.phase', len(GamePhase))))
+"""Zobrist key of each phase."""
+
+TRACER = get_tracer('uno')
+
 NOT_SET_DIRECTION = -10
 """An integer constant indicating that the playing direction has not yet been set."""
 
@@ -233,6 +255,122 @@ A comprehensive list representing a standard UNO deck of cards.
   and wild, wilddraw4 (color 'any').
 """
 
+LIST_CARD_CODE: List[Card] = []
+"""Distinct cards of the deck, the index is the one byte code of a card in encoded states."""
+for card_deck in LIST_CARD:
+    if card_deck not in LIST_CARD_CODE:
+        LIST_CARD_CODE.append(card_deck)
+
+DICT_CARD_CODE = {(card.color, card.number, card.symbol): code for code, card in enumerate(LIST_CARD_CODE)}
+"""Code of each distinct card by its (color, number, symbol)."""
+
+CODE_CARD_OTHER = 255
+"""Code of a card that is not in the deck, its fields follow the list of codes."""
+
+VERSION_CODEC = 1
+"""Version of the binary state encoding (first byte of an encoded state)."""
+
+CNT_KEYS_PLAYER = 10
+"""Zobrist keys of the hands repeat after this many players."""
+
+CNT_KEYS_COPY = 8
+"""Zobrist keys of the copies of a card in a hand repeat after this many copies."""
+
+CNT_KEYS_PILE = 128
+"""Zobrist keys of the positions in a pile repeat after this many cards."""
+
+KEYS_HAND: List[List[List[int]]] = get_keys('uno.hand', CNT_KEYS_PLAYER, CODE_CARD_OTHER + 1, CNT_KEYS_COPY)
+"""Zobrist key of each (player, card code, copy of the card in the hand)."""
+
+KEYS_DRAW: List[List[int]] = get_keys('uno.draw', CNT_KEYS_PILE, CODE_CARD_OTHER + 1)
+"""Zobrist key of each (position in the draw pile, card code)."""
+
+KEYS_DISCARD: List[List[int]] = get_keys('uno.discard', CNT_KEYS_PILE, CODE_CARD_OTHER + 1)
+"""Zobrist key of each (position in the discard pile, card code)."""
+
+KEYS_FIELD: List[List[int]] = get_keys('uno.field', 5, 65)
+"""Zobrist keys of the integer fields cnt_player, idx_player_active, direction, cnt_to_draw and CNT_HAND_CARDS."""
+
+KEYS_FLAG: List[int] = get_keys('uno.flag', 2)
+"""Zobrist keys of the flags has_drawn and card_was_used (used when set)."""
+
+KEYS_COLOR: List[int] = get_keys('uno.color', len(LIST_COLOR) + 2)
+"""Zobrist key of each color of LIST_COLOR, of no color and (last) of any other color."""
+
+DICT_KEY_COLOR = dict(zip(LIST_COLOR + [''], KEYS_COLOR))
+"""Zobrist key of each color of LIST_COLOR and of no color."""
+
+
+def write_list_card(writer: StateWriter, list_card: Optional[List[Card]]) -> None:
+    """Write a list of cards as one byte per card (None as a missing list)."""
+    writer.write_bool(list_card is not None)
+    if list_card is None:
+        return
+    list_code = [DICT_CARD_CODE.get((card.color, card.number, card.symbol), CODE_CARD_OTHER) for card in list_card]
+    writer.write_array(list_code)
+    for card, code in zip(list_card, list_code):
+        if code == CODE_CARD_OTHER:
+            writer.write_str(card.color)
+            writer.write_optional_int(card.number)
+            writer.write_optional_str(card.symbol)
+
+
+def read_list_card(reader: StateReader) -> Optional[List[Card]]:
+    """Read a list of cards written by write_list_card."""
+    if not reader.read_bool():
+        return None
+    return [LIST_CARD_CODE[code] if code != CODE_CARD_OTHER else
+            construct_trusted(Card, color=reader.read_str(), number=reader.read_optional_int(),
+                              symbol=reader.read_optional_str())
+            for code in reader.read_array()]
+
+
+def get_action(card: Optional[Card] = None, color: Optional[str] = None, draw: Optional[int] = None,
+               uno: bool = False) -> Action:
+    """Action created by the engine (trusted, built without validation, see construct_trusted)."""
+    return construct_trusted(Action, card=card, color=color, draw=draw, uno=uno)
+
+
+def get_card_code(card: Card) -> int:
+    """Code of a card (CODE_CARD_OTHER if it is not in the deck)."""
+    return DICT_CARD_CODE.get((card.color, card.number, card.symbol), CODE_CARD_OTHER)
+
+
+def get_key_hand(idx_player: int, list_card: List[Card], card: Card) -> int:
+    """Zobrist key of a card added to (or removed from) a hand: one key per copy of the card in the hand, the copy
+    is the number of equal cards in the hand before adding (after removing) it."""
+    code = get_card_code(card)
+    copy = sum(1 for card_hand in list_card if get_card_code(card_hand) == code)
+    return KEYS_HAND[idx_player % CNT_KEYS_PLAYER][code][copy % CNT_KEYS_COPY]
+
+
+def get_hash_items(state: 'GameState') -> int:
+    """Zobrist hash of the hands (sets of cards) and the draw and discard piles (ordered) of a state."""
+    hash_items = 0
+    for keys, list_card in ((KEYS_DRAW, state.list_card_draw), (KEYS_DISCARD, state.list_card_discard)):
+        for pos, card in enumerate(list_card or []):
+            hash_items ^= keys[pos % CNT_KEYS_PILE][get_card_code(card)]
+    for idx_player, player in enumerate(state.list_player or []):
+        dict_cnt_code: Dict[int, int] = {}
+        for card in player.list_card:
+            code = get_card_code(card)
+            copy = dict_cnt_code[code] = dict_cnt_code.get(code, -1) + 1
+            hash_items ^= KEYS_HAND[idx_player % CNT_KEYS_PLAYER][code][copy % CNT_KEYS_COPY]
+    return hash_items
+
+
+def get_hash_fields(state: 'GameState') -> int:
+    """Zobrist hash of the other fields of a state (names, scores and last actions are not part of the hash)."""
+    hash_fields = DICT_KEY_PHASE[state.phase] ^ DICT_KEY_COLOR.get(state.color, KEYS_COLOR[-1])
+    for keys, value in zip(KEYS_FIELD, (state.cnt_player, state.idx_player_active, state.direction,
+                                        state.cnt_to_draw, state.CNT_HAND_CARDS)):
+        hash_fields ^= get_key(keys, value)
+    for key, flag in zip(KEYS_FLAG, (state.has_drawn, state.card_was_used)):
+        if flag:
+            hash_fields ^= key
+    return hash_fields
+
+
 class GameState(BaseModel):
     """Represents the overall state of the UNO game, including decks,
     discard piles, players, and the current game phase.
@@ -253,10 +391,11 @@ class GameState(BaseModel):
     has_drawn: bool = False
     card_was_used: bool = False
 
-    def initialize(self) -> None:
-        """Initialize the game state when the phase is setup."""
+    def initialize(self, rng: Optional[random.Random] = None) -> None:
+        """Initialize the game state when the phase is setup (shuffling with the given generator)."""
+        rng = rng or random.Random()
         if not self.list_card_draw:
-            self.initialize_list_card_draw()
+            self.initialize_list_card_draw(rng)
 
         if self.cnt_player == -1:
             self.cnt_player = 2
@@ -265,7 +404,7 @@ class GameState(BaseModel):
             self.deal_cards()
 
         if not self.list_card_discard:
-            self.initialize_list_card_discard()
+            self.initialize_list_card_discard(rng)
 
         if self.list_card_discard is None:
             raise ValueError()
@@ -329,10 +468,10 @@ class GameState(BaseModel):
                 player.list_card.append(self.list_card_draw.pop())
 
 
-    def initialize_list_card_draw(self) -> None:
+    def initialize_list_card_draw(self, rng: random.Random) -> None:
         """Initialize the draw pile with shuffled cards."""
         self.list_card_draw = LIST_CARD[:]
-        random.shuffle(self.list_card_draw)
+        rng.shuffle(self.list_card_draw)
 
 
     def next_player(self) -> None:
@@ -352,7 +491,7 @@ class GameState(BaseModel):
             else:
                 self.direction = 1
 
-    def initialize_list_card_discard(self) -> None:
+    def initialize_list_card_discard(self, rng: random.Random) -> None:
         """Initialize the discard pile with a valid starting card."""
         self.list_card_discard = []
         while True:
@@ -361,7 +500,7 @@ class GameState(BaseModel):
             top_card = self.list_card_draw.pop()
 
             if top_card.symbol == 'wilddraw4':
-                index = random.randint(0, len(self.list_card_draw))
+                index = rng.randint(0, len(self.list_card_draw))
                 self.list_card_draw.insert(index, top_card)
                 continue
             if top_card.symbol == 'draw2':
@@ -393,6 +532,7 @@ class Uno(Game):
         """ Important: Game initialization also requires a 
         set_state call to set the number of players """
         self.state = GameState()
+        self.hash_items = get_hash_items(self.state)   # Zobrist hash of the cards (other fields hashed on demand)
 
     def get_state(self) -> GameState:
         """ Get the complete, unmasked game state """
@@ -403,7 +543,8 @@ class Uno(Game):
         self.state = state
 
         if self.state.phase == GamePhase.SETUP:
-            self.state.initialize()
+            self.state.initialize(self.rng)
+        self.hash_items = get_hash_items(self.state)
 
     def get_list_action(self) -> List[Action]:
         """ Get a list of possible actions for the active player """
@@ -431,7 +572,7 @@ class Uno(Game):
                     result.append(action)
                 elif action.card is not None:
                     result.append(action)
-                    result.append(Action(card=action.card, draw=action.draw, color=action.color, uno=True))
+                    result.append(get_action(card=action.card, draw=action.draw, color=action.color, uno=True))
                 else:
                     result.append(action)
             actions = result
@@ -443,21 +584,21 @@ class Uno(Game):
         player_state = self.state.get_current_player()
         actions = []
         if not self.state.has_drawn:
-            actions.append(Action(draw=self.state.cnt_to_draw or 1))
+            actions.append(get_action(draw=self.state.cnt_to_draw or 1))
         has_color_full_card = self.check_with_simple_cards(player_state, top_card)
         for card in player_state.list_card:
             if card.symbol not in ['wild', 'wilddraw4', 'draw2']:
                 if card.color == self.state.color or card.number == top_card.number:
-                    actions.append(Action(card=card, color=card.color))
+                    actions.append(get_action(card=card, color=card.color))
             elif card.symbol == 'wild':
                 for color in LIST_COLOR[:-1]:
-                    actions.append(Action(card=card, color=color, draw=None))
+                    actions.append(get_action(card=card, color=color, draw=None))
             elif card.symbol == 'wilddraw4':
                 if not has_color_full_card:
                     for color in LIST_COLOR[:-1]:
-                        actions.append(Action(card=card, color=color, draw=4))
+                        actions.append(get_action(card=card, color=color, draw=4))
             elif card.symbol == 'draw2':
-                actions.append(Action(card=card, color='any', draw=2))
+                actions.append(get_action(card=card, color='any', draw=2))
             else:
                 raise ValueError("Unsupported symbol")
 
@@ -479,7 +620,7 @@ class Uno(Game):
         actions = []
 
         if not self.state.has_drawn:
-            actions.append(Action(draw=self.state.cnt_to_draw or 1))
+            actions.append(get_action(draw=self.state.cnt_to_draw or 1))
 
         if top_card.symbol == 'skip':
             self._get_list_action_specific_skip(actions, player_state, top_card)
@@ -504,44 +645,41 @@ class Uno(Game):
         for card in player_state.list_card:
             if top_card.color in [card.color, "any", ]:
                 if card.symbol is None:
-                    actions.append(Action(card=card, color=card.color))
-                    actions.append(Action(draw=1))
+                    actions.append(get_action(card=card, color=card.color))
+                    actions.append(get_action(draw=1))
 
     def _get_list_action_specific_draw2(self, actions: List[Action], player_state: PlayerState) -> None:
         for card in player_state.list_card:
             if card.symbol == 'draw2':
-                actions.append(Action(card=card, color=card.color, draw=self.state.cnt_to_draw + 2))
+                actions.append(get_action(card=card, color=card.color, draw=self.state.cnt_to_draw + 2))
 
     def _get_list_action_specific_reverse(self, actions: List[Action], player_state: PlayerState,
                                           top_card: Card) -> None:
         for card in player_state.list_card:
             if card.symbol == 'reverse':
-                actions.append(Action(card=card, color=card.color))
+                actions.append(get_action(card=card, color=card.color))
             elif card.symbol == 'draw2' and card.color == top_card.color:
-                actions.append(Action(card=card, color=card.color, draw=2))
+                actions.append(get_action(card=card, color=card.color, draw=2))
 
 
     def _get_list_action_specific_skip(self, actions: List[Action], player_state: PlayerState, top_card: Card) -> None:
         for card in player_state.list_card:
             if card.symbol == 'skip':
-                actions.append(Action(card=card, color=card.color))
+                actions.append(get_action(card=card, color=card.color))
             elif card.symbol == 'reverse' and card.color == top_card.color:
-                actions.append(Action(card=card, color=card.color))
+                actions.append(get_action(card=card, color=card.color))
 
     def apply_action(self, action: Action) -> None:
         """ Apply the given action to the game """
 
         player = self.state.get_current_player()
         if len(player.list_card) == 2 and not action.uno and action.card is not None:
-            if self.state.list_card_draw is None:
-                raise ValueError
-            player.list_card.extend([self.state.list_card_draw.pop() for _ in range(4)])
+            self._draw_cards(4)
 
         if action.card is None and action.draw != 0:
-            player = self.state.get_current_player()
-            if action.draw is None or self.state.list_card_draw is None:
+            if action.draw is None:
                 raise ValueError
-            player.list_card.extend([self.state.list_card_draw.pop() for _ in range(action.draw)])
+            self._draw_cards(action.draw)
             self.state.has_drawn = True
             self.state.cnt_to_draw = 0
             return
@@ -549,8 +687,12 @@ class Uno(Game):
         if action.card is not None:
             if self.state.list_card_draw is None:
                 raise ValueError
+            self.hash_items ^= KEYS_DRAW[len(self.state.list_card_draw) % CNT_KEYS_PILE][get_card_code(action.card)]
             self.state.list_card_draw.append(action.card)
             player.list_card.remove(action.card)
+            self.hash_items ^= get_key_hand(self.state.idx_player_active or 0, player.list_card, action.card)
+            if self.list_listener:
+                self.emit(CardPlayed(self.state.idx_player_active or 0, action.card, action.color))
             self.state.cnt_to_draw = action.draw or 0
             if action.card.symbol == 'skip':
                 self.state.next_player()
@@ -562,38 +704,123 @@ class Uno(Game):
         self.state.next_player()
 
 
+    def _draw_cards(self, cnt_cards: int) -> None:
+        """ Move cards from the draw pile to the hand of the active player """
+        player = self.state.get_current_player()
+        idx_player = self.state.idx_player_active or 0
+        list_card_draw = self.state.list_card_draw
+        if list_card_draw is None:
+            raise ValueError
+        for _ in range(cnt_cards):
+            card = list_card_draw.pop()
+            self.hash_items ^= KEYS_DRAW[len(list_card_draw) % CNT_KEYS_PILE][get_card_code(card)]
+            self.hash_items ^= get_key_hand(idx_player, player.list_card, card)
+            player.list_card.append(card)
+            if self.list_listener:
+                self.emit(CardDrawn(idx_player, card))
+
+    def state_hash(self) -> int:
+        """ 64 bit Zobrist hash of the state (cards, phase, active player, direction, color, cards to draw, flags) """
+        return self.hash_items ^ get_hash_fields(self.state)
+
+    def compute_state_hash(self) -> int:
+        """ The value of 'state_hash' computed from scratch """
+        return get_hash_items(self.state) ^ get_hash_fields(self.state)
+
+    def touch(self) -> None:
+        """ Start a new version and recompute the hash after the state was changed directly """
+        super().touch()
+        self.hash_items = get_hash_items(self.state)
+
     def print_state(self) -> None:
-        """ Print the current game state for debbuging"""
+        """ Trace the current game state for debugging (level INFO) """
+        if not TRACER.is_info:
+            return
         if not self.state:
-            print("Game state has not been initialized")
+            TRACER.info("Game state has not been initialized")
             return
-        print("\n==== Game State ====")
-        print(f"Phase: {self.state.phase}")
-        print(f"""Direction: {
-            'Clockwise' if self.state.direction == 1 else 'Counterclockwise'
-            }""")
-        print(f"Active Player Index: {self.state.idx_player_active}")
-        print(f"Active Color: {self.state.color}")
-        print(f"Cards to Draw: {self.state.cnt_to_draw}")
-        print(f"Has Drawn: {'Yes' if self.state.has_drawn else 'No'}")
-        print("\n-- Players --")
-        print("\n-- Discard Pile --")
-        if self.state.list_card_discard:
-            print(f"Top Card: {self.state.list_card_discard[-1]}")
-        else:
-            print("Discard pile is empty.")
-        print("====================\n")
+        TRACER.info("Game state: phase %s, direction %s, active player %s, color %s, cards to draw %d, has drawn %s, "
+                    "top card %s", self.state.phase,
+                    'clockwise' if self.state.direction == 1 else 'counterclockwise',
+                    self.state.idx_player_active, self.state.color, self.state.cnt_to_draw,
+                    'yes' if self.state.has_drawn else 'no',
+                    str(self.state.list_card_discard[-1]) if self.state.list_card_discard else 'none')
 
     def get_player_view(self, idx_player: int) -> GameState:
         """ Get the masked state for the active player (e.g. the oppontent's cards are face down)"""
         return GameState(cnt_player=idx_player)
 
-
-class RandomPlayer(Player):
+    def encode_state_parts(self) -> List[bytes]:
+        """ Compact binary encoding of the complete state (one byte per card), split into the header, the draw pile,
+        the discard pile and each player """
+        state = self.state
+        writer = StateWriter(VERSION_CODEC)
+        writer.write_u8(list(GamePhase).index(state.phase))
+        for value in (state.CNT_HAND_CARDS, state.cnt_player, state.direction, state.cnt_to_draw):
+            writer.write_int(value)
+        writer.write_optional_int(state.idx_player_active)
+        writer.write_str(state.color)
+        writer.write_bool(state.has_drawn)
+        writer.write_bool(state.card_was_used)
+        writer.split()
+        write_list_card(writer, state.list_card_draw)
+        writer.split()
+        write_list_card(writer, state.list_card_discard)
+        writer.write_bool(state.list_player is not None)
+        if state.list_player is not None:
+            writer.write_u8(len(state.list_player))
+        for player in state.list_player or []:
+            writer.split()
+            writer.write_optional_str(player.name)
+            writer.write_int(player.score)
+            write_list_card(writer, player.list_card)
+            action = player.last_action
+            writer.write_bool(action is not None)
+            if action is not None:
+                write_list_card(writer, None if action.card is None else [action.card])
+                writer.write_optional_str(action.color)
+                writer.write_optional_int(action.draw)
+                writer.write_bool(action.uno)
+        return writer.get_parts()
+
+    def decode_state(self, data: bytes) -> GameState:  # pylint: disable=too-many-locals
+        """ State of an encoding of 'encode_state' (the game itself is not changed) """
+        reader = StateReader(data, VERSION_CODEC)
+        phase = list(GamePhase)[reader.read_u8()]
+        cnt_hand_cards, cnt_player, direction, cnt_to_draw = (reader.read_int() for _ in range(4))
+        idx_player_active = reader.read_optional_int()
+        color = reader.read_str()
+        has_drawn = reader.read_bool()
+        card_was_used = reader.read_bool()
+        list_card_draw = read_list_card(reader)
+        list_card_discard = read_list_card(reader)
+        list_player: Optional[List[PlayerState]] = None
+        if reader.read_bool():
+            list_player = []
+            for _ in range(reader.read_u8()):
+                name = reader.read_optional_str()
+                score = reader.read_int()
+                list_card = read_list_card(reader) or []
+                last_action = None
+                if reader.read_bool():
+                    list_card_action = read_list_card(reader)
+                    last_action = get_action(card=list_card_action[0] if list_card_action else None,
+                                             color=reader.read_optional_str(), draw=reader.read_optional_int(),
+                                             uno=reader.read_bool())
+                list_player.append(construct_trusted(PlayerState, name=name, list_card=list_card, score=score,
+                                                     last_action=last_action))
+        return construct_trusted(GameState, CNT_HAND_CARDS=cnt_hand_cards, list_card_draw=list_card_draw,
+                                 list_card_discard=list_card_discard, list_player=list_player, phase=phase,
+                                 cnt_player=cnt_player, idx_player_active=idx_player_active, direction=direction,
+                                 color=color, cnt_to_draw=cnt_to_draw, has_drawn=has_drawn,
+                                 card_was_used=card_was_used)
+
+
+class RandomPlayer(UniformPlayer):
     def select_action(self, state: GameState, actions: List[Action]) -> Optional[Action]:
         """ Given masked game state and possible actions, select the next action """
         if len(actions) > 0 and state:
-            return random.choice(actions)
+            return self.rng.choice(actions)
         return None
 
     def game_is_running(self) -> bool:
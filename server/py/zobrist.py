@@ -0,0 +1,47 @@
+from typing import Any, List, Optional
+import zlib
+import random
+import numpy as np
+from server.py.game import Game
+
+
+def get_keys(name: str, *shape: int) -> Any:
+    """ Table of random 64 bit keys as nested lists of ints, seeded by its name (the same keys in every process) """
+    rng = np.random.default_rng(zlib.crc32(name.encode('utf-8')))
+    return rng.integers(0, 1 << 64, size=shape, dtype=np.uint64).tolist()
+
+
+def get_key(keys: List[int], value: Optional[int]) -> int:
+    """ Key of an integer field: the last key stands for None, the others are used modulo their number """
+    if value is None:
+        return keys[-1]
+    return keys[value % (len(keys) - 1)]
+
+
+def get_mask_hash(keys: List[int], mask: int) -> int:
+    """ XOR of the keys of the set bits of a bitmask """
+    hash_mask = 0
+    while mask:
+        bit = mask & -mask
+        hash_mask ^= keys[bit.bit_length() - 1]
+        mask ^= bit
+    return hash_mask
+
+
+def check_state_hash(game: Game, rng: random.Random, cnt_steps: int = 1000, with_pass: bool = True) -> int:
+    """ Fuzz the incremental hash of a started game: apply random actions and compare 'state_hash' with
+    'compute_state_hash' before each, return the number of actions applied, ValueError at the first difference
+
+    The fuzzing stops at the end of the game, or when there is no action and the game has no pass (None action). """
+    for idx_step in range(cnt_steps + 1):
+        hash_incremental, hash_scratch = game.state_hash(), game.compute_state_hash()
+        if hash_incremental != hash_scratch:
+            raise ValueError(f"Incremental state hash {hash_incremental:016x} differs from {hash_scratch:016x} "
+                             f"after {idx_step} actions")
+        if idx_step == cnt_steps or game.get_state().phase == 'finished':
+            return idx_step
+        action = game.sample_action(rng)
+        if action is None and not with_pass:
+            return idx_step
+        game.apply_action(action)
+    return cnt_steps
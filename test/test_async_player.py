@@ -0,0 +1,81 @@
+import time
+import asyncio
+import pytest
+from server.py.game import Player
+from server.py.hangman import LIST_ACTION_GUESS, RandomPlayer
+from server.py.async_player import ExecutorPlayer, ProcessPlayer, ThreadPlayer
+
+
+class SlowPlayer(Player):
+
+    def select_action(self, state, actions):
+        time.sleep(0.5)
+        return actions[0]
+
+
+class LastPlayer(Player):
+
+    def select_action(self, state, actions):
+        return actions[-1]
+
+
+async def count_ticks(cnt_ticks: int) -> int:
+    """ Ticks of the event loop done while a decision runs """
+    for idx in range(cnt_ticks):
+        await asyncio.sleep(0.001)
+    return idx + 1
+
+
+def test_thread_player():
+    async def play():
+        player = ThreadPlayer(SlowPlayer())
+        action, cnt_ticks = await asyncio.gather(player.select_action(None, LIST_ACTION_GUESS), count_ticks(20))
+        assert action is LIST_ACTION_GUESS[0] and cnt_ticks == 20
+        assert await player.select_action(None, []) is None
+        player.close()
+    asyncio.run(play())
+
+
+def test_thread_player_timeout():
+    async def play():
+        player = ThreadPlayer(SlowPlayer(), timeout=0.05, player_fallback=LastPlayer())
+        time_start = time.perf_counter()
+        assert await player.select_action(None, LIST_ACTION_GUESS) is LIST_ACTION_GUESS[-1]
+        assert time.perf_counter() - time_start < 0.4
+        player.player_fallback = None
+        with pytest.raises(asyncio.TimeoutError):
+            await player.select_action(None, LIST_ACTION_GUESS)
+        player.close()
+    asyncio.run(play())
+
+
+def test_executor_player_is_abstract():
+    with pytest.raises(TypeError):
+        ExecutorPlayer()
+
+
+def test_process_player():
+    async def play():
+        player = ProcessPlayer(RandomPlayer)
+        action = await player.select_action(None, LIST_ACTION_GUESS[:3])
+        assert any(action is action_guess for action_guess in LIST_ACTION_GUESS[:3])
+        player.close()
+        player = ProcessPlayer(SlowPlayer, timeout=0.05, player_fallback=LastPlayer())
+        assert await player.select_action(None, LIST_ACTION_GUESS) is LIST_ACTION_GUESS[-1]
+        assert player.pool is None
+        player.timeout = None
+        assert await player.select_action(None, LIST_ACTION_GUESS) is LIST_ACTION_GUESS[0]
+        player.close()
+    asyncio.run(play())
+
+
+def test_process_player_cancelled():
+    async def play():
+        player = ProcessPlayer(SlowPlayer)
+        task = asyncio.create_task(player.select_action(None, LIST_ACTION_GUESS))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert player.pool is None
+    asyncio.run(play())
@@ -0,0 +1,198 @@
+import random
+import pytest
+import numpy as np
+from server.py.battleship import (Battleship, BattleshipGameState, PlayerState, Ship, BattleshipAction, ActionType,
+                                  GamePhase, LIST_LOCATION, DICT_LOCATION_IDX, get_mask, is_straight_line,
+                                  get_location, get_idx, get_fleet, ShipPlaced, ShotHit, ShotMissed)
+from server.py.zobrist import check_state_hash
+
+
+def get_running_game() -> Battleship:
+    ships = [
+        Ship(name="carrier", length=5, location=["A1", "A2", "A3", "A4", "A5"]),
+        Ship(name="destroyer", length=2, location=["C1", "D1"]),
+    ]
+    player0 = PlayerState(name='Player 1', ships=ships, shots=[], successful_shots=[])
+    player1 = PlayerState(name='Player 2', ships=ships, shots=[], successful_shots=[])
+    game = Battleship()
+    game.set_state(BattleshipGameState(idx_player_active=0, phase=GamePhase.RUNNING, winner=None,
+                                       players=[player0, player1]))
+    return game
+
+
+def shoot(game: Battleship, location: str) -> None:
+    game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=[location]))
+
+
+def test_location_codec():
+    assert LIST_LOCATION[0] == 'A1'
+    assert LIST_LOCATION[99] == 'J10'
+    assert all(LIST_LOCATION[DICT_LOCATION_IDX[location]] == location for location in LIST_LOCATION)
+    assert get_mask(['A2', 'B1']) == (1 << 1) | (1 << 10)
+    assert get_location(26 * 100, 100) == 'AA1'
+    assert get_location(100 * 100 - 1, 100) == 'CV100'
+    assert all(get_idx(get_location(idx, 100), 100) == idx for idx in range(0, 100 * 100, 37))
+    for location in ['K1', 'A11', 'A0', 'A01', 'a1', '1A', 'A']:
+        with pytest.raises(KeyError):
+            get_idx(location)
+
+
+def test_straight_line():
+    assert is_straight_line(['A1', 'A2', 'A3'])
+    assert is_straight_line(['E5', 'C5', 'D5'])
+    assert not is_straight_line(['A1', 'A3'])
+    assert not is_straight_line(['A10', 'B1'])
+    assert not is_straight_line(['A1', 'K1'])
+    assert is_straight_line(['Z7', 'AA7', 'AB7'], 40)
+
+
+def test_overlapping_placement_rejected():
+    game = Battleship()
+    game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name='destroyer', location=['A1', 'A2']))
+    game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name='destroyer', location=['A1', 'A2']))
+    with pytest.raises(ValueError):
+        game.apply_action(BattleshipAction(action_type=ActionType.SET_SHIP, ship_name='cruiser',
+                                           location=['A2', 'B2', 'C2']))
+
+
+def test_hit_sink_and_win():
+    game = get_running_game()
+    shoot(game, 'C1')
+    assert game.get_state().players[0].successful_shots == ['C1']
+    assert not game.is_ship_sunk(0, 'C1')
+    shoot(game, 'J10')
+    shoot(game, 'D1')
+    assert game.is_ship_sunk(0, 'D1')
+    with pytest.raises(Exception):
+        shoot(game, 'J10')
+    shoot(game, 'D1')
+    for location in ["A1", "A2", "A3", "A4"]:
+        shoot(game, location)
+        shoot(game, f'J{location[1]}')
+    shoot(game, 'A5')
+    state = game.get_state()
+    assert state.phase == GamePhase.FINISHED
+    assert state.winner == 0
+
+
+def test_list_action_setup_and_running():
+    game = Battleship()
+    list_action = game.get_list_action()
+    assert len(list_action) == 2 * 10 * 6
+    assert all(action.ship_name == 'carrier' and len(action.location) == 5 for action in list_action)
+    for _ in range(10):
+        list_action = game.get_list_action()
+        game.apply_action(list_action[-1])
+    state = game.get_state()
+    assert state.phase == GamePhase.RUNNING
+    assert all(sorted(ship.length for ship in player.ships) == [2, 3, 3, 4, 5] for player in state.players)
+    shoot(game, 'B7')
+    shoot(game, 'B7')
+    assert len(game.get_list_action()) == 99
+    assert 'B7' not in {action.location[0] for action in game.get_list_action()}
+
+
+def test_large_board():
+    game = Battleship(board_size=100)
+    assert len(game.get_list_action()) == 2 * 100 * 96
+    while game.get_state().phase == GamePhase.SETUP:
+        game.apply_action(game.get_list_action()[-1])
+    state = game.get_state()
+    assert len(state.players[0].ships) == len(get_fleet(100)) == 50
+    assert len(game.get_list_action()) == 100 * 100
+    shoot(game, 'CV100')
+    assert game.get_state().players[0].successful_shots == ['CV100']
+    assert game.is_ship_sunk(0, 'CV100') is False
+    with pytest.raises(Exception):
+        shoot(game, 'CW1')
+    with pytest.raises(ValueError):
+        Battleship(board_size=101)
+
+
+def test_make_batch_loop():
+    list_game = [get_running_game(), get_running_game()]
+    batch = Battleship.make_batch(list_game)
+    legal = batch.legal_masks()
+    assert legal.shape == (2, 100) and legal.all()
+    batch.step(np.array([0, -1]))
+    assert list_game[0].get_state().players[0].shots == list_game[1].get_list_action()[0].location
+    assert batch.legal_masks()[0].sum() == 100
+    assert list_game[1].get_state().players[0].shots == []
+
+
+def get_dump(value):
+    """ Nested plain data of a state (the state classes have no equality) """
+    if isinstance(value, (str, int)) or value is None:
+        return value
+    if isinstance(value, list):
+        return [get_dump(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return {key: get_dump(item) for key, item in vars(value).items()}
+    return value
+
+
+def test_encode_decode_state():
+    for game in (get_running_game(), Battleship(board_size=20)):
+        game.get_state().players[1].shots = ['A1', 'B2']
+        game.get_state().players[1].successful_shots = ['A1']
+        data = game.encode_state()
+        assert get_dump(game.decode_state(data)) == get_dump(game.get_state())
+    assert len(get_running_game().encode_state()) < 80
+
+
+def test_snapshot_restore():
+    game = get_running_game()
+    snapshot = game.snapshot()
+    game.apply_action(BattleshipAction(ActionType.SHOOT, None, ['A1']))
+    snapshot_shot = game.snapshot()
+    assert snapshot_shot[3] is snapshot[3] and snapshot_shot[2] is not snapshot[2]
+    game.restore(snapshot)
+    assert game.get_state().players[0].shots == [] and game.get_list_action()
+    game.restore(snapshot_shot)
+    assert game.get_state().players[0].shots == ['A1']
+
+
+def test_state_hash():
+    rng = random.Random(0)
+    for board_size in (10, 10, 10, 12):
+        assert check_state_hash(Battleship(board_size), rng) > 34
+    game = get_running_game()
+    hash_start = game.state_hash()
+    snapshot = game.snapshot()
+    shoot(game, 'A1')
+    assert game.state_hash() != hash_start
+    game.restore(snapshot)
+    assert game.state_hash() == hash_start
+    game.get_state().players[0].shots.append('B2')
+    game.touch()
+    assert game.state_hash() == game.compute_state_hash() != hash_start
+
+
+def test_iter_count_sample_actions():
+    rng = random.Random(0)
+    game = Battleship()
+    while game.get_state().phase != GamePhase.FINISHED:
+        list_action = game.get_list_action()
+        assert list(game.iter_actions()) == list_action
+        assert game.count_actions() == len(list_action)
+        action = game.sample_action(rng)
+        assert action in list_action
+        game.apply_action(action)
+    assert game.count_actions() == 0 and game.sample_action(rng) is None
+
+
+def test_events():
+    game = get_running_game()
+    list_event = []
+    game.add_listener(list_event.append)
+    for location in ['C1', 'B1', 'D1']:
+        game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=[location]))
+        game.state.idx_player_active = 0
+    assert list_event == [ShotHit(0, 'C1', 'destroyer', False), ShotMissed(0, 'B1'),
+                          ShotHit(0, 'D1', 'destroyer', True)]
+    game = Battleship()
+    game.add_listener(list_event.append)
+    list_event.clear()
+    action = game.get_list_action()[0]
+    game.apply_action(action)
+    assert list_event == [ShipPlaced(0, action.ship_name, tuple(action.location))]
@@ -0,0 +1,104 @@
+import numpy as np
+from server.py.battleship import (Battleship, BattleshipGameState, PlayerState, Ship, BattleshipAction, ActionType,
+                                  GamePhase, DICT_LOCATION_IDX)
+from server.py.battleship_bot import (DensityPlayer, get_placement, get_cell_mask, get_list_valid, get_density,
+                                      get_density_exact, get_density_sampled, get_density_marginal)
+
+
+def get_running_game() -> Battleship:
+    ships = [
+        Ship(name="carrier", length=5, location=["A1", "A2", "A3", "A4", "A5"]),
+        Ship(name="destroyer", length=2, location=["C1", "D1"]),
+    ]
+    player0 = PlayerState(name='Player 1', ships=ships, shots=[], successful_shots=[])
+    player1 = PlayerState(name='Player 2', ships=ships, shots=[], successful_shots=[])
+    game = Battleship()
+    game.set_state(BattleshipGameState(idx_player_active=0, phase=GamePhase.RUNNING, winner=None,
+                                       players=[player0, player1]))
+    return game
+
+
+def shoot(game: Battleship, location: str) -> None:
+    game.apply_action(BattleshipAction(action_type=ActionType.SHOOT, ship_name=None, location=[location]))
+
+
+def test_placement_matrix():
+    assert get_placement(5, 10).shape == (2 * 10 * 6, 5)
+    assert get_placement(2, 100).shape == (2 * 100 * 99, 2)
+    assert get_placement(2, 10)[0].tolist() == [0, 1]
+
+
+def test_exact_density_counts_fleets():
+    blocked = ~get_cell_mask(['A1', 'A2', 'A3', 'B1', 'B2'], 10)
+    list_valid = get_list_valid([2, 3], blocked, 10)
+    density = get_density_exact(list_valid, get_cell_mask([], 10))
+    # the only fleet: the 3-ship on A1-A3 and the 2-ship on B1-B2
+    assert density[DICT_LOCATION_IDX['A1']] == 1 and density[DICT_LOCATION_IDX['B2']] == 1
+    assert density[DICT_LOCATION_IDX['C1']] == 0
+
+
+def test_density_targets_open_hit():
+    shots = get_cell_mask(['E5'], 10)
+    hits = get_cell_mask(['E5'], 10)
+    density = get_density([5, 4, 3, 3, 2], shots, hits, get_cell_mask([], 10), np.random.default_rng(0), 10)
+    assert density[DICT_LOCATION_IDX['E5']] == 0
+    best = int(np.argmax(density))
+    assert best in {DICT_LOCATION_IDX[location] for location in ['D5', 'F5', 'E4', 'E6']}
+
+
+def test_marginal_density_prefers_hits():
+    list_valid = get_list_valid([2], get_cell_mask([], 10), 10)
+    density = get_density_marginal(list_valid, get_cell_mask(['A1'], 10))
+    assert density[DICT_LOCATION_IDX['A2']] > density[DICT_LOCATION_IDX['E5']]
+
+
+def test_sampled_density_matches_exact_support():
+    blocked = ~get_cell_mask(['A1', 'A2', 'A3', 'A4', 'B1', 'B2', 'B3'], 10)
+    list_valid = get_list_valid([3, 2], blocked, 10)
+    hits = get_cell_mask([], 10)
+    density_exact = get_density_exact(list_valid, hits)
+    density_sampled = get_density_sampled(list_valid, hits, np.random.default_rng(0))
+    assert ((density_exact > 0) == (density_sampled > 0)).all()
+
+
+def test_player_view_reveals_sunk_ships_only():
+    game = get_running_game()
+    assert game.get_player_view(0).players[1].ships == []
+    shoot(game, 'C1')
+    shoot(game, 'J10')
+    shoot(game, 'D1')
+    view = game.get_player_view(0)
+    assert [ship.name for ship in view.players[1].ships] == ['destroyer']
+    assert len(view.players[0].ships) == 2
+
+
+def test_density_player_finishes_game():
+    game = Battleship()
+    list_player = [DensityPlayer(seed=1), DensityPlayer(seed=2)]
+    while game.get_state().phase != GamePhase.FINISHED:
+        idx_player = game.get_state().idx_player_active
+        action = list_player[idx_player].select_action(game.get_player_view(idx_player), game.get_list_action())
+        game.apply_action(action)
+    state = game.get_state()
+    assert len(state.players[state.winner].shots) < 80
+    assert DensityPlayer().select_action(state, []) is None
+
+
+def test_density_player_large_board():
+    game = Battleship(board_size=30)
+    player = DensityPlayer(seed=4)
+    while game.get_state().phase == GamePhase.SETUP:
+        game.apply_action(player.select_action(game.get_player_view(0), game.get_list_action()))
+    action = player.select_action(game.get_player_view(0), game.get_list_action())
+    assert action is not None and action.location[0] not in game.get_state().players[0].shots
+
+
+def test_density_player_never_repeats_shot():
+    game = get_running_game()
+    player = DensityPlayer(seed=3)
+    for _ in range(20):
+        action = player.select_action(game.get_player_view(0), game.get_list_action())
+        assert isinstance(action, BattleshipAction) and action.action_type == ActionType.SHOOT
+        game.apply_action(action)
+        game.apply_action(game.get_list_action()[0])
+    assert len(set(game.get_state().players[0].shots)) == 20
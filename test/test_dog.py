@@ -0,0 +1,253 @@
+import random
+from collections import Counter
+from server.py.dog import (Dog, GameState, GamePhase, Card, Action, CardDealt, CardPlayed, MarbleMoved,
+                           MarbleSentHome, SevenUndone, copy_state)
+from server.py.dog_movegen import DICT_MOVEGEN_GENERATED, DICT_MOVEGEN_GENERIC, get_list_pos_to, get_movegen_source
+from server.py.zobrist import check_state_hash
+
+
+def get_running_state(game: Dog, list_card: list) -> GameState:
+    state = game.get_state()
+    state.idx_player_started = 0
+    state.idx_player_active = 0
+    state.bool_card_exchanged = True
+    state.list_player[0].list_card = list_card
+    return state
+
+
+def test_create_game():
+    game = Dog()
+    state = game.get_state()
+    assert state.phase == GamePhase.RUNNING
+    assert len(state.list_card_draw) == 86
+    assert all(len(player.list_card) == 6 for player in state.list_player)
+
+
+def test_list_pos_to():
+    assert get_list_pos_to('5', 10, False, 0, 68, 0, 0) == [15]
+    assert get_list_pos_to('5', 10, False, 0, 68, 0, 1 << 13) == []
+    assert get_list_pos_to('4', 2, False, 0, 68, 0, 0) == [6, 62]
+    assert get_list_pos_to('2', 63, False, 0, 68, 0, 0) == [1, 68]
+    assert get_list_pos_to('2', 63, True, 0, 68, 0, 0) == [1]
+    assert get_list_pos_to('2', 63, False, 0, 68, 0b1, 0) == [1]
+    assert get_list_pos_to('7', 68, False, 0, 68, 0b101, 0, 7) == [69]
+    assert get_list_pos_to('7', 10, False, 0, 68, 0, 0, 2) == [11, 12]
+
+
+def test_movegen_source_inlines_constants():
+    source = get_movegen_source('5')
+    assert 'def _movegen_5(' in source
+    assert '& 31' in source
+    assert 'DICT_RANK_STEPS' not in source
+
+
+def test_movegen_generated_matches_generic():
+    rng = random.Random(42)
+    for _ in range(20000):
+        rank = rng.choice(list(DICT_MOVEGEN_GENERATED))
+        idx_player = rng.randrange(4)
+        pos_start, pos_finish = idx_player * 16, 68 + idx_player * 8
+        pos = pos_finish + rng.randrange(4) if rng.random() < 0.2 else rng.randrange(64)
+        blocked = 0
+        for _ in range(rng.randrange(4)):
+            blocked |= 1 << rng.randrange(64)
+        if pos < 64:
+            blocked &= ~(1 << pos)
+        finish_occ = rng.randrange(16)
+        if pos >= 64:
+            finish_occ |= 1 << (pos - pos_finish)
+        args = (pos, rng.random() < 0.3, pos_start, pos_finish, finish_occ, blocked, rng.randint(1, 7))
+        assert sorted(DICT_MOVEGEN_GENERATED[rank](*args)) == sorted(DICT_MOVEGEN_GENERIC[rank](*args))
+
+
+def test_get_list_action_moves():
+    game = Dog()
+    state = get_running_state(game, [Card(suit='♣', rank='4'), Card(suit='♦', rank='7'), Card(suit='♥', rank='A')])
+    state.list_player[0].list_marble[0].pos = 62
+    state.list_player[0].list_marble[1].pos = 5
+    state.list_player[1].list_marble[0].pos = 16
+    state.list_player[1].list_marble[0].is_save = True
+    game.set_state(state)
+    list_action = game.get_list_action()
+    game.DICT_MOVEGEN = DICT_MOVEGEN_GENERIC
+    game.touch()
+    assert game.get_list_action() == list_action
+    assert Action(card=Card(suit='♣', rank='4'), pos_from=5, pos_to=1) in list_action
+    assert Action(card=Card(suit='♣', rank='4'), pos_from=62, pos_to=69) in list_action
+    assert Action(card=Card(suit='♦', rank='7'), pos_from=5, pos_to=12) in list_action
+    assert not any(action.pos_from == 5 and action.pos_to == 16 for action in list_action)
+
+
+def test_move_out_of_kennel():
+    game = Dog()
+    state = get_running_state(game, [Card(suit='♦', rank='A')])
+    game.set_state(state)
+    action = Action(card=Card(suit='♦', rank='A'), pos_from=64, pos_to=0)
+    assert action in game.get_list_action()
+    game.apply_action(action)
+    marble = game.get_state().list_player[0].list_marble[0]
+    assert marble.pos == 0 and marble.is_save
+
+
+def test_seven_reset_when_not_finished():
+    game = Dog()
+    card = Card(suit='♣', rank='7')
+    state = get_running_state(game, [card])
+    state.list_player[0].list_marble[0].pos = 12
+    state.list_player[1].list_marble[0].pos = 16
+    state.list_player[1].list_marble[0].is_save = True
+    game.set_state(state)
+    game.apply_action(Action(card=card, pos_from=12, pos_to=15))
+    assert game.get_list_action() == []
+    game.apply_action(None)
+    state = game.get_state()
+    assert state.card_active is None
+    assert state.list_player[0].list_marble[0].pos == 12
+    assert state.idx_player_active == 1
+
+
+def test_encode_decode_state():
+    random.seed(3)
+    game = Dog()
+    game.start(random.Random(3))
+    for _ in range(150):
+        list_action = game.get_list_action()
+        game.apply_action(random.choice(list_action) if list_action else None)
+    game.state.card_active = Card(suit='♥', rank='7')
+    data = game.encode_state()
+    assert len(data) < 300
+    assert game.decode_state(data) == game.get_state()
+    view = game.get_player_view(1)
+    game.set_state(view)
+    assert game.decode_state(game.encode_state()) == view
+
+
+def test_snapshot_restore_shares_unchanged_parts():
+    game = Dog()
+    game.start(random.Random(5))
+    snapshot_root = game.snapshot()
+    state_root = game.get_state().model_copy(deep=True)
+    list_action = game.get_list_action()
+    game.apply_action(list_action[0])
+    snapshot_child = game.snapshot()
+    assert sum(part is part_root for part, part_root in zip(snapshot_child, snapshot_root)) >= 3
+    game.restore(snapshot_root)
+    assert game.get_state() == state_root
+    game.restore(snapshot_child)
+    assert game.get_state() != state_root
+
+
+def test_snapshot_restores_seven():
+    game = Dog()
+    state = get_running_state(game, [Card(suit='♥', rank='7')])
+    state.list_player[0].list_marble[0].pos = 0
+    game.set_state(state)
+    game.apply_action(Action(card=Card(suit='♥', rank='7'), pos_from=0, pos_to=3))
+    assert game.cnt_steps_seven == 4
+    snapshot = game.snapshot()
+    state_seven = game.state_seven
+    game.set_state(game.get_state())
+    assert game.cnt_steps_seven is None
+    game.restore(snapshot)
+    assert game.cnt_steps_seven == 4 and game.state_seven == state_seven
+
+
+def test_state_hash():
+    rng = random.Random(0)
+    for idx_game in range(2):
+        game = Dog()
+        game.start(random.Random(idx_game))
+        assert check_state_hash(game, rng, cnt_steps=1000) > 500
+        assert game.get_state().cnt_round > 3
+
+
+def test_state_hash_seven():
+    game = Dog()
+    state = get_running_state(game, [Card(suit='♥', rank='7')])
+    state.list_player[0].list_marble[0].pos = 0
+    game.set_state(state)
+    hash_start = game.state_hash()
+    game.apply_action(Action(card=Card(suit='♥', rank='7'), pos_from=0, pos_to=3))
+    assert game.state_hash() == game.compute_state_hash() != hash_start
+    snapshot = game.snapshot()
+    hash_seven = game.state_hash()
+    game.set_state(game.get_state())
+    assert game.state_hash() != hash_seven
+    game.restore(snapshot)
+    assert game.state_hash() == hash_seven
+    game.apply_action(None)
+    assert game.state_hash() == game.compute_state_hash()
+
+
+def test_iter_count_sample_actions():
+    game = Dog()
+    rng = random.Random(1)
+    game.start(random.Random(1))
+    for _ in range(300):
+        list_action = game.get_list_action()
+        assert list(game.iter_actions()) == list_action
+        assert game.count_actions() == len(list_action)
+        action = game.sample_action(rng)
+        assert action in list_action if list_action else action is None
+        game.apply_action(action)
+
+
+def test_sample_action_uniform():
+    game = Dog()
+    state = get_running_state(game, [Card(suit='', rank='JKR'), Card(suit='♥', rank='J'), Card(suit='♥', rank='A')])
+    state.list_player[0].list_marble[0].pos = 0
+    state.list_player[1].list_marble[0].pos = 20
+    game.set_state(state)
+    list_action = game.get_list_action()
+    assert len(list_action) == game.count_actions() > 50
+    rng = random.Random(0)
+    counts = Counter(repr(game.sample_action(rng)) for _ in range(100 * len(list_action)))
+    assert set(counts) == {repr(action) for action in list_action}
+    assert min(counts.values()) > 50
+
+
+def test_events_track_marbles():
+    game = Dog()
+    game.start(random.Random(2))
+    rng = random.Random(2)
+    dict_pos = {}
+    list_type = []
+
+    def on_event(event):
+        list_type.append(type(event))
+        if isinstance(event, (MarbleMoved, MarbleSentHome)):
+            dict_pos[event.idx_owner].remove(event.pos_from)
+            dict_pos[event.idx_owner].append(event.pos_to)
+        elif isinstance(event, SevenUndone):
+            dict_pos.update(get_dict_pos())
+
+    def get_dict_pos():
+        return {idx: [marble.pos for marble in player.list_marble] for idx, player in enumerate(game.state.list_player)}
+
+    dict_pos.update(get_dict_pos())
+    game.add_listener(on_event)
+    for _ in range(1000):
+        if game.get_state().phase == GamePhase.FINISHED:
+            break
+        game.apply_action(game.sample_action(rng))
+        assert {idx: sorted(list_pos) for idx, list_pos in dict_pos.items()} == \
+            {idx: sorted(list_pos) for idx, list_pos in get_dict_pos().items()}
+    assert {MarbleMoved, MarbleSentHome, CardDealt, CardPlayed} <= set(list_type)
+
+
+def test_trusted_actions_and_copies():
+    game = Dog()
+    game.start(random.Random(0))
+    for action in game.get_list_action():
+        assert Action.model_validate(action.model_dump()) == action
+        assert action.model_fields_set == set(Action.model_fields)
+    state = game.get_state()
+    state_copy = copy_state(state)
+    assert state_copy == state and state_copy.model_dump() == state.model_dump()
+    state_copy.list_player[0].list_marble[0].pos = 0
+    state_copy.list_card_draw.pop()
+    assert state_copy != state
+    assert game.decode_state(game.encode_state()) == state
+    view = game.get_player_view(0)
+    view.list_player[0].list_marble[0].pos = 0
+    assert game.get_player_view(0).list_player[0].list_marble[0].pos != 0
@@ -0,0 +1,253 @@
+import random
+from collections import Counter
+import numpy as np
+import pytest
+from server.py.game import LoopBatchGame, Player, sample_legal_columns
+from server.py.zobrist import check_state_hash
+from server.py.hangman_evil import EvilHangman
+from server.py.hangman import (Hangman, HangmanGameState, HangmanBatch, GamePhase, GuessLetterAction, LIST_ACTION_GUESS,
+                               MAX_MISSES, LetterMissed, LetterRevealed, RandomPlayer, get_letter_mask)
+
+
+def get_running_game(word: str, guesses: list) -> Hangman:
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess=word, phase=GamePhase.RUNNING, guesses=guesses))
+    return game
+
+
+def test_letter_mask():
+    assert get_letter_mask('aB') == 0b11
+    assert get_letter_mask('z-z') == 1 << 25
+
+
+def test_view_shows_non_letters():
+    game = get_running_game('ice-crème x', ['C', 'E'])
+    assert game.get_player_view(0).word_to_guess == '_ce-c_è_e _'
+    batch = HangmanBatch.from_games([game])
+    assert batch.get_player_view(0).word_to_guess == '_ce-c_è_e _'
+    for letter in 'IRMX':
+        game.apply_action(GuessLetterAction(letter))
+    assert game.get_state().phase == GamePhase.FINISHED and game.is_won()
+
+
+def test_guess_only_letters_a_to_z():
+    for letter in ('é', ' ', '-', 'ab', ''):
+        with pytest.raises(ValueError):
+            GuessLetterAction(letter)
+
+
+def test_list_action_interned():
+    game = get_running_game('devops', ['A', 'c'])
+    list_action = game.get_list_action()
+    assert len(list_action) == 24
+    assert all(action is LIST_ACTION_GUESS[ord(action.letter) - ord('A')] for action in list_action)
+
+
+def test_apply_action_hit_miss_and_repeat():
+    game = get_running_game('devops', [])
+    game.apply_action(GuessLetterAction('d'))
+    game.apply_action(GuessLetterAction('x'))
+    game.apply_action(GuessLetterAction('X'))
+    state = game.get_state()
+    assert state.guesses == ['D', 'X']
+    assert state.incorrect_guesses == ['X']
+    assert game.cnt_misses == 1
+    assert game.get_player_view(0).word_to_guess == 'd_____'
+
+
+def test_game_won_and_lost():
+    game = get_running_game('Xy', ['A'])
+    game.apply_action(GuessLetterAction('x'))
+    game.apply_action(GuessLetterAction('y'))
+    assert game.get_state().phase == GamePhase.FINISHED and game.is_won()
+    assert game.get_list_action() == []
+
+    game = get_running_game('xy', list('ABCDEFG'))
+    assert game.cnt_misses == MAX_MISSES - 1
+    game.apply_action(GuessLetterAction('h'))
+    assert game.get_state().phase == GamePhase.FINISHED and not game.is_won()
+    assert game.get_player_view(0).word_to_guess == 'xy'
+
+
+def test_batch_matches_single_games():
+    list_word = ['devops', 'python', 'jazz', 'a', 'queue']
+    batch = HangmanBatch(list_word)
+    list_game = [get_running_game(word, []) for word in list_word]
+    for letter in 'EATOINSHRDLUJZQ':
+        batch.step(np.full(len(batch), ord(letter) - ord('A')))
+        for game in list_game:
+            game.apply_action(GuessLetterAction(letter))
+    for idx, game in enumerate(list_game):
+        assert batch.is_finished[idx] == (game.get_state().phase == GamePhase.FINISHED)
+        assert batch.is_won()[idx] == game.is_won()
+        assert batch.cnt_misses[idx] == game.cnt_misses
+        view = batch.get_player_view(idx)
+        assert view.word_to_guess == game.get_player_view(0).word_to_guess
+        assert view.incorrect_guesses == sorted(game.get_state().incorrect_guesses)
+
+
+def test_batch_legal_mask_and_pass():
+    batch = HangmanBatch(['ab', 'cd'])
+    batch.step(np.array([0, -1]))
+    assert batch.cnt_guesses.tolist() == [1, 0]
+    legal = batch.get_legal_mask()
+    assert not legal[0] & 1 and legal[1] & 1
+    batch.step(np.array([1, 1]))
+    assert batch.is_finished.tolist() == [True, False]
+    assert batch.get_legal_mask()[0] == 0
+
+
+def test_make_batch_vectorized_and_loop_agree():
+    list_word = ['devops', 'python', 'jazz', 'queue']
+    batch_vectorized = Hangman.make_batch([get_running_game(word, ['E']) for word in list_word])
+    batch_loop = LoopBatchGame([get_running_game(word, ['E']) for word in list_word], list(LIST_ACTION_GUESS))
+    assert isinstance(batch_vectorized, HangmanBatch)
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        legal = batch_vectorized.legal_masks()
+        assert (legal == batch_loop.legal_masks()).all()
+        actions = np.array([rng.choice(np.flatnonzero(row)) if row.any() else -1 for row in legal])
+        batch_vectorized.step(actions)
+        batch_loop.step(actions)
+    for idx in range(len(list_word)):
+        view_vectorized = batch_vectorized.get_player_view(idx, 0)
+        view_loop = batch_loop.get_player_view(idx, 0)
+        assert view_vectorized.word_to_guess == view_loop.word_to_guess
+        assert view_vectorized.phase == view_loop.phase
+        assert view_vectorized.guesses == sorted(view_loop.guesses)
+
+
+def test_make_batch_loops_over_subclasses():
+    game = EvilHangman()
+    game.start(length=5)
+    batch = Hangman.make_batch([game])
+    assert isinstance(batch, LoopBatchGame)
+    assert batch.legal_masks().shape == (1, 26)
+    batch.step(np.array([4]))
+    assert game.get_state().guesses == ['E']
+
+
+def test_random_player():
+    game = get_running_game('devops', [])
+    while game.get_state().phase == GamePhase.RUNNING:
+        game.apply_action(RandomPlayer().select_action(game.get_state(), game.get_list_action()))
+    assert RandomPlayer().select_action(game.get_state(), []) is None
+
+
+def test_random_player_select_actions():
+    batch = HangmanBatch(['devops', 'python', 'jazz', 'a', 'queue'])
+    player = RandomPlayer()
+    while not batch.is_finished.all():
+        legal = batch.legal_masks()
+        actions = player.select_actions([batch.get_player_view(idx, 0) for idx in range(len(batch))], legal)
+        assert (actions[batch.is_finished] == -1).all()
+        assert legal[~batch.is_finished, actions[~batch.is_finished]].all()
+        batch.step(actions)
+    assert (player.select_actions([], np.zeros((0, 26), dtype=bool)) == []).all()
+
+
+def test_sample_legal_columns_uniform():
+    action_masks = np.array([[False, True, False, True], [False] * 4])
+    rng = random.Random(0)
+    counter = Counter(int(sample_legal_columns(action_masks, rng)[0]) for _ in range(2000))
+    assert set(counter) == {1, 3} and abs(counter[1] - 1000) < 150
+    assert sample_legal_columns(action_masks, rng)[1] == -1
+
+
+class FirstActionPlayer(Player):
+
+    def select_action(self, state, actions):
+        return actions[0] if actions else None
+
+
+def test_player_select_actions_default_loop():
+    batch = HangmanBatch(['devops', 'jazz'])
+    batch.step(np.array([0, 9]))
+    states = [batch.get_player_view(idx, 0) for idx in range(len(batch))]
+    legal = batch.legal_masks()
+    player = FirstActionPlayer()
+    assert player.select_actions(states, legal, LIST_ACTION_GUESS).tolist() == [1, 0]
+    assert player.select_actions(states, legal).tolist() == [1, 0]
+    legal[1] = False
+    assert player.select_actions(states, legal, LIST_ACTION_GUESS).tolist() == [1, -1]
+
+
+def test_encode_decode_state():
+    game = get_running_game('devops', ['E', 'X'])
+    game.state.incorrect_guesses = ['X']
+    state = game.decode_state(game.encode_state())
+    assert (state.word_to_guess, state.phase, state.guesses, state.incorrect_guesses) == \
+        ('devops', GamePhase.RUNNING, ['E', 'X'], ['X'])
+
+
+def test_snapshot_restore():
+    game = get_running_game('devops', [])
+    snapshot = game.snapshot()
+    game.apply_action(GuessLetterAction('e'))
+    game.restore(snapshot)
+    assert game.get_state().guesses == [] and game.mask_guessed == 0
+
+
+def test_versioned_queries():
+    game = get_running_game('devops', [])
+    version = game.get_version()
+    view = game.get_player_view(0)
+    view.guesses.append('X')
+    assert game.get_player_view(0) is not view and game.get_player_view(0).guesses == []
+    list_action = game.get_list_action()
+    list_action.pop()
+    assert len(game.get_list_action()) == 26
+    payload = game.get_payload(0)
+    assert game.get_payload(0) is payload
+    assert payload['word_to_guess'] == '______' and payload['phase'] == 'running'
+    assert payload['list_action'][0] == {'letter': 'A'} and payload['idx_player_you'] == 0
+
+    game.apply_action(GuessLetterAction('e'))
+    assert game.get_version() > version
+    assert game.get_player_view(0).word_to_guess == '_e____'
+    assert len(game.get_list_action()) == 25
+    assert game.get_payload(0, with_actions=False)['list_action'] == []
+
+    game.get_state().phase = GamePhase.FINISHED
+    game.touch()
+    assert game.get_player_view(0).word_to_guess == 'devops'
+
+
+def test_state_hash():
+    rng = random.Random(0)
+    for cls in (Hangman, EvilHangman):
+        for _ in range(20):
+            game = cls()
+            game.start(rng=rng)
+            assert check_state_hash(game, rng) > 0
+    game = get_running_game('devops', ['E'])
+    other = get_running_game('devops', [])
+    assert game.state_hash() != other.state_hash()
+    other.apply_action(GuessLetterAction('e'))
+    assert game.state_hash() == other.state_hash()
+    assert get_running_game('spoved', ['E']).state_hash() != game.state_hash()
+
+
+def test_iter_count_sample_actions():
+    game = get_running_game('devops', ['E', 'X'])
+    assert list(game.iter_actions()) == game.get_list_action()
+    assert game.count_actions() == 24
+    rng = random.Random(0)
+    counts = Counter(game.sample_action(rng).letter for _ in range(2400))
+    assert set(counts) == {action.letter for action in game.get_list_action()}
+    assert min(counts.values()) > 50
+    game.get_state().phase = GamePhase.FINISHED
+    game.touch()
+    assert list(game.iter_actions()) == [] and game.count_actions() == 0 and game.sample_action(rng) is None
+
+
+def test_events():
+    game = get_running_game('devops', [])
+    list_event = []
+    game.add_listener(list_event.append)
+    for letter in 'OXO':
+        game.apply_action(GuessLetterAction(letter))
+    assert list_event == [LetterRevealed('O', (3,)), LetterMissed('X', 1)]
+    game.remove_listener(list_event.append)
+    game.apply_action(GuessLetterAction('D'))
+    assert len(list_event) == 2 and Hangman.list_listener == []
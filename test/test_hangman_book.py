@@ -0,0 +1,72 @@
+import os
+from server.py.hangman import Hangman, HangmanGameState, GamePhase, MAX_MISSES
+from server.py.hangman_words import WordStore
+from server.py.hangman_solver import SolverPlayer
+from server.py.hangman_book import HangmanBook, get_book_key, get_path_book, get_store_hash, load_book, DICT_BOOK
+from server.py.hangman_book_build import build_book, build_length
+
+
+LIST_WORD = ['cat', 'car', 'cab', 'bat', 'bar', 'tab', 'tar', 'art', 'rat', 'zoo', 'tree', 'free', 'from', 'moon']
+
+
+def write_words(path: str, list_word: list) -> str:
+    """ Write a text word file """
+    with open(path, 'w', encoding='utf-8') as fout:
+        fout.write('\n'.join(list_word))
+    return path
+
+
+def play(word: str, player: SolverPlayer) -> int:
+    """ Play one game with the player, return the number of misses """
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess=word, phase=GamePhase.RUNNING, guesses=[]))
+    while game.get_state().phase != GamePhase.FINISHED:
+        action = player.select_action(game.get_player_view(0), game.get_list_action())
+        assert action is not None
+        game.apply_action(action)
+    return game.cnt_misses
+
+
+def test_store_hash():
+    store = WordStore.from_words(LIST_WORD)
+    assert get_store_hash(store) == get_store_hash(WordStore.from_words(reversed(LIST_WORD)))
+    assert get_store_hash(store) != get_store_hash(WordStore.from_words(LIST_WORD[:-1]))
+
+
+def test_book_key():
+    assert get_book_key(3, 'tA', '_A_') == get_book_key(3, 'at', '_a_') == '3:AT:_a_'
+
+
+def test_build_length_matches_solver(tmp_path):
+    path = write_words(str(tmp_path / 'words.txt'), LIST_WORD)
+    store = WordStore.load(path)
+    dict_book, list_misses = build_length(path, 3, 2)
+    assert get_book_key(3, '', '___') in dict_book
+    book = HangmanBook(get_store_hash(store), 2, dict_book, {3: list_misses})
+    for idx, word in enumerate(store.get_list_word(3)):
+        assert play(word, SolverPlayer(store)) == min(list_misses[idx], MAX_MISSES)
+        assert play(word, SolverPlayer(store, book)) == min(list_misses[idx], MAX_MISSES)
+
+
+def test_build_and_load_book(tmp_path):
+    path = write_words(str(tmp_path / 'words.txt'), LIST_WORD)
+    dir_cache = str(tmp_path / 'cache')
+    assert load_book(path, depth=2, dir_cache=dir_cache) is None
+    assert not os.path.exists(dir_cache)
+    book = build_book(path, depth=2, cnt_workers=2)
+    assert sorted(book.dict_misses) == [3, 4]
+    assert len(book.dict_misses[4]) == 4
+    book.save(get_path_book(book.store_hash, 2, dir_cache))
+    assert os.listdir(dir_cache) == [f'hangman_book_{book.store_hash}_2.json']
+
+    DICT_BOOK.clear()
+    book_cached = load_book(path, depth=2, dir_cache=dir_cache)
+    assert book_cached is not None
+    assert book_cached.dict_book == book.dict_book
+    assert book_cached.dict_misses == book.dict_misses
+
+    store = WordStore.load(path)
+    book.apply_difficulty(store)
+    list_misses = book.dict_misses[3]
+    difficulty = store.get_difficulty(3)
+    assert difficulty[list_misses.index(max(list_misses))] == difficulty.max()
@@ -0,0 +1,69 @@
+import random
+import numpy as np
+import pytest
+from server.py.hangman import HangmanGameState, GamePhase, GuessLetterAction
+from server.py.hangman_words import WordStore
+from server.py.hangman_evil import EvilHangman, get_family, get_pattern_key
+
+
+STORE = WordStore.from_words(['ally', 'beta', 'cool', 'deal', 'else', 'flew', 'good', 'hope', 'ibex', 'ride'])
+
+
+def test_pattern_key_unique_per_pattern():
+    is_letter = np.array([[0, 1, 0, 0, 1, 0, 0, 0, 0, 1], [0, 1, 0, 0, 1, 0, 0, 0, 0, 0],
+                          [0, 0, 0, 0, 0, 0, 0, 0, 0, 1], [0, 1, 0, 0, 1, 0, 0, 0, 0, 1]], dtype=bool)
+    key = get_pattern_key(is_letter)
+    assert len(set(key.tolist())) == 3
+    assert key[0] == key[3]
+
+
+def test_family_keeps_largest_partition():
+    letters = STORE.get_array(4)
+    family = get_family(letters, ord('e') - ord('a'))
+    # families of 'e': miss (ally, cool, good), '_e__' (beta, deal), '__e_' (flew, ibex), '___e' (hope, ride), 'e__e'
+    words = [STORE.get_word(4, idx) for idx in family]
+    assert words == ['ally', 'cool', 'good']
+
+
+def test_family_prefers_fewer_revealed_on_tie():
+    letters = WordStore.from_words(['ab', 'ba', 'cc', 'dd']).get_array(2)
+    assert get_family(letters, ord('a') - ord('a')).tolist() == [2, 3]
+    letters = WordStore.from_words(['ab', 'ac', 'db', 'dc']).get_array(2)
+    assert get_family(letters, ord('a') - ord('a')).tolist() == [2, 3]
+
+
+def test_evil_game_dodges_guesses():
+    game = EvilHangman(STORE)
+    game.start(4, random.Random(0))
+    assert len(game.candidates) == 10
+    game.apply_action(GuessLetterAction('e'))
+    state = game.get_state()
+    assert state.incorrect_guesses == ['E']
+    assert state.word_to_guess in {'ally', 'cool', 'good'}
+    game.apply_action(GuessLetterAction('o'))
+    assert game.get_state().word_to_guess in {'cool', 'good'}
+    game.apply_action(GuessLetterAction('c'))
+    assert game.get_state().word_to_guess == 'good'
+    for letter in 'gd':
+        game.apply_action(GuessLetterAction(letter))
+    assert game.get_state().phase == GamePhase.FINISHED
+
+
+def test_set_state_restores_candidates():
+    game = EvilHangman(STORE)
+    game.set_state(HangmanGameState(word_to_guess='good', phase=GamePhase.RUNNING, guesses=['O', 'e'],
+                                    incorrect_guesses=['e']))
+    assert sorted(STORE.get_word(4, idx) for idx in game.candidates) == ['cool', 'good']
+    game.apply_action(GuessLetterAction('c'))
+    assert game.get_state().word_to_guess == 'good'
+
+
+def test_evil_game_normalizes_words():
+    store = WordStore.from_words(['Café', 'straße', 'naïve', 'tea'])
+    assert store.get_list_word(4) == ['cafe']
+    assert store.get_list_word(5) == ['naive']
+    game = EvilHangman(store)
+    game.set_state(HangmanGameState(word_to_guess='Café', phase=GamePhase.RUNNING, guesses=['E']))
+    assert game.get_state().word_to_guess == 'cafe' and len(game.candidates) == 1
+    with pytest.raises(ValueError):
+        game.set_state(HangmanGameState(word_to_guess='straße', phase=GamePhase.RUNNING, guesses=[]))
@@ -0,0 +1,63 @@
+import numpy as np
+from server.py.hangman import Hangman, HangmanGameState, GamePhase, GuessLetterAction
+from server.py.hangman_words import WordStore
+from server.py.hangman_solver import HangmanIndex, HangmanSolver, SolverPlayer, get_bitset, get_list_idx, get_index
+
+
+STORE = WordStore.from_words(['cat', 'car', 'cab', 'bat', 'bar', 'tab', 'tar', 'art', 'rat', 'zoo'])
+
+
+def test_bitset_helpers():
+    bitset = get_bitset(np.array([True, False, True, True] + [False] * 10))
+    assert bitset == 0b1101
+    assert get_list_idx(bitset).tolist() == [0, 2, 3]
+    assert get_list_idx(0).tolist() == []
+
+
+def test_index_filters():
+    index = HangmanIndex(STORE, 3)
+    candidates = index.filter_hit(index.mask_all, ord('a') - ord('a'), [1])
+    assert sorted(index.get_list_word(candidates)) == ['bar', 'bat', 'cab', 'car', 'cat', 'rat', 'tab', 'tar']
+    candidates = index.filter_miss(candidates, ord('c') - ord('a'))
+    assert sorted(index.get_list_word(candidates)) == ['bar', 'bat', 'rat', 'tab', 'tar']
+    assert index.get_list_word(index.filter_hit(index.mask_all, ord('t') - ord('a'), [0, 2])) == []
+
+
+def test_solver_narrows_to_word():
+    solver = HangmanSolver(get_index(3, STORE))
+    word = 'tab'
+    while solver.get_cnt_candidates() > 1:
+        letter = solver.get_best_letter()
+        assert letter is not None
+        solver.apply_guess(letter, ''.join(char if char == letter else '_' for char in word))
+    assert solver.index.get_list_word(solver.candidates) == [word]
+
+
+def test_solver_prefers_informative_letter():
+    solver = HangmanSolver(get_index(3, STORE))
+    solver.apply_guess('a', '_a_')
+    # every candidate left has 'a' in the middle; 'a' is guessed and 't', 'r', 'c', 'b' split the rest
+    assert solver.get_best_letter() in {'t', 'r', 'c', 'b'}
+
+
+def test_solver_player_wins_game():
+    store = WordStore.from_words(['garden', 'golden', 'harden', 'warden', 'burden', 'sudden', 'hidden'])
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess='Warden', phase=GamePhase.RUNNING, guesses=[]))
+    player = SolverPlayer(store)
+    for _ in range(26):
+        if game.get_state().phase == GamePhase.FINISHED:
+            break
+        view = game.get_player_view(0)
+        assert set(view.word_to_guess) <= set('warden_')
+        game.apply_action(player.select_action(view, game.get_list_action()))
+    assert game.get_state().phase == GamePhase.FINISHED
+    assert len(game.get_state().incorrect_guesses) <= 3
+
+
+def test_solver_player_unknown_word():
+    player = SolverPlayer(STORE)
+    state = HangmanGameState(word_to_guess='____', phase=GamePhase.RUNNING, guesses=['E'])
+    action = player.select_action(state, [GuessLetterAction(letter) for letter in 'xyz'])
+    assert action is not None and action.letter in 'XYZ'
+    assert player.select_action(state, []) is None
@@ -0,0 +1,55 @@
+import random
+import pytest
+from server.py.hangman_words import WordStore, CNT_DIFFICULTY, PATH_WORDS, get_word_store
+
+
+def test_from_words_groups_by_length():
+    store = WordStore.from_words(['Tree', 'cat', 'dog', 'cat', 'x-ray', 'apple', 'café'])
+    assert len(store) == 5
+    assert store.list_length == [3, 4, 5]
+    assert store.get_list_word(3) == ['cat', 'dog']
+    assert store.get_list_word(4) == ['cafe', 'tree']
+    assert store.get_array(4).tolist() == [[2, 0, 5, 4], [19, 17, 4, 4]]
+    assert store.count(7) == 0
+
+
+def test_load_without_words_fails(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_text('x-ray\nstraße\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        WordStore.load(str(path))
+
+
+def test_random_word_filtered():
+    store = WordStore.from_words(['cat', 'dog', 'apple', 'tree'])
+    rng = random.Random(0)
+    assert {store.random_word(rng) for _ in range(200)} == {'cat', 'dog', 'apple', 'tree'}
+    assert {store.random_word(rng, length=3) for _ in range(50)} == {'cat', 'dog'}
+    with pytest.raises(ValueError):
+        store.random_word(rng, length=9)
+
+
+def test_difficulty_levels():
+    store = get_word_store()
+    for length in store.list_length:
+        level = store.get_difficulty(length)
+        assert len(level) == store.count(length)
+        assert level.min() >= 0 and level.max() < CNT_DIFFICULTY
+    word = store.random_word(random.Random(1), length=6, difficulty=CNT_DIFFICULTY - 1)
+    assert len(word) == 6
+    assert store.get_difficulty(6)[store.get_list_word(6).index(word)] == CNT_DIFFICULTY - 1
+    assert store.random_word(random.Random(2), difficulty=0)
+
+
+def test_save_and_memory_map(tmp_path):
+    store = WordStore.load(PATH_WORDS)
+    path = str(tmp_path / 'words.bin')
+    store.save(path)
+    store_mapped = WordStore.load(path)
+    assert len(store_mapped) == len(store)
+    assert all(store_mapped.get_list_word(length) == store.get_list_word(length) for length in store.list_length)
+    assert (store_mapped.get_array(5) == store.get_array(5)).all()
+
+
+def test_word_store_shared():
+    assert get_word_store() is get_word_store()
@@ -0,0 +1,130 @@
+import random
+from collections import Counter
+import pytest
+from server.py.game import Game
+from server.py.battleship import Battleship
+from server.py.dog import Dog, GameState as DogGameState, determinize
+from server.py.mcts import GameSaver, MctsPlayer, SearchConfig, SearchTree, get_rewards, play_rollout
+
+
+class NimState:
+
+    def __init__(self, cnt_stones: int, idx_player_active: int = 0, phase: str = 'running') -> None:
+        self.cnt_stones = cnt_stones
+        self.idx_player_active = idx_player_active
+        self.phase = phase
+        self.winner = None
+        self.players = [None, None]
+
+
+class Nim(Game):
+    """ Take 1 to 3 stones, who takes the last stone wins """
+
+    def __init__(self) -> None:
+        self.state = NimState(10)
+
+    def set_state(self, state: NimState) -> None:
+        self.state = state
+
+    def get_state(self) -> NimState:
+        return self.state
+
+    def print_state(self) -> None:
+        print(self.state.cnt_stones)
+
+    def get_list_action(self) -> list:
+        return list(range(1, min(3, self.state.cnt_stones) + 1)) if self.state.phase == 'running' else []
+
+    def apply_action(self, action: int) -> None:
+        self.state.cnt_stones -= action
+        if self.state.cnt_stones == 0:
+            self.state.phase = 'finished'
+            self.state.winner = self.state.idx_player_active
+        self.state.idx_player_active = 1 - self.state.idx_player_active
+
+    def get_player_view(self, idx_player: int) -> NimState:
+        return self.state
+
+    def state_hash(self) -> int:
+        return self.compute_state_hash()
+
+    def compute_state_hash(self) -> int:
+        return int.from_bytes(self.encode_state(), 'little')
+
+    def encode_state_parts(self) -> list:
+        state = self.state
+        return [bytes([state.cnt_stones, state.idx_player_active, state.phase == 'finished',
+                       0 if state.winner is None else 1 + state.winner])]
+
+    def decode_state(self, data: bytes) -> NimState:
+        state = NimState(data[0], data[1], 'finished' if data[2] else 'running')
+        state.winner = None if data[3] == 0 else data[3] - 1
+        return state
+
+
+def test_game_saver():
+    nim = Nim()
+    saver = GameSaver(nim)
+    token = saver.save()
+    nim.apply_action(3)
+    saver.load(token)
+    assert nim.get_state().cnt_stones == 10
+    battleship = Battleship()
+    saver = GameSaver(battleship)
+    token = saver.save()
+    battleship.apply_action(battleship.get_list_action()[0])
+    saver.load(token)
+    assert battleship.encode_state() == b''.join(token)
+
+
+def test_rollout_and_tree():
+    config = SearchConfig(Nim)
+    nim = Nim()
+    rewards = play_rollout(nim, random.Random(0), config)
+    assert sorted(rewards) == [0.0, 1.0] and rewards == get_rewards(nim, 1 - nim.get_state().idx_player_active)
+    nim.set_state(NimState(5))
+    tree = SearchTree(nim, config)
+    list_path = [tree.select() for _ in range(3)]
+    assert [len(path) for path in list_path] == [2, 2, 2]
+    assert tree.root.cnt_virtual == 3
+    for path in list_path:
+        tree.backpropagate(path, [1.0, 0.0])
+    assert tree.root.cnt_virtual == 0 and tree.root.cnt_visits == 3
+    assert tree.get_root_stats() == {'1': (1, 1.0), '2': (1, 1.0), '3': (1, 1.0)}
+
+
+@pytest.mark.parametrize('cnt_workers, parallelism', [(0, 'root'), (2, 'root'), (2, 'tree')])
+def test_mcts_finds_winning_move(cnt_workers, parallelism):
+    player = MctsPlayer(SearchConfig(Nim), time_budget=None, max_iterations=2000, cnt_workers=cnt_workers,
+                        parallelism=parallelism, seed=0)
+    try:
+        for cnt_stones, action_winning in [(5, 1), (6, 2), (7, 3), (10, 2)]:
+            nim = Nim()
+            nim.set_state(NimState(cnt_stones))
+            assert player.select_action(nim.get_player_view(0), nim.get_list_action()) == action_winning
+    finally:
+        player.close()
+    assert player.stats.cnt_searches == 4 and player.stats.cnt_iterations >= 4 * 2000
+    assert 'it/s' in player.stats.get_report()
+
+
+def test_mcts_time_budget_battleship():
+    game = Battleship()
+    player = MctsPlayer(SearchConfig(Battleship), time_budget=0.2, seed=0)
+    action = player.select_action(game.get_state(), game.get_list_action())
+    assert repr(action) in {repr(action_legal) for action_legal in game.get_list_action()}
+    assert player.stats.cnt_iterations > 0 and 0.2 <= player.stats.time_search < 1.0
+    with pytest.raises(ValueError):
+        MctsPlayer(SearchConfig(Battleship), time_budget=None)
+
+
+def test_dog_determinize():
+    game = Dog()
+    game.start(random.Random(0))
+    view = game.get_player_view(0)
+    state = determinize(view, random.Random(0))
+    assert state.list_player[0].list_card == game.get_state().list_player[0].list_card
+    assert all(len(player.list_card) == 6 for player in state.list_player)
+    list_card = [card for player in state.list_player for card in player.list_card] + state.list_card_draw
+    assert Counter(map(repr, list_card)) == Counter(map(repr, DogGameState.LIST_CARD))
+    assert view.list_player[1].list_card[0].rank == ''
@@ -0,0 +1,107 @@
+import random
+import numpy as np
+import pytest
+from server.py.dog import Dog, GamePhase
+from server.py.game import get_rng, get_seed_sequence
+from server.py.hangman import Hangman
+from server.py.battleship import Battleship
+from server.py.hangman_solver import SolverPlayer
+from server.py.mcts import get_rewards
+from server.py.selfplay import (GameFailed, SeatPlayers, SelfPlayStats, get_class, get_winner, init_worker, play_game,
+                                run_selfplay, run_shard, seed_game, start_game)
+from server.py.uno import RandomPlayer
+
+
+def test_get_class():
+    assert get_class('hangman.Hangman') is Hangman
+    assert get_class('hangman_solver', 'SolverPlayer') is SolverPlayer
+
+
+def test_play_game_hangman_solver():
+    game = Hangman()
+    start_game(game, seed_game(0, 0))
+    winner, cnt_steps, status = play_game(game, SeatPlayers([SolverPlayer]))
+    assert (winner, status) == (0, 'finished')
+    assert cnt_steps == len(game.get_state().guesses)
+
+
+def test_play_game_truncated():
+    game = Battleship()
+    start_game(game, seed_game(0, 0))
+    seats = SeatPlayers([get_class('battleship', 'RandomPlayer')])
+    assert play_game(game, seats, max_steps=3) == (None, 3, 'truncated')
+
+
+def test_play_game_failed_keeps_steps():
+
+    class FailingPlayer(RandomPlayer):
+        cnt_calls = 0
+
+        def select_action(self, state, actions):
+            FailingPlayer.cnt_calls += 1
+            if FailingPlayer.cnt_calls > 4:
+                raise ValueError('broken player')
+            return super().select_action(state, actions)
+
+    game = Battleship()
+    start_game(game, seed_game(0, 0))
+    with pytest.raises(GameFailed) as info:
+        play_game(game, SeatPlayers([FailingPlayer]))
+    assert info.value.cnt_steps == 4 and isinstance(info.value.__cause__, ValueError)
+
+
+def test_dog_winner_is_team():
+    game = Dog()
+    state = game.get_state()
+    for idx_player in (1, 3):
+        for idx_marble, marble in enumerate(state.list_player[idx_player].list_marble):
+            marble.pos = Dog.get_pos_finish(idx_player) + idx_marble
+    state.phase = GamePhase.FINISHED
+    game.set_state(state)
+    assert game.get_team_won() == get_winner(game, 2) == 1
+    assert get_rewards(game, 2) == [0.0, 1.0, 0.0, 1.0]
+
+
+def test_run_shard_deterministic():
+    init_worker('battleship.Battleship', ['battleship'])
+    list_result = run_shard(1, 10, 3)
+    assert [status for _, _, status in list_result] == ['finished'] * 3
+    assert all(winner in (0, 1) for winner, _, _ in list_result)
+    assert run_shard(1, 10, 3) == list_result
+    assert run_shard(1, 11, 2) == list_result[1:]
+
+
+def test_run_selfplay_matches_shards():
+    init_worker('hangman.Hangman', ['hangman'])
+    list_expected = run_shard(5, 0, 70)
+    stats = SelfPlayStats()
+    list_result = []
+    for list_result_shard in run_selfplay('hangman.Hangman', ['hangman'], 70, cnt_workers=2, seed=5):
+        stats.add(list_result_shard)
+        list_result.extend(list_result_shard)
+    assert sorted(list_result, key=repr) == sorted(list_expected, key=repr)
+    assert stats.cnt_games == 70
+    assert stats.cnt_steps == sum(cnt_steps for _, cnt_steps, _ in list_expected)
+    assert 'Status:    finished 70' in stats.get_report()
+
+
+def test_seed_streams():
+    assert get_rng(get_seed_sequence(7, 3, 1)).random() == get_rng(get_seed_sequence(7, 3, 1)).random()
+    assert get_rng(get_seed_sequence(7, 3, 1)).random() != get_rng(get_seed_sequence(7, 3, 2)).random()
+    assert get_rng(get_seed_sequence(7, 3)).random() != get_rng(get_seed_sequence(8, 3)).random()
+    list_player = [RandomPlayer(), RandomPlayer()]
+    for player in list_player:
+        player.seed(get_seed_sequence(7, 3, 1))
+    list_first, list_second = [[player.select_action(1, list(range(100))) for _ in range(5)] for player in list_player]
+    assert list_first == list_second
+
+
+def test_run_shard_replays_game_from_index():
+    for game_name, max_steps in (('uno.Uno', 300), ('dog.Dog', 300)):
+        init_worker(game_name, [game_name.partition('.')[0]])
+        list_result = run_shard(3, 4, 3, max_steps=max_steps)
+        random.seed(123)
+        np.random.seed(123)
+        init_worker(game_name, [game_name.partition('.')[0]])
+        assert run_shard(3, 6, 1, max_steps=max_steps) == list_result[2:]
+        assert run_shard(3, 5, 1, max_steps=max_steps) == list_result[1:2]
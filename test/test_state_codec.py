@@ -0,0 +1,30 @@
+import pytest
+import numpy as np
+from server.py.state_codec import StateWriter, StateReader
+
+
+def test_round_trip():
+    writer = StateWriter(7)
+    writer.write_u8(200)
+    writer.write_int(-10)
+    writer.write_optional_int(None)
+    writer.write_optional_str('♥')
+    writer.write_list_str(['a', ''])
+    writer.write_array([1, 2, 255])
+    writer.write_array([9999], np.uint16)
+    data = writer.get_bytes()
+    assert len(data) == 1 + 1 + 4 + 1 + 6 + 7 + 5 + 4
+    reader = StateReader(data, 7)
+    assert reader.read_u8() == 200
+    assert reader.read_int() == -10
+    assert reader.read_optional_int() is None
+    assert reader.read_optional_str() == '♥'
+    assert reader.read_list_str() == ['a', '']
+    assert reader.read_array() == [1, 2, 255]
+    assert reader.read_array(np.uint16) == [9999]
+    assert reader.is_done()
+
+
+def test_version_checked():
+    with pytest.raises(ValueError):
+        StateReader(StateWriter(1).get_bytes(), 2)
@@ -0,0 +1,58 @@
+import pytest
+from server.py.tournament import Ratings, Tournament, init_worker, run_matches
+
+
+def test_ratings_update():
+    ratings = Ratings(3)
+    ratings.add(0, 1, 1.0, cnt_games=2)
+    assert ratings.list_rating[0] > 1500 > ratings.list_rating[1]
+    assert ratings.list_rating[0] + ratings.list_rating[1] == pytest.approx(3000)
+    assert ratings.list_variance[0] < ratings.list_variance[2]
+    assert ratings.get_ranking() == [0, 2, 1]
+    assert not ratings.is_separated()
+    for _ in range(50):
+        ratings.add(0, 1, 1.0, cnt_games=2)
+        ratings.add(1, 2, 1.0, cnt_games=2)
+        ratings.add(0, 2, 1.0, cnt_games=2)
+    assert ratings.get_ranking() == [0, 1, 2]
+    assert ratings.is_separated()
+
+
+def test_run_matches_single_player_scores():
+    init_worker('hangman.Hangman', ['hangman', 'hangman_solver.SolverPlayer'])
+    list_result = run_matches(0, [(0, 0, 1), (1, 1, 0)])
+    assert [idx_match for idx_match, _, _, _ in list_result] == [0, 1]
+    for _, score_a, cnt_steps, list_status in list_result:
+        assert score_a in (0.0, 0.5, 1.0)
+        assert cnt_steps > 0 and list_status == ['finished', 'finished']
+    assert run_matches(0, [(1, 1, 0)]) == list_result[1:]
+
+
+def test_tournament_stops_when_separated():
+    tournament = Tournament('battleship.Battleship', ['battleship', 'battleship_bot.DensityPlayer'])
+    for _ in tournament.run(max_rounds=30, cnt_workers=0):
+        pass
+    assert tournament.get_cnt_rounds() < 30
+    assert tournament.ratings.get_ranking() == [1, 0]
+    assert 'separated: True' in tournament.get_report()
+    assert 'leader battleship_bot.DensityPlayer' in tournament.get_progress()
+
+
+def test_tournament_workers_and_resume(tmp_path):
+    list_player = ['hangman', 'hangman_solver.SolverPlayer', 'hangman']
+    tournament = Tournament('hangman.Hangman', list_player, seed=3)
+    for _ in tournament.run(max_rounds=3, min_rounds=3, cnt_workers=2):
+        pass
+    assert len(tournament.list_score) == 9 and tournament.cnt_games == 18
+    path = str(tmp_path / 'checkpoint.json')
+    tournament_first = Tournament('hangman.Hangman', list_player, seed=3)
+    for _ in tournament_first.run(max_rounds=1, min_rounds=1, cnt_workers=0, path_checkpoint=path):
+        pass
+    tournament_resumed = Tournament('hangman.Hangman', list_player, seed=3)
+    for _ in tournament_resumed.run(max_rounds=3, min_rounds=3, cnt_workers=0, path_checkpoint=path):
+        pass
+    assert tournament_resumed.list_score == tournament.list_score
+    assert tournament_resumed.ratings.list_rating == tournament.ratings.list_rating
+    assert tournament_resumed.cnt_games == 12
+    with pytest.raises(ValueError):
+        Tournament('hangman.Hangman', list_player, seed=4).load(path)
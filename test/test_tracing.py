@@ -0,0 +1,66 @@
+import io
+import json
+from server.py.hangman import Hangman, HangmanGameState, GamePhase, TRACER as TRACER_HANGMAN
+from server.py.tracing import Level, Sink, Tracer, format_record, get_level
+
+
+def test_levels_and_lazy_formatting():
+    stream = io.StringIO()
+    tracer = Tracer('test', Level.INFO, Sink(stream))
+    assert tracer.is_info and not tracer.is_debug
+
+    class Counted:
+        cnt_str = 0
+
+        def __str__(self) -> str:
+            Counted.cnt_str += 1
+            return 'counted'
+
+    tracer.debug('hidden %s', Counted())
+    tracer.info('shown %s of %d', Counted(), 2, game='hangman')
+    tracer.error('broken %d', 'not a number')
+    tracer.sink.flush()
+    list_line = stream.getvalue().splitlines()
+    assert Counted.cnt_str == 1 and len(list_line) == 2
+    assert list_line[0].endswith('INFO    test: shown counted of 2 game=hangman')
+    assert 'ERROR   test: broken %d' in list_line[1]
+    tracer.set_level(Level.OFF)
+    tracer.error('hidden')
+    tracer.sink.flush()
+    assert len(stream.getvalue().splitlines()) == 2
+
+
+def test_json_sink():
+    record = (0.0, Level.WARNING, 'test', 'move %s', ('A1',), {'idx_player': 1})
+    assert json.loads(format_record(record, is_json=True)) == {
+        'time': 0.0, 'level': 'WARNING', 'tracer': 'test', 'message': 'move A1', 'idx_player': 1}
+
+
+def test_get_level(capsys):
+    assert get_level('debug') == Level.DEBUG
+    assert get_level('verbose') == Level.WARNING
+    assert "Unknown trace level 'verbose'" in capsys.readouterr().err
+
+
+def test_print_state_traces():
+    stream = io.StringIO()
+    sink_last, level_last = TRACER_HANGMAN.sink, TRACER_HANGMAN.level
+    TRACER_HANGMAN.sink = Sink(stream)
+    try:
+        game = Hangman()
+        game.set_state(HangmanGameState(word_to_guess='DOG', phase=GamePhase.RUNNING, guesses=['O', 'X'],
+                                        incorrect_guesses=['X']))
+        TRACER_HANGMAN.set_level(Level.WARNING)
+        game.print_state()
+        TRACER_HANGMAN.set_level(Level.INFO)
+        game.print_state()
+        game.set_state(HangmanGameState(word_to_guess='ice cream', phase=GamePhase.RUNNING, guesses=['E']))
+        game.print_state()
+        TRACER_HANGMAN.sink.flush()
+    finally:
+        TRACER_HANGMAN.sink = sink_last
+        TRACER_HANGMAN.set_level(level_last)
+    list_line = stream.getvalue().splitlines()
+    assert len(list_line) == 2
+    assert list_line[0].endswith('hangman: Word: _o_, guesses: O, X')
+    assert list_line[1].endswith('hangman: Word: __e __e__, guesses: E')
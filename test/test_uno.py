@@ -1,6 +1,9 @@
 import sys
 import os
-from server.py.uno import GameState, GamePhase, Uno, LIST_CARD, PlayerState, Card, Action
+import random
+from server.py.game import construct_trusted
+from server.py.uno import GameState, GamePhase, Uno, LIST_CARD, PlayerState, Card, Action, CardDrawn, CardPlayed
+from server.py.zobrist import check_state_hash
 
 
 def test_create():
@@ -294,3 +297,90 @@ def test_apply_one_uno():
     game.apply_action(expected_actions[0])
 
     assert len(init_state.list_player[0].list_card) == 1
+
+
+def test_encode_decode_state():
+    game = Uno()
+    game.set_state(GameState(cnt_player=3))
+    game.state.list_player[0].last_action = Action(card=Card(color='red', number=3), color='red', uno=True)
+    game.state.list_player[1].list_card.append(Card(color='purple', number=42, symbol='odd'))
+    data = game.encode_state()
+    assert len(data) < 250
+    state = game.decode_state(data)
+    assert state.model_dump() == game.get_state().model_dump()
+    assert Uno().decode_state(Uno().encode_state()).model_dump() == GameState().model_dump()
+
+
+def test_snapshot_restore():
+    game = Uno()
+    game.set_state(GameState(cnt_player=2))
+    snapshot = game.snapshot()
+    state = game.get_state().model_copy(deep=True)
+    game.apply_action(game.get_list_action()[0])
+    assert game.get_state().model_dump() != state.model_dump()
+    game.restore(snapshot)
+    assert game.get_state().model_dump() == state.model_dump()
+
+
+def test_state_hash():
+    rng = random.Random(0)
+    for idx_game in range(50):
+        game = Uno()
+        game.seed(idx_game)
+        assert game.state_hash() == game.compute_state_hash()
+        game.set_state(GameState(cnt_player=2 + idx_game % 3))
+        check_state_hash(game, rng, with_pass=False)
+    game = Uno()
+    game.seed(0)
+    game.set_state(GameState(cnt_player=2))
+    player = game.state.get_current_player()
+    player.list_card = [game.state.list_card_discard[-1].model_copy(), player.list_card[0]]
+    game.touch()
+    hash_start = game.state_hash()
+    action = next(action for action in game.get_list_action() if action.card is not None and not action.uno)
+    game.apply_action(action)
+    assert len(player.list_card) == 5
+    assert game.state_hash() == game.compute_state_hash() != hash_start
+
+
+def test_events():
+    game = Uno()
+    game.seed(1)
+    game.set_state(GameState(cnt_player=2))
+    list_event = []
+    game.add_listener(list_event.append)
+    card_top = game.state.list_card_draw[-1]
+    game.apply_action(Action(draw=1))
+    assert list_event == [CardDrawn(0, card_top)]
+    action = next(action for action in game.get_list_action() if action.card is not None)
+    game.apply_action(action)
+    assert list_event[1:] == [CardPlayed(0, action.card, action.color)]
+
+
+def test_events_uno_penalty():
+    game = Uno()
+    game.set_state(GameState(
+        cnt_player=2,
+        list_card_draw=LIST_CARD[:] + [Card(color='green', number=1)],
+        list_player=[PlayerState(list_card=[Card(color='red', number=1), Card(color='red', number=2)]),
+                     PlayerState(list_card=[Card(color='blue', number=1), Card(color='blue', number=2)])]))
+    list_event = []
+    game.add_listener(list_event.append)
+    list_card_penalty = game.state.list_card_draw[-4:][::-1]
+    action = Action(card=Card(color='red', number=1), color='red')
+    game.apply_action(action)
+    assert list_event == [CardDrawn(0, card) for card in list_card_penalty] + [CardPlayed(0, action.card, 'red')]
+    assert len(game.state.list_player[0].list_card) == 5
+
+
+def test_construct_trusted():
+    card = LIST_CARD[0]
+    assert construct_trusted(Action, card=card, color=card.color) == Action(card=card, color=card.color)
+    player = construct_trusted(PlayerState, name='A')
+    player.list_card.append(card)
+    assert player == PlayerState(name='A', list_card=[card])
+    assert construct_trusted(PlayerState).list_card == []
+    game = Uno()
+    game.seed(2)
+    game.set_state(GameState(cnt_player=3))
+    assert game.get_list_action() == [Action.model_validate(action.model_dump()) for action in game.get_list_action()]
@@ -0,0 +1,32 @@
+import random
+import pytest
+from server.py.hangman import Hangman, HangmanGameState, GamePhase
+from server.py.zobrist import check_state_hash, get_key, get_keys, get_mask_hash
+
+
+def test_get_keys():
+    keys = get_keys('test.keys', 3, 4)
+    assert len(keys) == 3 and all(len(row) == 4 for row in keys)
+    assert all(0 <= key < 1 << 64 for row in keys for key in row)
+    assert get_keys('test.keys', 3, 4) == keys
+    assert get_keys('test.other', 3, 4) != keys
+
+
+def test_get_key_and_mask_hash():
+    keys = get_keys('test.field', 5)
+    assert get_key(keys, None) == keys[4]
+    assert get_key(keys, 6) == keys[2] and get_key(keys, -1) == keys[3]
+    assert get_mask_hash(keys, 0b1010) == keys[1] ^ keys[3]
+    assert get_mask_hash(keys, 0) == 0
+
+
+def test_check_state_hash_finds_stale_hash():
+    game = Hangman()
+    game.set_state(HangmanGameState(word_to_guess='zobrist', phase=GamePhase.RUNNING, guesses=[]))
+    assert check_state_hash(game, random.Random(0)) <= 26
+    game.set_state(HangmanGameState(word_to_guess='zobrist', phase=GamePhase.RUNNING, guesses=[]))
+    game.get_state().guesses.append('Z')
+    with pytest.raises(ValueError):
+        check_state_hash(game, random.Random(0))
+    game.touch()
+    assert check_state_hash(game, random.Random(0), cnt_steps=3) == 3